@@ -0,0 +1,36 @@
+"""per user transaction indexes
+
+Revision ID: 3b9f6e21c5d7
+Revises: 8d1c2b7e4a90
+Create Date: 2026-10-18 11:04:27.530912
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = '3b9f6e21c5d7'
+down_revision: Union[str, None] = '8d1c2b7e4a90'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.drop_index('ix_transactions_id', table_name='transactions')
+    op.drop_index('ix_transactions_category', table_name='transactions')
+    op.drop_index('ix_transactions_transactionDate', table_name='transactions')
+    op.drop_index('ix_transactions_transactionType', table_name='transactions')
+    op.create_index('ix_transactions_userId_transactionDate_id', 'transactions', ['userId', 'transactionDate', 'id'], unique=False)
+    op.create_index('ix_transactions_userId_transactionType_transactionDate', 'transactions', ['userId', 'transactionType', 'transactionDate'], unique=False)
+    op.create_index('ix_transactions_userId_category_transactionDate', 'transactions', ['userId', 'category', 'transactionDate'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_transactions_userId_category_transactionDate', table_name='transactions')
+    op.drop_index('ix_transactions_userId_transactionType_transactionDate', table_name='transactions')
+    op.drop_index('ix_transactions_userId_transactionDate_id', table_name='transactions')
+    op.create_index('ix_transactions_transactionType', 'transactions', ['transactionType'], unique=False)
+    op.create_index('ix_transactions_transactionDate', 'transactions', ['transactionDate'], unique=False)
+    op.create_index('ix_transactions_category', 'transactions', ['category'], unique=False)
+    op.create_index('ix_transactions_id', 'transactions', ['id'], unique=False)
@@ -0,0 +1,46 @@
+"""import jobs
+
+Revision ID: 5e0a7c93d21f
+Revises: 3b9f6e21c5d7
+Create Date: 2026-10-18 12:21:06.418733
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '5e0a7c93d21f'
+down_revision: Union[str, None] = '3b9f6e21c5d7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('import_jobs',
+    sa.Column('id', sa.UUID(as_uuid=True), nullable=False),
+    sa.Column('userId', sa.UUID(as_uuid=True), nullable=True),
+    sa.Column('createdBy', sa.UUID(as_uuid=True), nullable=True),
+    sa.Column('filename', sa.String(), nullable=True),
+    sa.Column('path', sa.String(), nullable=False),
+    sa.Column('status', sa.String(), nullable=False),
+    sa.Column('chunkSize', sa.Integer(), nullable=False),
+    sa.Column('chunksCommitted', sa.Integer(), nullable=False),
+    sa.Column('rowsImported', sa.Integer(), nullable=False),
+    sa.Column('rowsRejected', sa.Integer(), nullable=False),
+    sa.Column('errors', sa.JSON(), nullable=False),
+    sa.Column('error', sa.String(), nullable=True),
+    sa.Column('createdAt', sa.DateTime(), nullable=True),
+    sa.Column('startedAt', sa.DateTime(), nullable=True),
+    sa.Column('finishedAt', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['createdBy'], ['users.id'], ),
+    sa.ForeignKeyConstraint(['userId'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_import_jobs_status', 'import_jobs', ['status'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_import_jobs_status', table_name='import_jobs')
+    op.drop_table('import_jobs')
@@ -0,0 +1,68 @@
+"""transaction currency
+
+Revision ID: 7d3b5f0e9a12
+Revises: c62e9a1f4d08
+Create Date: 2026-10-18 16:35:27.801644
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '7d3b5f0e9a12'
+down_revision: Union[str, None] = 'c62e9a1f4d08'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _create_monthly_rollups(with_currency: bool) -> None:
+    currency = ['currency'] if with_currency else []
+    op.create_table('monthly_rollups',
+    sa.Column('userId', sa.UUID(as_uuid=True), nullable=False),
+    sa.Column('year', sa.Integer(), nullable=False),
+    sa.Column('month', sa.Integer(), nullable=False),
+    sa.Column('transactionType', sa.String(), nullable=False),
+    sa.Column('category', sa.String(), nullable=False),
+    *([sa.Column('currency', sa.String(), nullable=False)] if with_currency else []),
+    sa.Column('totalAmount', sa.Float(), nullable=False),
+    sa.Column('transactionCount', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['userId'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('userId', 'year', 'month', 'transactionType', 'category', *currency)
+    )
+    columns = ''.join(f', "{column}"' for column in currency)
+    op.execute(
+        f"""
+        INSERT INTO monthly_rollups (
+            "userId", year, month, "transactionType", category{columns},
+            "totalAmount", "transactionCount"
+        )
+        SELECT
+            "userId",
+            CAST(STRFTIME('%Y', "transactionDate") AS INTEGER),
+            CAST(STRFTIME('%m', "transactionDate") AS INTEGER),
+            "transactionType",
+            category{columns},
+            SUM(amount),
+            COUNT(id)
+        FROM transactions
+        WHERE "userId" IS NOT NULL
+        GROUP BY "userId", 2, 3, "transactionType", category{columns}
+        """
+    )
+
+
+def upgrade() -> None:
+    # Existing transactions are in the default currency.
+    op.add_column('transactions', sa.Column('currency', sa.String(), server_default='USD', nullable=False))
+    # The currency joins the rollup primary key, so rollups are rebuilt.
+    op.drop_table('monthly_rollups')
+    _create_monthly_rollups(with_currency=True)
+
+
+def downgrade() -> None:
+    op.drop_table('monthly_rollups')
+    with op.batch_alter_table('transactions') as batch_op:
+        batch_op.drop_column('currency')
+    _create_monthly_rollups(with_currency=False)
@@ -0,0 +1,55 @@
+"""monthly rollups
+
+Revision ID: 8d1c2b7e4a90
+Revises: f3574a5b4062
+Create Date: 2026-10-18 10:12:41.218305
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '8d1c2b7e4a90'
+down_revision: Union[str, None] = 'f3574a5b4062'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('monthly_rollups',
+    sa.Column('userId', sa.UUID(as_uuid=True), nullable=False),
+    sa.Column('year', sa.Integer(), nullable=False),
+    sa.Column('month', sa.Integer(), nullable=False),
+    sa.Column('transactionType', sa.String(), nullable=False),
+    sa.Column('category', sa.String(), nullable=False),
+    sa.Column('totalAmount', sa.Float(), nullable=False),
+    sa.Column('transactionCount', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['userId'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('userId', 'year', 'month', 'transactionType', 'category')
+    )
+    # Backfill rollups from the existing transactions.
+    op.execute(
+        """
+        INSERT INTO monthly_rollups (
+            "userId", year, month, "transactionType", category,
+            "totalAmount", "transactionCount"
+        )
+        SELECT
+            "userId",
+            CAST(STRFTIME('%Y', "transactionDate") AS INTEGER),
+            CAST(STRFTIME('%m', "transactionDate") AS INTEGER),
+            "transactionType",
+            category,
+            SUM(amount),
+            COUNT(id)
+        FROM transactions
+        WHERE "userId" IS NOT NULL
+        GROUP BY 1, 2, 3, 4, 5
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('monthly_rollups')
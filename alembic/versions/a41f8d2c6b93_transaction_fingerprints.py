@@ -0,0 +1,33 @@
+"""transaction fingerprints
+
+Revision ID: a41f8d2c6b93
+Revises: 5e0a7c93d21f
+Create Date: 2026-10-18 13:02:55.107264
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'a41f8d2c6b93'
+down_revision: Union[str, None] = '5e0a7c93d21f'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Existing transactions keep a NULL fingerprint, only rows imported
+    # from now on are deduplicated.
+    op.add_column('transactions', sa.Column('fingerprint', sa.String(), nullable=True))
+    op.create_index('ix_transactions_fingerprint', 'transactions', ['fingerprint'], unique=True)
+    op.add_column('import_jobs', sa.Column('rowsDuplicate', sa.Integer(), server_default='0', nullable=False))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('import_jobs') as batch_op:
+        batch_op.drop_column('rowsDuplicate')
+    op.drop_index('ix_transactions_fingerprint', table_name='transactions')
+    with op.batch_alter_table('transactions') as batch_op:
+        batch_op.drop_column('fingerprint')
@@ -0,0 +1,55 @@
+"""exchange rates base
+
+Revision ID: b7d2f4a91c05
+Revises: e5c81b4f7a36
+Create Date: 2026-10-18 21:12:40.118402
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7d2f4a91c05'
+down_revision: Union[str, None] = 'e5c81b4f7a36'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Rates used to be fetched relative to EUR but stored as USD based.
+    # Such rows have a EUR rate of 1 rather than a USD rate of 1, and are
+    # relabelled, or deleted to be fetched again if EUR is not a symbol.
+    exchange_rates = sa.table(
+        'exchange_rates',
+        sa.column('id', sa.UUID(as_uuid=True)),
+        sa.column('base', sa.String()),
+        sa.column('rates', sa.JSON()),
+    )
+    symbols = sa.table('exchange_rate_symbols', sa.column('symbol', sa.String()))
+    bind = op.get_bind()
+    has_eur = bind.execute(
+        sa.select(symbols.c.symbol).where(symbols.c.symbol == 'EUR')
+    ).first() is not None
+    rows = bind.execute(
+        sa.select(exchange_rates.c.id, exchange_rates.c.rates).where(exchange_rates.c.base == 'USD')
+    ).all()
+    mislabelled = [
+        row.id
+        for row in rows
+        if (row.rates or {}).get('EUR') == 1 and (row.rates or {}).get('USD') != 1
+    ]
+    if not mislabelled:
+        return
+    if has_eur:
+        op.execute(
+            exchange_rates.update().where(exchange_rates.c.id.in_(mislabelled)).values(base='EUR')
+        )
+    else:
+        op.execute(exchange_rates.delete().where(exchange_rates.c.id.in_(mislabelled)))
+
+
+def downgrade() -> None:
+    # Relabelled rows are correct either way.
+    pass
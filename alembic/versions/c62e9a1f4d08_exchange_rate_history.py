@@ -0,0 +1,35 @@
+"""exchange rate history
+
+Revision ID: c62e9a1f4d08
+Revises: a41f8d2c6b93
+Create Date: 2026-10-18 15:47:12.530918
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'c62e9a1f4d08'
+down_revision: Union[str, None] = 'a41f8d2c6b93'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # The history starts with the next refresh, older rates can be
+    # fetched with backfill_exchange_rate_history.
+    op.create_table('exchange_rate_history',
+    sa.Column('date', sa.Date(), nullable=False),
+    sa.Column('base', sa.String(), nullable=False),
+    sa.Column('symbols', sa.String(), nullable=False),
+    sa.Column('rates', sa.LargeBinary(), nullable=False),
+    sa.Column('last_updated', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['base'], ['exchange_rate_symbols.symbol'], ),
+    sa.PrimaryKeyConstraint('date', 'base')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('exchange_rate_history')
@@ -0,0 +1,108 @@
+"""amount cents
+
+Revision ID: e5c81b4f7a36
+Revises: 7d3b5f0e9a12
+Create Date: 2026-10-18 18:02:14.530917
+
+"""
+from decimal import ROUND_HALF_EVEN, Decimal
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'e5c81b4f7a36'
+down_revision: Union[str, None] = '7d3b5f0e9a12'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BATCH_SIZE = 10000
+
+
+def _to_cents(amount: float) -> int:
+    # Same rounding as khazana.transactions.utils.money.to_cents, so
+    # migrated and newly created amounts get the same cents.
+    return int((Decimal(str(amount)) * 100).to_integral_value(rounding=ROUND_HALF_EVEN))
+
+
+def _convert_amounts() -> None:
+    transactions = sa.table(
+        'transactions',
+        sa.column('id', sa.UUID(as_uuid=True)),
+        sa.column('amount', sa.Float()),
+        sa.column('amountCents', sa.BigInteger()),
+    )
+    set_cents = (
+        transactions.update()
+        .where(transactions.c.id == sa.bindparam('rowId'))
+        .values(amountCents=sa.bindparam('cents'))
+    )
+    bind = op.get_bind()
+    last_id = None
+    while True:
+        batch = sa.select(transactions.c.id, transactions.c.amount).order_by(transactions.c.id).limit(BATCH_SIZE)
+        if last_id is not None:
+            batch = batch.where(transactions.c.id > last_id)
+        rows = bind.execute(batch).all()
+        if not rows:
+            break
+        bind.execute(set_cents, [{'rowId': row.id, 'cents': _to_cents(row.amount)} for row in rows])
+        last_id = rows[-1].id
+
+
+def _create_monthly_rollups(total: str, total_type: sa.types.TypeEngine, amount: str) -> None:
+    op.create_table('monthly_rollups',
+    sa.Column('userId', sa.UUID(as_uuid=True), nullable=False),
+    sa.Column('year', sa.Integer(), nullable=False),
+    sa.Column('month', sa.Integer(), nullable=False),
+    sa.Column('transactionType', sa.String(), nullable=False),
+    sa.Column('category', sa.String(), nullable=False),
+    sa.Column('currency', sa.String(), nullable=False),
+    sa.Column(total, total_type, nullable=False),
+    sa.Column('transactionCount', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['userId'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('userId', 'year', 'month', 'transactionType', 'category', 'currency')
+    )
+    op.execute(
+        f"""
+        INSERT INTO monthly_rollups (
+            "userId", year, month, "transactionType", category, currency,
+            "{total}", "transactionCount"
+        )
+        SELECT
+            "userId",
+            CAST(STRFTIME('%Y', "transactionDate") AS INTEGER),
+            CAST(STRFTIME('%m', "transactionDate") AS INTEGER),
+            "transactionType",
+            category,
+            currency,
+            SUM({amount}),
+            COUNT(id)
+        FROM transactions
+        WHERE "userId" IS NOT NULL
+        GROUP BY "userId", 2, 3, "transactionType", category, currency
+        """
+    )
+
+
+def upgrade() -> None:
+    op.add_column('transactions', sa.Column('amountCents', sa.BigInteger(), nullable=True))
+    # Round to the nearest cent, so float noise such as 0.1 + 0.2 is dropped.
+    _convert_amounts()
+    with op.batch_alter_table('transactions') as batch_op:
+        batch_op.alter_column('amountCents', existing_type=sa.BigInteger(), nullable=False)
+        batch_op.drop_column('amount')
+    # Rollup totals are summed again from the exact cents.
+    op.drop_table('monthly_rollups')
+    _create_monthly_rollups('totalCents', sa.BigInteger(), '"amountCents"')
+
+
+def downgrade() -> None:
+    op.add_column('transactions', sa.Column('amount', sa.Float(), nullable=True))
+    op.execute('UPDATE transactions SET amount = "amountCents" / 100.0')
+    with op.batch_alter_table('transactions') as batch_op:
+        batch_op.alter_column('amount', existing_type=sa.Float(), nullable=False)
+        batch_op.drop_column('amountCents')
+    op.drop_table('monthly_rollups')
+    _create_monthly_rollups('totalAmount', sa.Float(), 'amount')
@@ -0,0 +1,112 @@
+"""Helpers to load test the app served by uvicorn."""
+
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional
+
+import httpx
+import numpy as np
+
+PASSWORD = "Bench@1234"
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@contextmanager
+def serve(env: Optional[Dict[str, str]] = None) -> Iterator[str]:
+    """Serve the app on a scratch database in a separate process.
+
+    The load generator then does not compete with the server for the
+    GIL.
+
+    Args:
+        env (dict, optional): Extra environment of the server.
+
+    Yields:
+        str: Base URL of the server.
+    """
+    port = _free_port()
+    base_url = f"http://127.0.0.1:{port}"
+    env = dict(os.environ, PYTHONPATH=os.getcwd(), **(env or {}))
+    with tempfile.TemporaryDirectory() as directory:
+        # The default database is relative to the working directory.
+        server = subprocess.Popen(
+            [
+                sys.executable,
+                "-m",
+                "uvicorn",
+                "khazana.core.apis.main:app",
+                "--port",
+                str(port),
+                "--log-level",
+                "warning",
+            ],
+            cwd=directory,
+            env=env,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        try:
+            while True:
+                try:
+                    httpx.get(f"{base_url}/api/docs")
+                    break
+                except httpx.TransportError:
+                    time.sleep(0.1)
+            yield base_url
+        finally:
+            server.terminate()
+            server.wait()
+
+
+async def login(client: httpx.AsyncClient) -> dict:
+    """Set the admin password on first login and get auth headers."""
+    token = (
+        await client.post(
+            "/api/auth", data={"username": "admin", "password": "admin"}
+        )
+    ).json()["access_token"]
+    await client.patch(
+        "/api/users/change_password",
+        headers={"Authorization": f"Bearer {token}"},
+        json={
+            "oldPassword": "admin",
+            "newPassword": PASSWORD,
+            "emailAddress": "admin@example.com",
+        },
+    )
+    token = (
+        await client.post(
+            "/api/auth", data={"username": "admin", "password": PASSWORD}
+        )
+    ).json()["access_token"]
+    return {"Authorization": f"Bearer {token}"}
+
+
+def statement(rows: int, offset: int = 0) -> str:
+    """Generate a CSV statement of unique transactions."""
+    lines = ["description,amount,category,transactionDate"]
+    lines.extend(
+        f"Bench {offset + row},{row % 200 - 100},Misc,2020-01-01"
+        for row in range(rows)
+    )
+    return "\n".join(lines)
+
+
+def report(name: str, latencies: np.ndarray) -> None:
+    """Print latency percentiles in milliseconds."""
+    p50, p99 = np.percentile(latencies, [50, 99])
+    print(
+        f"{name:<12} requests: {len(latencies):>6}  "
+        f"p50: {p50:7.2f}ms  p99: {p99:7.2f}ms  "
+        f"max: {latencies.max():7.2f}ms"
+    )
@@ -0,0 +1,106 @@
+"""Benchmark re-importing an already imported statement.
+
+Imports a generated statement into a scratch SQLite database twice. The
+second import only finds duplicates, so it should cost close to a read
+only pass over the file::
+
+    python -m benchmarks.bench_import_dedup --rows 500000 --format parquet
+"""
+
+import argparse
+import io
+import os
+import tempfile
+import time
+from uuid import uuid4
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from khazana.core.database import DBBaseModel
+from khazana.core.models import UserDB  # noqa: F401
+from khazana.transactions.models import TransactionDB
+from khazana.transactions.utils import TransactionFileFormat
+from khazana.transactions.utils.imports import import_transactions
+
+
+def _statement(rows: int, file_format: TransactionFileFormat) -> bytes:
+    rng = np.random.default_rng(0)
+    dates = pd.Timestamp("2020-01-01") + pd.to_timedelta(
+        rng.integers(0, 4 * 365 * 24 * 3600, rows), unit="s"
+    )
+    statement = pd.DataFrame(
+        {
+            "description": [f"Merchant {i}" for i in range(rows)],
+            "amount": rng.normal(0, 100, rows).round(2),
+            "category": rng.choice(["Food", "Rent", "Travel"], rows),
+            "transactionDate": dates,
+            "transactionType": "",
+        }
+    )
+    if file_format == TransactionFileFormat.csv:
+        return statement.to_csv(index=False).encode()
+    buffer = io.BytesIO()
+    if file_format == TransactionFileFormat.parquet:
+        statement.to_parquet(buffer, index=False, compression="zstd")
+    else:
+        statement.to_feather(buffer, compression="zstd")
+    return buffer.getvalue()
+
+
+def main():
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=500_000)
+    parser.add_argument(
+        "--format",
+        type=TransactionFileFormat,
+        default=TransactionFileFormat.csv,
+        choices=list(TransactionFileFormat),
+    )
+    args = parser.parse_args()
+
+    statement = _statement(args.rows, args.format)
+    with tempfile.TemporaryDirectory() as directory:
+        engine = create_engine(
+            f"sqlite:///{os.path.join(directory, 'bench.db')}"
+        )
+        DBBaseModel.metadata.create_all(bind=engine)
+        session = sessionmaker(bind=engine)
+        user_id = uuid4()
+
+        timings = []
+        for _ in range(2):
+            with session() as db:
+                start = time.perf_counter()
+                report = import_transactions(
+                    db,
+                    io.BytesIO(statement),
+                    user_id,
+                    user_id,
+                    file_format=args.format,
+                )
+                timings.append(
+                    (time.perf_counter() - start, report.imported,
+                     report.duplicates)
+                )
+        with session() as db:
+            stored = db.query(TransactionDB).count()
+        engine.dispose()
+
+    assert stored == args.rows
+    print(f"rows:      {args.rows}")
+    print(f"size:      {len(statement) / 1e6:.1f} MB ({args.format.value})")
+    for name, (seconds, imported, duplicates) in zip(
+        ["import:", "re-import:"], timings
+    ):
+        print(
+            f"{name:<10} {seconds:.3f}s "
+            f"({imported} new, {duplicates} duplicates)"
+        )
+
+
+if __name__ == "__main__":
+    main()
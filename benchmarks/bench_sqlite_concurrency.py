@@ -0,0 +1,116 @@
+"""Benchmark dashboard reads alongside bulk writes on SQLite.
+
+Runs N readers on ``GET /api/transactions/dashboard`` and M writers
+importing CSV files, first with SQLite's default journal and pragmas,
+then with the tuned defaults of ``khazana.core.database``. Writes
+invalidate the dashboard cache, so most reads go to the database. Use
+``--endpoint`` to read another route, e.g. ``/api/transactions``::
+
+    python -m benchmarks.bench_sqlite_concurrency --readers 8 --writers 2
+"""
+
+import argparse
+import asyncio
+import time
+from itertools import count
+
+import httpx
+import numpy as np
+
+from ._server import login, report, serve, statement
+
+CONFIGS = {
+    "default": {
+        "SQLITE_JOURNAL_MODE": "DELETE",
+        "SQLITE_SYNCHRONOUS": "FULL",
+        "SQLITE_MMAP_SIZE": "0",
+        "SQLITE_CACHE_SIZE": "-2000",
+        "SQLITE_BUSY_TIMEOUT_MS": "5000",
+    },
+    "tuned": {},
+}
+
+
+async def _run(base_url: str, args) -> None:
+    timeout = httpx.Timeout(120.0)
+    async with httpx.AsyncClient(base_url=base_url, timeout=timeout) as client:
+        headers = await login(client)
+        # Seed some history so dashboard reads have work to do.
+        await client.post(
+            "/api/transactions/bulk/admin",
+            headers=headers,
+            files={
+                "transaction_file": (
+                    "seed.csv", statement(args.rows), "text/csv"
+                )
+            },
+        )
+
+        deadline = time.perf_counter() + args.seconds
+        latencies, read_errors = [], []
+        imported, write_errors = [], []
+        counter = count(1)
+
+        async def reader():
+            while time.perf_counter() < deadline:
+                start = time.perf_counter()
+                response = await client.get(args.endpoint, headers=headers)
+                latencies.append(time.perf_counter() - start)
+                if response.status_code != 200:
+                    read_errors.append(response.status_code)
+
+        async def writer():
+            while time.perf_counter() < deadline:
+                index = next(counter)
+                response = await client.post(
+                    "/api/transactions/bulk/admin",
+                    headers=headers,
+                    files={
+                        "transaction_file": (
+                            "bench.csv",
+                            statement(args.rows, index * args.rows),
+                            "text/csv",
+                        )
+                    },
+                )
+                if response.status_code == 200:
+                    imported.append(response.json()["imported"])
+                else:
+                    write_errors.append(response.status_code)
+
+        start = time.perf_counter()
+        await asyncio.gather(
+            *(reader() for _ in range(args.readers)),
+            *(writer() for _ in range(args.writers)),
+        )
+        elapsed = time.perf_counter() - start
+
+    report("  reads:", np.array(latencies) * 1000)
+    print(
+        f"  reads/s: {len(latencies) / elapsed:8.1f}  "
+        f"errors: {len(read_errors)}"
+    )
+    print(
+        f"  rows written/s: {sum(imported) / elapsed:8.1f}  "
+        f"errors: {len(write_errors)}"
+    )
+
+
+def main():
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--readers", type=int, default=8)
+    parser.add_argument("--writers", type=int, default=2)
+    parser.add_argument("--rows", type=int, default=1000)
+    parser.add_argument("--endpoint", default="/api/transactions/dashboard")
+    args = parser.parse_args()
+
+    for name, env in CONFIGS.items():
+        print(f"{name}:")
+        with serve(env) as base_url:
+            asyncio.run(_run(base_url, args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""Benchmark transaction type classification of a bulk import.
+
+Compares the vectorized classification against the previous row-wise
+``DataFrame.apply(axis=1)`` implementation::
+
+    python -m benchmarks.bench_transaction_types --rows 1000000
+"""
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from khazana.transactions.utils import (
+    TransactionType,
+    select_transaction_types,
+)
+
+
+def _select_transaction_type_rowwise(record):
+    """Classify a row, as the bulk import used to."""
+    if not record["transactionType"]:
+        transaction_type = TransactionType.expense.value
+    else:
+        transaction_type = record["transactionType"].lower()
+    transaction_type = TransactionType(transaction_type).value
+    if (
+        record["amount"] < 0
+        and transaction_type != TransactionType.investment.value
+    ):
+        transaction_type = TransactionType.expense.value
+    elif (
+        record["amount"] > 0
+        and transaction_type != TransactionType.investment.value
+    ):
+        transaction_type = TransactionType.income.value
+    return transaction_type
+
+
+def main():
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    transactions = pd.DataFrame(
+        {
+            "amount": rng.normal(0, 100, args.rows).round(2),
+            "transactionType": rng.choice(
+                ["expense", "Income", "investment", ""], args.rows
+            ),
+        }
+    )
+
+    start = time.perf_counter()
+    rowwise = transactions.apply(_select_transaction_type_rowwise, axis=1)
+    rowwise_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    vectorized, invalid = select_transaction_types(
+        transactions["amount"], transactions["transactionType"]
+    )
+    vectorized_seconds = time.perf_counter() - start
+
+    assert not len(invalid)
+    assert rowwise.equals(vectorized)
+    print(f"rows:       {args.rows}")
+    print(f"row-wise:   {rowwise_seconds:.3f}s")
+    print(f"vectorized: {vectorized_seconds:.3f}s")
+    print(f"speedup:    {rowwise_seconds / vectorized_seconds:.0f}x")
+
+
+if __name__ == "__main__":
+    main()
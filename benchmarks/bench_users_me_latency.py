@@ -0,0 +1,139 @@
+"""Load test ``GET /api/users/me`` latency while bulk writes run.
+
+Measures the latency of concurrent ``/api/users/me`` calls on an idle
+server, then again while other clients keep signing up users and
+importing CSV files. The imports are sent to the measured server, then
+to a second server process on the same database, as they would be with
+a separate import worker::
+
+    python -m benchmarks.bench_users_me_latency --seconds 10
+"""
+
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+from itertools import count
+from typing import Tuple
+
+import httpx
+import numpy as np
+
+from ._server import PASSWORD, login, report, serve, statement
+
+
+async def _measure(client, headers, seconds, concurrency) -> np.ndarray:
+    latencies = []
+    deadline = time.perf_counter() + seconds
+
+    async def reader():
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            response = await client.get("/api/users/me", headers=headers)
+            latencies.append(time.perf_counter() - start)
+            assert response.status_code == 200
+
+    await asyncio.gather(*(reader() for _ in range(concurrency)))
+    return np.array(latencies) * 1000
+
+
+async def _write(
+    client, import_client, headers, stop, rows, counter, writes
+):
+    while not stop.is_set():
+        index = next(counter)
+        await client.post(
+            "/api/users/signup",
+            json={
+                "fullName": "Bench User",
+                "username": f"bench{index}",
+                "password": PASSWORD,
+                "emailAddress": f"bench{index}@example.com",
+            },
+        )
+        await import_client.post(
+            "/api/transactions/bulk/admin",
+            headers=headers,
+            files={
+                "transaction_file": (
+                    "bench.csv",
+                    statement(rows, index * rows),
+                    "text/csv",
+                )
+            },
+        )
+        writes.append(index)
+
+
+async def _measure_writes(
+    client, import_client, headers, args, counter
+) -> Tuple[np.ndarray, int]:
+    stop, writes = asyncio.Event(), []
+    writers = [
+        asyncio.create_task(
+            _write(
+                client,
+                import_client,
+                headers,
+                stop,
+                args.rows,
+                counter,
+                writes,
+            )
+        )
+        for _ in range(args.writers)
+    ]
+    latencies = await _measure(client, headers, args.seconds, args.concurrency)
+    stop.set()
+    await asyncio.gather(*writers)
+    return latencies, len(writes)
+
+
+async def _run(base_url: str, import_url: str, args) -> None:
+    timeout = httpx.Timeout(60.0)
+    async with httpx.AsyncClient(
+        base_url=base_url, timeout=timeout
+    ) as client, httpx.AsyncClient(
+        base_url=import_url, timeout=timeout
+    ) as import_client:
+        headers = await login(client)
+        report(
+            "idle:",
+            await _measure(client, headers, args.seconds, args.concurrency),
+        )
+
+        counter = count()
+        for name, target in [
+            ("same process:", client),
+            ("separate:", import_client),
+        ]:
+            latencies, writes = await _measure_writes(
+                client, target, headers, args, counter
+            )
+            report(name, latencies)
+            print(f"write rounds completed: {writes}")
+
+
+def main():
+    """Run the load test."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--writers", type=int, default=4)
+    parser.add_argument("--rows", type=int, default=5000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        # Both servers share a database, the second one only imports.
+        env = {
+            "DATABASE_URL": (
+                f"sqlite:///{os.path.join(directory, 'bench.db')}"
+            )
+        }
+        with serve(env) as base_url, serve(env) as import_url:
+            asyncio.run(_run(base_url, import_url, args))
+
+
+if __name__ == "__main__":
+    main()
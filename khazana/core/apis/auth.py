@@ -1,15 +1,16 @@
 """Authentication related Endpoints."""
 
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from khazana.core.database import get_db
+from khazana.core.database import get_async_db
 from khazana.core.models import UserDB
 from khazana.core.serializers import OAuth2PasswordRequestForm
 from khazana.core.utils import (
     create_access_token,
     is_weak_password,
-    verify_password,
+    verify_and_update_password,
 )
 
 router = APIRouter()
@@ -20,25 +21,28 @@ router = APIRouter()
     tags=["Authentication"],
     description="Get authentication token.",
 )
-def get_token(
+async def get_token(
     form_data: OAuth2PasswordRequestForm = Depends(),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """Get authentication token."""
     password_policy_violation = False
     if form_data.username and form_data.password:
-        user: UserDB = (
-            db.query(UserDB)
-            .filter(
-                UserDB.username == form_data.username
-            )
-            .first()
+        user: UserDB = await db.scalar(
+            select(UserDB).where(UserDB.username == form_data.username)
         )
         if not user or not user.active:
             raise HTTPException(401, "Incorrect username or password or user disabled.")
 
-        if not verify_password(form_data.password, user.hashed_password):
+        verified, new_hash = await verify_and_update_password(
+            form_data.password, user.hashed_password
+        )
+        if not verified:
             raise HTTPException(401, "Incorrect username or password.")
+        if new_hash:
+            # Stored with another cost than configured; upgrade it.
+            user.hashed_password = new_hash
+            await db.commit()
         password_policy_violation = is_weak_password(form_data.password)
     else:
         raise HTTPException(401, "Incorrect username or password.")
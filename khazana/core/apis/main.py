@@ -1,18 +1,32 @@
 """Main API module."""
 
+import asyncio
 import os
-from contextlib import asynccontextmanager
+from contextlib import asynccontextmanager, suppress
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from passlib.context import CryptContext
 from pydantic import BaseModel
 
-from khazana.core.database import DBBaseModel, SessionLocal, engine
+from khazana.core.database import (
+    DBBaseModel,
+    SessionLocal,
+    async_engine,
+    engine,
+)
 from khazana.core.models import UserDB
+from khazana.core.utils import get_password_hash
 
 from ...exchange_rates import apis as exchange_rates_router
+from ...exchange_rates.utils import (
+    get_exchange_rates_provider,
+    prefetch_exchange_rates,
+)
 from ...transactions import apis as transactions_router
+from ...transactions.utils.import_jobs import (
+    start_import_workers,
+    stop_import_workers,
+)
 from . import auth, users
 
 
@@ -40,19 +54,26 @@ async def lifespan(app: FastAPI):
     with SessionLocal() as db:
         user = db.query(UserDB).filter(UserDB.username == "admin").first()
         if not user:
-            pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
             db.add(
                 UserDB(
                     username="admin",
                     fullName="Super User",
-                    hashed_password=pwd_context.hash("admin"),
+                    hashed_password=get_password_hash("admin"),
                     scopes="admin,me,transaction_read,transaction_write",
                     firstLogin=True,
                     active=True,
                 )
             )
             db.commit()
+    start_import_workers()
+    prefetch = asyncio.create_task(prefetch_exchange_rates())
     yield
+    prefetch.cancel()
+    with suppress(asyncio.CancelledError):
+        await prefetch
+    get_exchange_rates_provider().close()
+    await asyncio.to_thread(stop_import_workers)
+    await async_engine.dispose()
 
 
 app = FastAPI(
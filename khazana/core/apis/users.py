@@ -3,9 +3,10 @@
 from typing import List
 
 from fastapi import APIRouter, Depends, HTTPException, Security
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from khazana.core.database import get_db
+from khazana.core.database import get_async_db
 from khazana.core.models import UserDB
 from khazana.core.serializers import (
     ChangePasswordIn,
@@ -17,10 +18,11 @@ from khazana.core.serializers import (
 from khazana.core.utils import (
     get_current_user,
     get_current_user_first_login,
-    get_password_hash,
+    get_password_hash_async,
+    invalidate_principal,
     is_admin,
     is_exising_user,
-    verify_password,
+    verify_and_update_password,
 )
 
 router = APIRouter(prefix="/users", tags=["Users"])
@@ -29,7 +31,7 @@ router = APIRouter(prefix="/users", tags=["Users"])
 @router.get("", description="Get list of users.", response_model=List[UserOut])
 async def get_users(
     user: UserDB = Security(get_current_user, scopes=["me"]),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ) -> List[UserOut]:
     """List users."""
     filters = [UserDB.username.notin_(["admin", user.username])]
@@ -37,7 +39,9 @@ async def get_users(
         filters.append(UserDB.createdBy == user.id)
     return [
         UserOut(**user.__dict__)
-        for user in db.query(UserDB).filter(*filters, UserDB.active == True).all()
+        for user in await db.scalars(
+            select(UserDB).where(*filters, UserDB.active == True)
+        )
     ]
 
 
@@ -48,7 +52,7 @@ async def get_users(
 )
 async def get_me(
     user: UserDB = Security(get_current_user, scopes=["me"]),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ) -> UserOut:
     """Get user by username."""
     return UserOut(**user.__dict__)
@@ -62,10 +66,10 @@ async def get_me(
 async def post_user(
     user: UserIn,
     loggedin_user: UserDB = Security(get_current_user, scopes=["me"]),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ) -> UserOut:
     """Create new user."""
-    if is_exising_user(
+    if await is_exising_user(
         {"username": user.username, "emailAddress": user.emailAddress}, db
     ):
         raise HTTPException(400, "User with same username or email already exists.")
@@ -82,14 +86,14 @@ async def post_user(
         fullName=user.fullName,
         emailAddress=user.emailAddress,
         username=user.username,
-        hashed_password=get_password_hash(user.password),
+        hashed_password=await get_password_hash_async(user.password),
         scopes=",".join(user.scopes),
         firstLogin=True,
         createdBy=loggedin_user.id,
     )
     db.add(user)
-    db.commit()
-    db.refresh(user)
+    await db.commit()
+    await db.refresh(user)
     return UserOut(**user.__dict__)
 
 
@@ -100,10 +104,10 @@ async def post_user(
 )
 async def signup_new_user(
     user: UserSignupIn,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ) -> UserOut:
     """Create new user."""
-    if is_exising_user(
+    if await is_exising_user(
         {"username": user.username, "emailAddress": user.emailAddress}, db
     ):
         raise HTTPException(400, "User with same username or email already exists.")
@@ -111,13 +115,13 @@ async def signup_new_user(
         fullName=user.fullName,
         emailAddress=user.emailAddress,
         username=user.username,
-        hashed_password=get_password_hash(user.password),
+        hashed_password=await get_password_hash_async(user.password),
         scopes=",".join(["me"]),
         firstLogin=False,
     )
     db.add(user)
-    db.commit()
-    db.refresh(user)
+    await db.commit()
+    await db.refresh(user)
     return UserOut(**user.__dict__)
 
 
@@ -128,19 +132,25 @@ async def signup_new_user(
 async def change_password(
     password_change: ChangePasswordIn,
     user: UserDB = Security(get_current_user_first_login, scopes=["me"]),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ) -> UserOut:
     """Change password on first login."""
-    if not verify_password(password_change.oldPassword, user.hashed_password):
+    verified, _ = await verify_and_update_password(
+        password_change.oldPassword, user.hashed_password
+    )
+    if not verified:
         raise HTTPException(400, "Incorrect password.")
-    user = db.get(UserDB, user.id)
+    user = await db.get(UserDB, user.id)
     if user.firstLogin:
         user.firstLogin = False
-    user.hashed_password = get_password_hash(password_change.newPassword)
+    user.hashed_password = await get_password_hash_async(
+        password_change.newPassword
+    )
     user.emailAddress = password_change.emailAddress
     db.add(user)
-    db.commit()
-    db.refresh(user)
+    await db.commit()
+    await db.refresh(user)
+    invalidate_principal(user.username)
     return UserOut(**user.__dict__)
 
 
@@ -152,14 +162,14 @@ async def change_password(
 async def update_user(
     user_update: UserUpdate,
     user: UserDB = Security(get_current_user, scopes=["admin"]),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ) -> UserOut:
     """Update user."""
     if user_update.username == "admin" and "admin" not in user_update.scopes:
         raise HTTPException(403, "You can not update admin.")
 
-    user_requested = (
-        db.query(UserDB).filter(UserDB.username == user_update.username).first()
+    user_requested = await db.scalar(
+        select(UserDB).where(UserDB.username == user_update.username)
     )
     if not user_requested:
         raise HTTPException(status_code=404, detail="User not found")
@@ -169,8 +179,9 @@ async def update_user(
             value = ",".join(value)
         setattr(user_requested, key, value)
     db.add(user_requested)
-    db.commit()
-    db.refresh(user_requested)
+    await db.commit()
+    await db.refresh(user_requested)
+    invalidate_principal(user_requested.username)
     return UserOut(**user_requested.__dict__)
 
 
@@ -178,19 +189,20 @@ async def update_user(
 async def delete_user(
     username: str,
     user: UserDB = Security(get_current_user, scopes=["admin"]),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """Delete user."""
     if username == "admin":
         raise HTTPException(403, "You can not delete admin.")
-    user = (
-        db.query(UserDB)
-        .filter(UserDB.username == username, UserDB.active == True)
-        .first()
+    user = await db.scalar(
+        select(UserDB).where(
+            UserDB.username == username, UserDB.active == True
+        )
     )
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     user.active = False
-    db.commit()
-    db.refresh(user)
+    await db.commit()
+    await db.refresh(user)
+    invalidate_principal(user.username)
     return {"success": True}
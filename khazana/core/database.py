@@ -1,14 +1,153 @@
-"""Database configuration."""
+"""Database configuration.
 
-from sqlalchemy import create_engine
+The database is configured from the environment:
+
+- ``DATABASE_URL``: SQLAlchemy URL of the database.
+- ``ASYNC_DATABASE_URL``: URL used by async endpoints. Derived from
+  ``DATABASE_URL`` with the aiosqlite driver for SQLite.
+- ``READ_DATABASE_URL``: URL of a read replica used by read only
+  endpoints. Defaults to ``DATABASE_URL`` through a separate pool, whose
+  SQLite connections are opened with ``query_only``.
+- ``DB_POOL_SIZE``, ``DB_MAX_OVERFLOW``, ``DB_POOL_RECYCLE``,
+  ``DB_POOL_TIMEOUT``: Connection pool sizing.
+- ``SQLITE_JOURNAL_MODE``, ``SQLITE_SYNCHRONOUS``, ``SQLITE_MMAP_SIZE``,
+  ``SQLITE_CACHE_SIZE``, ``SQLITE_BUSY_TIMEOUT_MS``: Pragmas applied to
+  every new SQLite connection.
+"""
+
+import os
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./personal_finance.db")
+
+POOL_OPTIONS = {
+    "pool_size": int(os.getenv("DB_POOL_SIZE", "5")),
+    "max_overflow": int(os.getenv("DB_MAX_OVERFLOW", "10")),
+    "pool_recycle": int(os.getenv("DB_POOL_RECYCLE", "1800")),
+    "pool_timeout": float(os.getenv("DB_POOL_TIMEOUT", "30")),
+}
+
+# WAL lets readers run alongside a writer, and synchronous=NORMAL is
+# durable in WAL mode except for the last commits on power loss.
+SQLITE_PRAGMAS = {
+    "journal_mode": os.getenv("SQLITE_JOURNAL_MODE", "WAL"),
+    "synchronous": os.getenv("SQLITE_SYNCHRONOUS", "NORMAL"),
+    "mmap_size": int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024))),
+    # Negative values are in KiB.
+    "cache_size": int(os.getenv("SQLITE_CACHE_SIZE", str(-64 * 1024))),
+    "busy_timeout": int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000")),
+}
+
+
+def _async_url(url: str) -> str:
+    url = make_url(url)
+    if url.get_backend_name() == "sqlite" and url.get_driver_name() in (
+        "pysqlite",
+        "",
+    ):
+        url = url.set(drivername="sqlite+aiosqlite")
+    return url.render_as_string(hide_password=False)
+
+
+def _is_file_sqlite(url: str) -> bool:
+    url = make_url(url)
+    return url.get_backend_name() == "sqlite" and url.database not in (
+        None,
+        "",
+        ":memory:",
+    )
+
+
+def _set_sqlite_pragmas(dbapi_connection, connection_record) -> None:
+    cursor = dbapi_connection.cursor()
+    try:
+        for pragma, value in SQLITE_PRAGMAS.items():
+            cursor.execute(f"PRAGMA {pragma}={value}")
+    finally:
+        cursor.close()
+
+
+def _set_sqlite_query_only(dbapi_connection, connection_record) -> None:
+    cursor = dbapi_connection.cursor()
+    try:
+        cursor.execute("PRAGMA query_only=ON")
+    finally:
+        cursor.close()
+
 
-DATABASE_URL = "sqlite:///./personal_finance.db"
+def configure_engine(engine: Engine, read_only: bool = False) -> Engine:
+    """Apply the configured pragmas to new SQLite connections.
 
-engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False})
+    Args:
+        engine (Engine): Engine to configure.
+        read_only (bool): Reject writes on the engine's connections.
+    """
+    if engine.dialect.name == "sqlite":
+        event.listen(engine, "connect", _set_sqlite_pragmas)
+        if read_only:
+            event.listen(engine, "connect", _set_sqlite_query_only)
+    return engine
+
+
+def _engine_options(url: str) -> dict:
+    # In memory SQLite databases use a single connection pool.
+    if make_url(url).get_backend_name() == "sqlite" and not _is_file_sqlite(
+        url
+    ):
+        return {}
+    return dict(POOL_OPTIONS)
+
+
+def _create_engine(url: str, read_only: bool = False) -> Engine:
+    return configure_engine(
+        create_engine(
+            url,
+            connect_args=(
+                {"check_same_thread": False}
+                if url.startswith("sqlite")
+                else {}
+            ),
+            **_engine_options(url),
+        ),
+        read_only=read_only,
+    )
+
+
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL", _async_url(DATABASE_URL))
+READ_DATABASE_URL = os.getenv("READ_DATABASE_URL", DATABASE_URL)
+
+engine = _create_engine(DATABASE_URL)
 SessionLocal = sessionmaker(bind=engine, autocommit=False, autoflush=False)
 
+# Reads may lag behind the primary when READ_DATABASE_URL is a replica.
+read_engine = _create_engine(READ_DATABASE_URL, read_only=True)
+ReadSessionLocal = sessionmaker(
+    bind=read_engine, autocommit=False, autoflush=False
+)
+
+async_engine = create_async_engine(
+    ASYNC_DATABASE_URL,
+    # aiosqlite does not pool file connections unless asked to.
+    **(
+        {"poolclass": AsyncAdaptedQueuePool, **POOL_OPTIONS}
+        if _is_file_sqlite(ASYNC_DATABASE_URL)
+        else _engine_options(ASYNC_DATABASE_URL)
+    ),
+)
+configure_engine(async_engine.sync_engine)
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine,
+    autocommit=False,
+    autoflush=False,
+    expire_on_commit=False,
+)
+
 
 # Base Model for all new models we will define
 DBBaseModel = declarative_base()
@@ -21,3 +160,18 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+def get_read_db():
+    """Get read only database session."""
+    db = ReadSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+async def get_async_db():
+    """Get async database session."""
+    async with AsyncSessionLocal() as db:
+        yield db
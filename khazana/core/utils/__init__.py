@@ -6,9 +6,13 @@ from .auth_config import (
     get_current_user,
     get_current_user_first_login,
     get_password_hash,
+    get_password_hash_async,
+    invalidate_principal,
     is_admin,
     is_weak_password,
+    verify_and_update_password,
     verify_password,
 )
+from .cache import LRUCache
 from .users import is_exising_user
 from .const import EMAIL_REGEX
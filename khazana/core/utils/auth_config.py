@@ -1,21 +1,31 @@
 """Auth Config."""
 
+import asyncio
 import os
 import re
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
-from typing import Optional
+from typing import Optional, Tuple
 
 import jwt
 from fastapi import Depends, HTTPException
 from fastapi.security import OAuth2PasswordBearer, SecurityScopes
 from jwt import PyJWTError
 from passlib.context import CryptContext
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from khazana.core import PASSWORD_PATTERN
 
-from ..database import get_db
+from ..database import get_async_db
 from ..models.users import UserDB
+from .cache import LRUCache
+from .const import (
+    BCRYPT_ROUNDS,
+    PASSWORD_HASH_WORKERS,
+    PRINCIPAL_CACHE_MAX_ENTRIES,
+    PRINCIPAL_CACHE_TTL_SECONDS,
+)
 
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
 
@@ -29,6 +39,60 @@ oauth2_scheme = OAuth2PasswordBearer(
     },
 )
 
+# Pinning the min and max rounds flags hashes of any other cost for rehash.
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__rounds=BCRYPT_ROUNDS,
+    bcrypt__min_rounds=BCRYPT_ROUNDS,
+    bcrypt__max_rounds=BCRYPT_ROUNDS,
+)
+# Bounds concurrent bcrypt work and keeps it off the event loop.
+_hash_executor = ThreadPoolExecutor(
+    max_workers=PASSWORD_HASH_WORKERS, thread_name_prefix="password-hash"
+)
+
+# Maps a token to a snapshot of the column values of its active user.
+principal_cache = LRUCache(
+    max_entries=PRINCIPAL_CACHE_MAX_ENTRIES, ttl=PRINCIPAL_CACHE_TTL_SECONDS
+)
+
+
+def invalidate_principal(username: str) -> None:
+    """Drop cached principals of a user.
+
+    Must be called whenever a user is deactivated or their password or
+    scopes change.
+    """
+    principal_cache.invalidate_where(
+        lambda token, principal: principal["username"] == username
+    )
+
+
+async def _load_principal(
+    db: AsyncSession, token: str, username: str, expires_at: Optional[float]
+) -> Optional[dict]:
+    principal = principal_cache.get(token)
+    if principal is not None:
+        return principal
+    generation = principal_cache.generation
+    user = await db.scalar(
+        select(UserDB).where(
+            UserDB.username == username, UserDB.active == True
+        )
+    )
+    if not user:
+        return None
+    principal = {
+        column.key: getattr(user, column.key)
+        for column in UserDB.__table__.columns
+    }
+    ttl = PRINCIPAL_CACHE_TTL_SECONDS
+    if expires_at is not None:
+        ttl = min(ttl, expires_at - datetime.now(timezone.utc).timestamp())
+    principal_cache.set(token, principal, ttl=ttl, generation=generation)
+    return principal
+
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     """Create access token."""
@@ -43,10 +107,10 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
 
 
-def _get_current_user(
+async def _get_current_user(
     security_scopes: SecurityScopes,
     token: str,
-    db: Session,
+    db: AsyncSession,
     allow_on_first_login: bool = False,
 ) -> UserDB:
     """Get current user.
@@ -59,7 +123,8 @@ def _get_current_user(
         HTTPException: On authorization failure.
 
     Returns:
-        User: The owner of the token.
+        User: The owner of the token. It is built from the principal
+            cache and is not attached to the session.
     """
     # Secret key and algorithm for JWT
     SECRET_KEY = os.environ["JWT_SECRET"]
@@ -78,13 +143,12 @@ def _get_current_user(
         for scope in security_scopes.scopes:
             if scope not in scopes:
                 raise HTTPException(403, "Not enough permissions.")
-        user: UserDB = (
-            db.query(UserDB)
-            .filter(UserDB.username == username, UserDB.active == True)
-            .first()
+        principal = await _load_principal(
+            db, token, username, payload.get("exp")
         )
-        if not user:
+        if not principal:
             raise HTTPException(401, "Could not authenticate the user.")
+        user = UserDB(**principal)
         if user.firstLogin and not allow_on_first_login:
             raise HTTPException(401, "Change the password before using this endpoint.")
         return user
@@ -95,19 +159,19 @@ def _get_current_user(
 async def get_current_user(
     security_scopes: SecurityScopes,
     token: str = Depends(oauth2_scheme),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ) -> UserDB:
     """Get and validate the current user."""
-    return _get_current_user(security_scopes, token, db, allow_on_first_login=False)
+    return await _get_current_user(security_scopes, token, db, allow_on_first_login=False)
 
 
 async def get_current_user_first_login(
     security_scopes: SecurityScopes,
     token: str = Depends(oauth2_scheme),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ) -> UserDB:
     """Get and validate the current user and allow on first login."""
-    return _get_current_user(security_scopes, token, db, allow_on_first_login=True)
+    return await _get_current_user(security_scopes, token, db, allow_on_first_login=True)
 
 
 def is_weak_password(password):
@@ -126,16 +190,38 @@ def is_weak_password(password):
 
 def get_password_hash(password: str):
     """Hash the password using bcrypt algorithm."""
-    pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
     return pwd_context.hash(password)
 
 
 def verify_password(plain_password, hashed_password):
     """Check if passwords are matching."""
-    pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
     return pwd_context.verify(plain_password, hashed_password)
 
 
+async def get_password_hash_async(password: str) -> str:
+    """Hash the password on the hashing executor."""
+    return await asyncio.get_running_loop().run_in_executor(
+        _hash_executor, pwd_context.hash, password
+    )
+
+
+async def verify_and_update_password(
+    plain_password: str, hashed_password: str
+) -> Tuple[bool, Optional[str]]:
+    """Check the password on the hashing executor.
+
+    Returns:
+        Tuple: Whether the password matches, and a new hash to store when
+            the stored one was made with another cost.
+    """
+    return await asyncio.get_running_loop().run_in_executor(
+        _hash_executor,
+        pwd_context.verify_and_update,
+        plain_password,
+        hashed_password,
+    )
+
+
 def is_admin(user: UserDB) -> bool:
     """Check if the user is admin or not."""
     return "admin" in user.scopes.split(",")
@@ -0,0 +1,175 @@
+"""In-process caches."""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional
+
+
+class LRUCache:
+    """Thread-safe LRU cache with per entry TTL and a memory budget.
+
+    Args:
+        max_entries (int): Maximum number of entries kept.
+        ttl (float): Default time to live of an entry in seconds.
+        max_bytes (int, optional): Memory budget of all entries in bytes.
+        sizeof (Callable, optional): Get the size of a value in bytes.
+            Required for the memory budget to have any effect.
+        scope (Callable, optional): Get the invalidation scope of a key,
+            e.g. its user. Invalidating a scope only drops values being
+            computed for keys of that scope. Defaults to the key itself.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        ttl: float = 300.0,
+        max_bytes: Optional[int] = None,
+        sizeof: Optional[Callable[[Any], int]] = None,
+        scope: Optional[Callable[[Hashable], Hashable]] = None,
+    ):
+        """Initialize."""
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._sizeof = sizeof or (lambda value: 0)
+        self._scope = scope or (lambda key: key)
+        self._entries = OrderedDict()
+        self._bytes = 0
+        # Invalidations are numbered. Values computed before the last
+        # invalidation of their scope, or of every scope, are stale.
+        self._generation = 0
+        self._invalidated_all = 0
+        self._invalidated = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    @property
+    def generation(self) -> int:
+        """Get the invalidation generation.
+
+        Read it before computing a value and pass it to ``set`` so the
+        value is dropped if its scope was invalidated in the meantime.
+        """
+        return self._generation
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Get a value, or the default on a miss."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+            value, expires_at, _ = entry
+            if expires_at <= time.monotonic():
+                self._remove(key)
+                self.expirations += 1
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(
+        self,
+        key: Hashable,
+        value: Any,
+        ttl: Optional[float] = None,
+        generation: Optional[int] = None,
+    ) -> None:
+        """Store a value, evicting the least recently used entries."""
+        size = self._sizeof(value)
+        ttl = self.ttl if ttl is None else ttl
+        with self._lock:
+            if generation is not None and generation < max(
+                self._invalidated_all,
+                self._invalidated.get(self._scope(key), 0),
+            ):
+                return
+            if ttl <= 0 or (self.max_bytes and size > self.max_bytes):
+                return
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (value, time.monotonic() + ttl, size)
+            self._bytes += size
+            while len(self._entries) > self.max_entries or (
+                self.max_bytes and self._bytes > self.max_bytes
+            ):
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def invalidate(self, key: Hashable) -> None:
+        """Drop a single entry."""
+        with self._lock:
+            self._invalidate_scope(self._scope(key))
+            if key in self._entries:
+                self._remove(key)
+
+    def invalidate_scope(self, scope: Hashable) -> None:
+        """Drop every entry of a scope."""
+        with self._lock:
+            self._invalidate_scope(scope)
+            for key in [
+                key for key in self._entries if self._scope(key) == scope
+            ]:
+                self._remove(key)
+
+    def invalidate_where(
+        self, predicate: Callable[[Hashable, Any], bool]
+    ) -> None:
+        """Drop every entry matching the predicate.
+
+        Values being computed are dropped in every scope, as the
+        predicate can not tell which scopes they belong to.
+        """
+        with self._lock:
+            self._invalidate_all()
+            for key in [
+                key
+                for key, (value, _, _) in self._entries.items()
+                if predicate(key, value)
+            ]:
+                self._remove(key)
+
+    def clear(self) -> None:
+        """Drop every entry."""
+        with self._lock:
+            self._invalidate_all()
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> dict:
+        """Get cache counters."""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "maxEntries": self.max_entries,
+                "maxBytes": self.max_bytes,
+            }
+
+    def _invalidate_all(self) -> None:
+        self._generation += 1
+        self._invalidated_all = self._generation
+        self._invalidated.clear()
+
+    def _invalidate_scope(self, scope: Hashable) -> None:
+        self._generation += 1
+        self._invalidated[scope] = self._generation
+        self._invalidated.move_to_end(scope)
+        # Forgetting a scope invalidates every scope as of that point,
+        # so the bookkeeping stays bounded.
+        while len(self._invalidated) > self.max_entries:
+            _, generation = self._invalidated.popitem(last=False)
+            self._invalidated_all = max(self._invalidated_all, generation)
+
+    def _remove(self, key: Hashable) -> None:
+        _, _, size = self._entries.pop(key)
+        self._bytes -= size
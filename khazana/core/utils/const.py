@@ -1,3 +1,11 @@
 """Common constants."""
 
+import os
+
 EMAIL_REGEX = r"^[a-zA-Z]+[0-9._%+-]*@[a-zA-Z]+[0-9.-]*\.[a-zA-Z]{2,}$"
+# bcrypt cost factor. Stored hashes with another cost are rehashed on login.
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", "4"))
+PRINCIPAL_CACHE_MAX_ENTRIES = 10000
+# Bounds how long another worker process may serve a changed user.
+PRINCIPAL_CACHE_TTL_SECONDS = 5 * 60
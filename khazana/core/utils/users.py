@@ -1,15 +1,15 @@
 """User utils."""
 
-from sqlalchemy.orm import Session
-from sqlalchemy import or_
+from sqlalchemy import or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from ..models.users import UserDB
 
 
-def is_exising_user(user: dict, db: Session) -> bool:
+async def is_exising_user(user: dict, db: AsyncSession) -> bool:
     """Check if user exists."""
-    return True if (db.query(UserDB).filter(
+    return True if (await db.scalar(select(UserDB.id).where(
         or_(
             UserDB.username == user["username"],
             UserDB.emailAddress == user["emailAddress"],
         )
-    ).first()) else False
+    ).limit(1))) else False
@@ -1,84 +1,87 @@
 """Transaction related Endpoints."""
 
-from datetime import datetime, timedelta, timezone
 from typing import Dict, List, Union
 
-from fastapi import APIRouter, Depends, Security
+from fastapi import APIRouter, Depends, HTTPException, Query, Security
 from sqlalchemy.orm import Session
 
-from khazana.core.database import get_db
+from khazana.core.database import get_read_db
 from khazana.core.models import UserDB
 from khazana.core.utils import get_current_user
 
-from ..models import ExchangeRatesDB, ExchangeRateSymbolDB
-from ..serializers import ExchangeRatesOut, ExchangeRateSymbolOut
-from ..utils import (
-    EXCHANGE_RATE_EXPIRE_MINUTES,
-    fetch_exchange_rate_symbols,
-    fetch_exchange_rates,
-    change_base_currency_exchange_rates,
+from ..models import ExchangeRateSymbolDB
+from ..serializers import (
+    ExchangeRateConversionOut,
+    ExchangeRatesOut,
+    ExchangeRateSymbolOut,
 )
+from ..utils import RateTable, exchange_rates_cache
 
 router = APIRouter(tags=["Exchange Rates"])
 
 
+def _check_symbols(table: RateTable, *symbols: str) -> None:
+    for symbol in symbols:
+        if symbol not in table:
+            raise HTTPException(
+                status_code=400, detail=f"Unknown currency: {symbol}"
+            )
+
+
 @router.get(
     "",
     description="Get list of exchange rates.",
     response_model=ExchangeRatesOut,
 )
 def list_exchange_rates(
-    db: Session = Depends(get_db),
+    base: str = Query("USD", description="Base currency of the rates."),
     _: UserDB = Security(get_current_user, scopes=["me"]),
 ) -> ExchangeRatesOut:
-    """List transactions."""
-    are_rates_expired = False
-    rate = (
-        db.query(ExchangeRatesDB)
-        .order_by(ExchangeRatesDB.last_updated.desc())
-        .first()
+    """List exchange rates.
+
+    Rates are served from the in process cache, which is refreshed
+    ahead of expiry in the background.
+    """
+    exchange_rates = exchange_rates_cache.get()
+    table = exchange_rates["table"]
+    base = base.upper()
+    _check_symbols(table, base)
+    return ExchangeRatesOut(
+        base=base,
+        last_updated=exchange_rates["last_updated"],
+        rates=table.rates(base),
     )
-    if not rate:
-        are_rates_expired = True
-    elif rate.last_updated < (
-        datetime.now(timezone.utc)
-        - timedelta(minutes=EXCHANGE_RATE_EXPIRE_MINUTES)
-    ).replace(tzinfo=None):
-        are_rates_expired = True
-    if are_rates_expired:
-        exchange_rate_symbols = fetch_exchange_rate_symbols()
-        existing_symbols = {
-            symbol.symbol: symbol
-            for symbol in db.query(ExchangeRateSymbolDB).all()
-        }
-        for symbol, full_name in exchange_rate_symbols["symbols"].items():
-            if symbol in existing_symbols:
-                existing_symbols[symbol].last_updated = datetime.now(
-                    timezone.utc
-                )
-                db.add(existing_symbols[symbol])
-            else:
-                db.add(ExchangeRateSymbolDB(symbol=symbol, fullName=full_name))
-        db.commit()
-        exchange_rates = fetch_exchange_rates()
-        if not rate:
-            rate = ExchangeRatesDB(
-                base="USD",
-                last_updated=datetime.now(timezone.utc),
-                rates=exchange_rates["rates"],
-            )
-        else:
-            rate.base = "USD"
-            rate.last_updated = datetime.now(timezone.utc)
-            rate.rates = exchange_rates["rates"]
-        db.add(rate)
-        db.commit()
-        db.refresh(rate)
 
-    rate.rates = change_base_currency_exchange_rates(
-        rate.rates, rate.base, "USD"
+
+@router.get(
+    "/convert",
+    description="Convert an amount between currencies.",
+    response_model=ExchangeRateConversionOut,
+)
+def convert_amount(
+    amount: float = Query(..., description="Amount to convert."),
+    source: str = Query(
+        ..., alias="from", description="Currency to convert from."
+    ),
+    target: str = Query(
+        ..., alias="to", description="Currency to convert to."
+    ),
+    _: UserDB = Security(get_current_user, scopes=["me"]),
+) -> ExchangeRateConversionOut:
+    """Convert an amount with the latest exchange rates."""
+    exchange_rates = exchange_rates_cache.get()
+    table = exchange_rates["table"]
+    source, target = source.upper(), target.upper()
+    _check_symbols(table, source, target)
+    rate = table.rate(source, target)
+    return ExchangeRateConversionOut(
+        source=source,
+        target=target,
+        amount=amount,
+        rate=rate,
+        result=amount * rate,
+        last_updated=exchange_rates["last_updated"],
     )
-    return ExchangeRatesOut(**rate.__dict__)
 
 
 @router.get(
@@ -87,7 +90,7 @@ def list_exchange_rates(
     # response_model=List[ExchangeRateSymbolOut],
 )
 def list_exchange_rate_symbols(
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     _: UserDB = Security(get_current_user, scopes=["me"]),
 ) -> Dict[str, Union[List[ExchangeRateSymbolOut], int]]:
     """List exchange rate symbols."""
@@ -1,4 +1,8 @@
 # flake8: noqa
 """Transaction DB Models."""
 
-from .exchange_rates import ExchangeRatesDB, ExchangeRateSymbolDB
+from .exchange_rates import (
+    ExchangeRateHistoryDB,
+    ExchangeRatesDB,
+    ExchangeRateSymbolDB,
+)
@@ -3,7 +3,16 @@
 from datetime import datetime, timezone
 from uuid import uuid4
 
-from sqlalchemy import JSON, UUID, Column, DateTime, ForeignKey, String
+from sqlalchemy import (
+    JSON,
+    UUID,
+    Column,
+    Date,
+    DateTime,
+    ForeignKey,
+    LargeBinary,
+    String,
+)
 
 from khazana.core.database import DBBaseModel
 
@@ -31,3 +40,24 @@ class ExchangeRatesDB(DBBaseModel):
     )
     last_updated = Column(DateTime, default=datetime.now(timezone.utc))
     rates = Column(JSON, nullable=True)
+
+
+class ExchangeRateHistoryDB(DBBaseModel):
+    """Exchange rate history database model.
+
+    Holds the rates of a base currency on a date. The rates are packed
+    as little endian float64 values, in the order of ``symbols``.
+    """
+
+    __tablename__ = "exchange_rate_history"
+
+    date = Column(Date, primary_key=True)
+    base = Column(
+        String, ForeignKey("exchange_rate_symbols.symbol"), primary_key=True
+    )
+    # Comma separated symbols of the packed rates.
+    symbols = Column(String, nullable=False)
+    rates = Column(LargeBinary, nullable=False)
+    last_updated = Column(
+        DateTime, default=lambda: datetime.now(timezone.utc)
+    )
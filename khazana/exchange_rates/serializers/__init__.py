@@ -1,4 +1,8 @@
 # flake8: noqa
 """Transaction Serializers."""
 
-from .exchange_rates import ExchangeRatesOut, ExchangeRateSymbolOut
+from .exchange_rates import (
+    ExchangeRateConversionOut,
+    ExchangeRatesOut,
+    ExchangeRateSymbolOut,
+)
@@ -19,3 +19,14 @@ class ExchangeRatesOut(BaseModel):
     base: str
     last_updated: Optional[datetime]
     rates: Dict[str, float]
+
+
+class ExchangeRateConversionOut(BaseModel):
+    """Exchange rate conversion out model."""
+
+    source: str
+    target: str
+    amount: float
+    rate: float
+    result: float
+    last_updated: Optional[datetime]
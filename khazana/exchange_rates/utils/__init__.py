@@ -1,5 +1,33 @@
 # flake8: noqa
 """Exchange rates utils."""
 
+from .cache import (
+    ExchangeRatesCache,
+    exchange_rates_cache,
+    load_exchange_rates,
+    prefetch_exchange_rates,
+)
 from .const import EXCHANGE_RATE_EXPIRE_MINUTES
+from .providers import (
+    CircuitBreaker,
+    CircuitOpenError,
+    ExchangeRatesProvider,
+    ExchangeRatesProviderError,
+    HTTPExchangeRatesProvider,
+    StaticExchangeRatesProvider,
+    get_exchange_rates_provider,
+    set_exchange_rates_provider,
+)
+from .history import (
+    ExchangeRateHistory,
+    backfill_exchange_rate_history,
+    decode_rates,
+    encode_rates,
+    exchange_rate_history_cache,
+    get_exchange_rate_history,
+    load_exchange_rate_history,
+    store_exchange_rate_history,
+)
+from .conversions import convert_amounts
+from .rate_table import RateTable
 from .exchange_rates import fetch_exchange_rate_symbols, fetch_exchange_rates, change_base_currency_exchange_rates
@@ -0,0 +1,199 @@
+"""Exchange rates cache."""
+
+import asyncio
+import logging
+import threading
+import time
+from contextlib import suppress
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Optional
+
+from khazana.core.database import SessionLocal
+
+from ..models import ExchangeRatesDB, ExchangeRateSymbolDB
+from .const import (
+    EXCHANGE_RATE_EXPIRE_MINUTES,
+    EXCHANGE_RATE_REFRESH_MARGIN_MINUTES,
+    EXCHANGE_RATE_RETRY_SECONDS,
+)
+from .exchange_rates import fetch_exchange_rate_symbols, fetch_exchange_rates
+from .history import exchange_rate_history_cache, store_exchange_rate_history
+from .providers import ExchangeRatesProviderError
+from .rate_table import RateTable
+
+logger = logging.getLogger(__name__)
+
+
+def _store_exchange_rates(db, rate: Optional[ExchangeRatesDB]):
+    """Fetch symbols and rates upstream and store them."""
+    exchange_rate_symbols = fetch_exchange_rate_symbols()
+    existing_symbols = {
+        symbol.symbol: symbol
+        for symbol in db.query(ExchangeRateSymbolDB).all()
+    }
+    for symbol, full_name in exchange_rate_symbols["symbols"].items():
+        if symbol in existing_symbols:
+            existing_symbols[symbol].last_updated = datetime.now(
+                timezone.utc
+            )
+            db.add(existing_symbols[symbol])
+        else:
+            db.add(ExchangeRateSymbolDB(symbol=symbol, fullName=full_name))
+    db.commit()
+    exchange_rates = fetch_exchange_rates()
+    if not rate:
+        rate = ExchangeRatesDB(
+            base=exchange_rates["base"],
+            last_updated=datetime.now(timezone.utc),
+            rates=exchange_rates["rates"],
+        )
+    else:
+        rate.base = exchange_rates["base"]
+        rate.last_updated = datetime.now(timezone.utc)
+        rate.rates = exchange_rates["rates"]
+    db.add(rate)
+    store_exchange_rate_history(db, exchange_rates)
+    db.commit()
+    exchange_rate_history_cache.invalidate(rate.base)
+    db.refresh(rate)
+    return rate
+
+
+def load_exchange_rates(margin: float = 0.0) -> dict:
+    """Load the latest exchange rates.
+
+    Stored rates are used while they stay valid for at least ``margin``
+    seconds, otherwise they are fetched upstream and stored. The stored
+    rates are kept, even if stale, while the provider is failing.
+
+    Returns:
+        dict: The base, last update and ``RateTable`` of the rates.
+    """
+    with SessionLocal() as db:
+        rate = (
+            db.query(ExchangeRatesDB)
+            .order_by(ExchangeRatesDB.last_updated.desc())
+            .first()
+        )
+        fresh_after = (
+            datetime.now(timezone.utc)
+            - timedelta(minutes=EXCHANGE_RATE_EXPIRE_MINUTES)
+            + timedelta(seconds=margin)
+        ).replace(tzinfo=None)
+        if not rate or rate.last_updated < fresh_after:
+            try:
+                rate = _store_exchange_rates(db, rate)
+            except ExchangeRatesProviderError:
+                if not rate:
+                    raise
+                db.rollback()
+                logger.warning(
+                    "Exchange rates provider failed, using rates of %s.",
+                    rate.last_updated,
+                    exc_info=True,
+                )
+        return {
+            "base": rate.base,
+            "last_updated": rate.last_updated,
+            "table": RateTable(rate.rates, rate.base),
+        }
+
+
+class ExchangeRatesCache:
+    """Latest exchange rates cached in process.
+
+    Refreshes are single flight: one caller loads the rates while the
+    others keep getting the stale rates, or wait for the first load.
+
+    Args:
+        loader (Callable): Load the rates, given the number of seconds
+            stored rates must stay valid for to be reused.
+        ttl (float): Time to live of rates since their last update.
+    """
+
+    def __init__(
+        self,
+        loader: Callable[[float], dict] = load_exchange_rates,
+        ttl: float = EXCHANGE_RATE_EXPIRE_MINUTES * 60,
+    ):
+        """Initialize."""
+        self.ttl = ttl
+        self._loader = loader
+        self._rates: Optional[dict] = None
+        self._expires_at = 0.0
+        self._refresh_lock = threading.Lock()
+
+    def get(self) -> dict:
+        """Get the rates, refreshing them once they expired."""
+        rates = self._rates
+        if rates is not None and time.time() < self._expires_at:
+            return rates
+        if rates is None:
+            with self._refresh_lock:
+                if self._rates is not None:
+                    return self._rates
+                return self._load(0.0)
+        if not self._refresh_lock.acquire(blocking=False):
+            return rates
+        try:
+            if time.time() < self._expires_at:
+                return self._rates
+            return self._load(0.0)
+        except Exception:
+            logger.exception("Refreshing exchange rates failed.")
+            return rates
+        finally:
+            self._refresh_lock.release()
+
+    def refresh(self, margin: float = 0.0) -> dict:
+        """Reload the rates unless they stay valid for ``margin`` seconds."""
+        with self._refresh_lock:
+            return self._load(margin)
+
+    def seconds_until_refresh(self, margin: float = 0.0) -> float:
+        """Get the delay before the rates are within ``margin`` of expiry."""
+        return max(self._expires_at - margin - time.time(), 0.0)
+
+    def clear(self) -> None:
+        """Drop the cached rates."""
+        with self._refresh_lock:
+            self._rates = None
+            self._expires_at = 0.0
+
+    def _load(self, margin: float) -> dict:
+        rates = self._loader(margin)
+        self._expires_at = (
+            rates["last_updated"].replace(tzinfo=timezone.utc).timestamp()
+            + self.ttl
+        )
+        # Stale rates were loaded as a fallback, retry the provider later.
+        if self._expires_at <= time.time():
+            self._expires_at = time.time() + EXCHANGE_RATE_RETRY_SECONDS
+        self._rates = rates
+        return rates
+
+
+exchange_rates_cache = ExchangeRatesCache()
+
+
+async def prefetch_exchange_rates(
+    cache: ExchangeRatesCache = exchange_rates_cache,
+) -> None:
+    """Refresh the cached rates ahead of their expiry until cancelled."""
+    loop = asyncio.get_running_loop()
+    margin = EXCHANGE_RATE_REFRESH_MARGIN_MINUTES * 60
+    while True:
+        await asyncio.sleep(max(cache.seconds_until_refresh(margin), 1.0))
+        refresh = loop.run_in_executor(None, cache.refresh, margin)
+        try:
+            await asyncio.shield(refresh)
+        except asyncio.CancelledError:
+            # The executor thread cannot be interrupted, so let a running
+            # refresh finish before the provider is closed on shutdown.
+            with suppress(Exception):
+                await refresh
+            raise
+        except Exception:
+            logger.exception("Prefetching exchange rates failed.")
+        if not cache.seconds_until_refresh(margin):
+            await asyncio.sleep(EXCHANGE_RATE_RETRY_SECONDS)
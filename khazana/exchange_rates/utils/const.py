@@ -1,7 +1,25 @@
 """Exchange rates constants."""
 
-FETCH_EXCHANGE_RATES_ENDPOINT = "https://api.exchangeratesapi.io/v1/latest"
-FETCH_EXCHANGE_RATES_SYMBOLS_ENDPOINT = (
-    "https://api.exchangeratesapi.io/v1/symbols"
-)
+# Overridable with the EXCHANGE_RATES_API_URL environment variable.
+EXCHANGE_RATES_API_URL = "https://api.exchangeratesapi.io/v1"
+FETCH_EXCHANGE_RATES_PATH = "/latest"
+FETCH_EXCHANGE_RATES_SYMBOLS_PATH = "/symbols"
+# Historical rates are fetched from the date path, such as /2024-01-31.
+FETCH_HISTORICAL_EXCHANGE_RATES_PATH = "/{date}"
+# Base currency rates are fetched and stored in.
+EXCHANGE_RATES_BASE = "EUR"
 EXCHANGE_RATE_EXPIRE_MINUTES = 60
+# Rates are prefetched this long before they expire.
+EXCHANGE_RATE_REFRESH_MARGIN_MINUTES = 5
+# Delay before retrying a failed prefetch.
+EXCHANGE_RATE_RETRY_SECONDS = 60
+# Provider HTTP client.
+EXCHANGE_RATES_CONNECT_TIMEOUT_SECONDS = 5.0
+EXCHANGE_RATES_READ_TIMEOUT_SECONDS = 10.0
+EXCHANGE_RATES_MAX_CONNECTIONS = 4
+EXCHANGE_RATES_RETRIES = 2
+# Retries wait up to this long, doubling after each attempt.
+EXCHANGE_RATES_RETRY_BACKOFF_SECONDS = 0.5
+# Consecutive failures opening the circuit, and how long it stays open.
+EXCHANGE_RATES_CIRCUIT_FAILURES = 3
+EXCHANGE_RATES_CIRCUIT_RESET_SECONDS = 300
@@ -0,0 +1,49 @@
+"""Currency conversion utils."""
+
+from typing import Iterable, Union
+
+import numpy as np
+import pandas as pd
+from sqlalchemy.orm import Session
+
+from .cache import exchange_rates_cache
+from .history import get_exchange_rate_history
+
+
+def convert_amounts(
+    db: Session,
+    amounts: Iterable[float],
+    dates: Iterable,
+    currencies: Union[str, Iterable[str]],
+    target: str,
+) -> np.ndarray:
+    """Convert amounts to ``target`` at the rates of their dates.
+
+    Amounts are valued at the historical rates as of their date, or at
+    the latest rates for dates the history does not cover.
+
+    Returns:
+        np.ndarray: The converted amounts, NaN for unknown currencies.
+    """
+    amounts = np.asarray(amounts, dtype=np.float64)
+    currencies = (
+        np.full(len(amounts), currencies, dtype=object)
+        if isinstance(currencies, str)
+        else np.asarray(list(currencies), dtype=object)
+    )
+    rates = get_exchange_rate_history(db).rates_as_of(
+        dates, currencies, target
+    )
+    rates[currencies == target] = 1.0
+    missing = np.isnan(rates)
+    if missing.any():
+        table = exchange_rates_cache.get()["table"]
+        latest = {
+            currency: table.rate(currency, target)
+            for currency in set(currencies[missing])
+            if currency in table and target in table
+        }
+        rates[missing] = (
+            pd.Series(currencies[missing]).map(latest).to_numpy(np.float64)
+        )
+    return amounts * rates
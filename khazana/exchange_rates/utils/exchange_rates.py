@@ -1,52 +1,31 @@
 """Fetch latest exchange rates and symbols."""
 
-import os
-import copy
-import requests
+from datetime import date
+from typing import Optional
 
-from .const import (
-    FETCH_EXCHANGE_RATES_ENDPOINT,
-    FETCH_EXCHANGE_RATES_SYMBOLS_ENDPOINT,
-)
+from .const import EXCHANGE_RATES_BASE
+from .providers import get_exchange_rates_provider
+from .rate_table import RateTable
 
 
-def fetch_exchange_rates(base: str = "EUR") -> dict:
-    """Fetch latest exchange rates."""
-    response = requests.get(
-        FETCH_EXCHANGE_RATES_ENDPOINT,
-        params={
-            "access_key": os.environ["EXCHANGE_RATE_API_KEY"],
-            "base": base,
-        },
-    )
-    response.raise_for_status()
-    return response.json()
+def fetch_exchange_rates(
+    base: str = EXCHANGE_RATES_BASE, day: Optional[date] = None
+) -> dict:
+    """Fetch exchange rates, the latest ones unless ``day`` is given."""
+    return get_exchange_rates_provider().fetch_rates(base, day)
 
 
 def fetch_exchange_rate_symbols() -> dict:
     """Fetch exchange rate symbols."""
-    response = requests.get(
-        FETCH_EXCHANGE_RATES_SYMBOLS_ENDPOINT,
-        params={
-            "access_key": os.environ["EXCHANGE_RATE_API_KEY"],
-        },
-    )
-    response.raise_for_status()
-    return response.json()
+    return get_exchange_rates_provider().fetch_symbols()
 
 
 def change_base_currency_exchange_rates(
     old_rates: dict, old_base: str, new_base: str
 ) -> dict:
     """Change base currency in exchange rates."""
-    rates = copy.deepcopy(old_rates)
-    if old_base not in rates:
+    if old_base not in old_rates:
         raise ValueError(f"Unknown base currency: {old_base}")
-    if new_base not in rates:
+    if new_base not in old_rates:
         raise ValueError(f"Unknown base currency: {new_base}")
-    for currency, rate in rates.items():
-        rates[currency] = round(
-            rate / rates[old_base] * rates[new_base],
-            4
-        )
-    return rates
+    return dict(RateTable(old_rates, old_base).rates(new_base))
@@ -0,0 +1,234 @@
+"""Exchange rate history."""
+
+from datetime import date, datetime, timedelta, timezone
+from typing import Dict, Iterable, Optional, Sequence, Tuple, Union
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from khazana.core.utils import LRUCache
+
+from ..models import ExchangeRateHistoryDB
+from .const import EXCHANGE_RATE_EXPIRE_MINUTES, EXCHANGE_RATES_BASE
+from .exchange_rates import fetch_exchange_rates
+
+RATES_DTYPE = np.dtype("<f8")
+
+# Maps a base currency to its whole ExchangeRateHistory.
+exchange_rate_history_cache = LRUCache(
+    max_entries=8, ttl=EXCHANGE_RATE_EXPIRE_MINUTES * 60
+)
+
+
+def encode_rates(rates: Dict[str, float]) -> Tuple[str, bytes]:
+    """Pack rates into comma separated symbols and float64 bytes."""
+    values = np.array(
+        [np.nan if rate is None else rate for rate in rates.values()],
+        dtype=RATES_DTYPE,
+    )
+    return ",".join(rates), values.tobytes()
+
+
+def decode_rates(symbols: str, rates: bytes) -> Dict[str, float]:
+    """Unpack rates packed by ``encode_rates``."""
+    values = np.frombuffer(rates, dtype=RATES_DTYPE)
+    return dict(zip(symbols.split(","), values.tolist()))
+
+
+def store_exchange_rate_history(
+    db: Session, exchange_rates: dict
+) -> ExchangeRateHistoryDB:
+    """Add or replace the rates of a day in the history.
+
+    Args:
+        db (Session): Database session, committed by the caller.
+        exchange_rates (dict): Provider payload with ``base``, ``date``
+            and ``rates``.
+    """
+    day = date.fromisoformat(exchange_rates["date"])
+    symbols, rates = encode_rates(exchange_rates["rates"])
+    row = db.get(ExchangeRateHistoryDB, (day, exchange_rates["base"]))
+    if not row:
+        row = ExchangeRateHistoryDB(date=day, base=exchange_rates["base"])
+        db.add(row)
+    row.symbols = symbols
+    row.rates = rates
+    row.last_updated = datetime.now(timezone.utc)
+    return row
+
+
+def backfill_exchange_rate_history(
+    db: Session,
+    start: date,
+    end: date,
+    base: str = EXCHANGE_RATES_BASE,
+) -> int:
+    """Fetch the rates of the days missing from the history.
+
+    Returns:
+        int: Number of days fetched.
+    """
+    stored = set(
+        db.scalars(
+            select(ExchangeRateHistoryDB.date).where(
+                ExchangeRateHistoryDB.base == base,
+                ExchangeRateHistoryDB.date.between(start, end),
+            )
+        )
+    )
+    fetched = 0
+    for offset in range((end - start).days + 1):
+        day = start + timedelta(days=offset)
+        if day in stored:
+            continue
+        store_exchange_rate_history(db, fetch_exchange_rates(base, day))
+        db.commit()
+        fetched += 1
+    if fetched:
+        exchange_rate_history_cache.invalidate(base)
+    return fetched
+
+
+class ExchangeRateHistory:
+    """Daily exchange rates, looked up as of any date.
+
+    Rates are held in a matrix of dates by symbols. A symbol missing on
+    a date keeps its rate of the previous date.
+
+    Args:
+        dates (np.ndarray): Sorted ``datetime64[D]`` dates of the rows.
+        symbols (Sequence): Symbols of the columns.
+        rates (np.ndarray): Rates of the symbols on the dates, relative to
+            any base.
+    """
+
+    def __init__(
+        self, dates: np.ndarray, symbols: Sequence[str], rates: np.ndarray
+    ):
+        """Initialize."""
+        self.dates = dates
+        self.symbols = pd.Index(symbols)
+        self.rates = rates
+
+    @classmethod
+    def from_rows(
+        cls, rows: Iterable[ExchangeRateHistoryDB]
+    ) -> "ExchangeRateHistory":
+        """Build the history from rows of one base, sorted by date."""
+        rows = list(rows)
+        if not rows:
+            return cls(
+                np.array([], dtype="datetime64[D]"), [], np.empty((0, 0))
+            )
+        frame = pd.DataFrame.from_records(
+            [decode_rates(row.symbols, row.rates) for row in rows],
+            index=pd.DatetimeIndex([row.date for row in rows]),
+        )
+        frame = frame.where(frame > 0).ffill()
+        return cls(
+            frame.index.values.astype("datetime64[D]"),
+            frame.columns,
+            frame.to_numpy(dtype=np.float64),
+        )
+
+    def __len__(self) -> int:
+        """Get the number of dates."""
+        return len(self.dates)
+
+    def rates_as_of(
+        self,
+        dates: Iterable,
+        currencies: Union[str, Iterable[str]],
+        target: str,
+    ) -> np.ndarray:
+        """Get the value of one unit of each currency in ``target``.
+
+        Each date uses the latest rates on or before it, in one pass over
+        all dates.
+
+        Args:
+            dates (Iterable): Dates to look the rates up on.
+            currencies (Iterable): Currency of each date, or one currency
+                for all of them.
+            target (str): Currency to value the currencies in.
+
+        Returns:
+            np.ndarray: The rates, NaN for dates before the history and
+                unknown currencies.
+        """
+        days = _days(dates)
+        rows = np.searchsorted(self.dates, days, side="right") - 1
+        columns = self.symbols.get_indexer(
+            [currencies] * len(days)
+            if isinstance(currencies, str)
+            else list(currencies)
+        )
+        target_column = self.symbols.get_indexer([target])[0]
+        result = np.full(len(days), np.nan)
+        valid = (rows >= 0) & (columns >= 0)
+        if target_column < 0 or not valid.any():
+            return result
+        rows, columns = rows[valid], columns[valid]
+        result[valid] = (
+            self.rates[rows, target_column] / self.rates[rows, columns]
+        )
+        return result
+
+    def convert(
+        self,
+        amounts: Iterable[float],
+        dates: Iterable,
+        currencies: Union[str, Iterable[str]],
+        target: str,
+    ) -> np.ndarray:
+        """Convert amounts to ``target`` at the rates of their dates."""
+        return np.asarray(amounts, dtype=np.float64) * self.rates_as_of(
+            dates, currencies, target
+        )
+
+
+def _days(dates: Iterable) -> np.ndarray:
+    days = pd.DatetimeIndex(pd.to_datetime(pd.Series(dates), utc=True))
+    return days.tz_localize(None).values.astype("datetime64[D]")
+
+
+def load_exchange_rate_history(
+    db: Session,
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    base: str = EXCHANGE_RATES_BASE,
+) -> ExchangeRateHistory:
+    """Load the history needed to look rates up between two dates.
+
+    The latest rates before ``start`` are included, so that ``start``
+    has rates when it has no row of its own.
+    """
+    query = select(ExchangeRateHistoryDB).where(
+        ExchangeRateHistoryDB.base == base
+    )
+    if start:
+        first = db.scalar(
+            select(func.max(ExchangeRateHistoryDB.date)).where(
+                ExchangeRateHistoryDB.base == base,
+                ExchangeRateHistoryDB.date <= start,
+            )
+        )
+        query = query.where(ExchangeRateHistoryDB.date >= (first or start))
+    if end:
+        query = query.where(ExchangeRateHistoryDB.date <= end)
+    rows = db.scalars(query.order_by(ExchangeRateHistoryDB.date)).all()
+    return ExchangeRateHistory.from_rows(rows)
+
+
+def get_exchange_rate_history(
+    db: Session, base: str = EXCHANGE_RATES_BASE
+) -> ExchangeRateHistory:
+    """Get the whole history of a base, cached in process."""
+    history = exchange_rate_history_cache.get(base)
+    if history is None:
+        generation = exchange_rate_history_cache.generation
+        history = load_exchange_rate_history(db, base=base)
+        exchange_rate_history_cache.set(base, history, generation=generation)
+    return history
@@ -0,0 +1,363 @@
+"""Exchange rates providers."""
+
+import logging
+import os
+import random
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import Counter
+from datetime import date
+from typing import Optional
+
+import httpx
+
+from .const import (
+    EXCHANGE_RATES_API_URL,
+    EXCHANGE_RATES_BASE,
+    EXCHANGE_RATES_CIRCUIT_FAILURES,
+    EXCHANGE_RATES_CIRCUIT_RESET_SECONDS,
+    EXCHANGE_RATES_CONNECT_TIMEOUT_SECONDS,
+    EXCHANGE_RATES_MAX_CONNECTIONS,
+    EXCHANGE_RATES_READ_TIMEOUT_SECONDS,
+    EXCHANGE_RATES_RETRIES,
+    EXCHANGE_RATES_RETRY_BACKOFF_SECONDS,
+    FETCH_EXCHANGE_RATES_PATH,
+    FETCH_EXCHANGE_RATES_SYMBOLS_PATH,
+    FETCH_HISTORICAL_EXCHANGE_RATES_PATH,
+)
+
+logger = logging.getLogger(__name__)
+
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+
+class ExchangeRatesProviderError(Exception):
+    """Exchange rates could not be fetched from the provider."""
+
+
+class CircuitOpenError(ExchangeRatesProviderError):
+    """The provider is not called while its circuit is open."""
+
+
+class CircuitBreaker:
+    """Stop calling a failing provider for a while.
+
+    The circuit opens after ``failures`` consecutive failures. Once
+    ``reset_timeout`` seconds have passed a single trial call is let
+    through, closing the circuit on success and opening it again on
+    failure.
+
+    Args:
+        failures (int): Consecutive failures opening the circuit.
+        reset_timeout (float): Seconds the circuit stays open.
+    """
+
+    def __init__(
+        self,
+        failures: int = EXCHANGE_RATES_CIRCUIT_FAILURES,
+        reset_timeout: float = EXCHANGE_RATES_CIRCUIT_RESET_SECONDS,
+    ):
+        """Initialize."""
+        self.failures = failures
+        self.reset_timeout = reset_timeout
+        self._failed = 0
+        self._opened_at: Optional[float] = None
+        self._trial = False
+        self._lock = threading.Lock()
+
+    @property
+    def is_open(self) -> bool:
+        """Whether calls are currently rejected."""
+        with self._lock:
+            return self._opened_at is not None and (
+                self._trial
+                or time.monotonic() - self._opened_at < self.reset_timeout
+            )
+
+    def before_call(self) -> None:
+        """Reject the call while the circuit is open.
+
+        Raises:
+            CircuitOpenError: The circuit is open.
+        """
+        with self._lock:
+            if self._opened_at is None:
+                return
+            if (
+                self._trial
+                or time.monotonic() - self._opened_at < self.reset_timeout
+            ):
+                raise CircuitOpenError(
+                    "Exchange rates provider is unavailable."
+                )
+            self._trial = True
+
+    def record_success(self) -> None:
+        """Close the circuit."""
+        with self._lock:
+            self._failed = 0
+            self._opened_at = None
+            self._trial = False
+
+    def record_failure(self) -> None:
+        """Count a failure, opening the circuit past the threshold."""
+        with self._lock:
+            self._failed += 1
+            if self._trial or self._failed >= self.failures:
+                if self._opened_at is None or self._trial:
+                    logger.warning("Exchange rates provider circuit opened.")
+                self._opened_at = time.monotonic()
+                self._trial = False
+
+
+class ExchangeRatesProvider(ABC):
+    """Source of exchange rates and symbols.
+
+    Payloads follow the exchangeratesapi.io responses.
+    """
+
+    @abstractmethod
+    def fetch_rates(
+        self, base: str = EXCHANGE_RATES_BASE, day: Optional[date] = None
+    ) -> dict:
+        """Fetch exchange rates.
+
+        Args:
+            base (str): Base currency of the rates.
+            day (date): Date of the rates, the latest rates by default.
+
+        Returns:
+            dict: The ``base``, ``date`` and ``rates`` by symbol.
+        """
+
+    @abstractmethod
+    def fetch_symbols(self) -> dict:
+        """Fetch exchange rate symbols.
+
+        Returns:
+            dict: The full names by symbol under ``symbols``.
+        """
+
+    def close(self) -> None:
+        """Release the provider resources."""
+
+
+class HTTPExchangeRatesProvider(ExchangeRatesProvider):
+    """Fetch exchange rates from an exchangeratesapi.io compatible API.
+
+    Connections are pooled and kept alive across refreshes. Failed
+    requests are retried with exponential backoff, and a circuit breaker
+    fails fast while the API keeps failing.
+
+    Args:
+        base_url (str): API URL. Defaults to ``EXCHANGE_RATES_API_URL``
+            from the environment, read on every request.
+        api_key (str): API access key. Defaults to
+            ``EXCHANGE_RATE_API_KEY`` from the environment.
+        timeout (httpx.Timeout): Connect, read, write and pool timeouts.
+        retries (int): Retries after the first attempt.
+        backoff (float): Upper bound of the first retry delay.
+        breaker (CircuitBreaker): Circuit breaker of the API.
+    """
+
+    def __init__(
+        self,
+        base_url: Optional[str] = None,
+        api_key: Optional[str] = None,
+        timeout: Optional[httpx.Timeout] = None,
+        retries: int = EXCHANGE_RATES_RETRIES,
+        backoff: float = EXCHANGE_RATES_RETRY_BACKOFF_SECONDS,
+        breaker: Optional[CircuitBreaker] = None,
+    ):
+        """Initialize."""
+        self.base_url = base_url
+        self.api_key = api_key
+        self.timeout = timeout or httpx.Timeout(
+            EXCHANGE_RATES_READ_TIMEOUT_SECONDS,
+            connect=EXCHANGE_RATES_CONNECT_TIMEOUT_SECONDS,
+        )
+        self.retries = retries
+        self.backoff = backoff
+        self.breaker = breaker or CircuitBreaker()
+        self._client: Optional[httpx.Client] = None
+        self._client_lock = threading.Lock()
+
+    @property
+    def client(self) -> httpx.Client:
+        """Get the pooled HTTP client, created on first use."""
+        if self._client is None:
+            with self._client_lock:
+                if self._client is None:
+                    self._client = httpx.Client(
+                        timeout=self.timeout,
+                        limits=httpx.Limits(
+                            max_connections=EXCHANGE_RATES_MAX_CONNECTIONS,
+                            max_keepalive_connections=(
+                                EXCHANGE_RATES_MAX_CONNECTIONS
+                            ),
+                        ),
+                    )
+        return self._client
+
+    def fetch_rates(
+        self, base: str = EXCHANGE_RATES_BASE, day: Optional[date] = None
+    ) -> dict:
+        """Fetch exchange rates."""
+        path = (
+            FETCH_HISTORICAL_EXCHANGE_RATES_PATH.format(date=day.isoformat())
+            if day
+            else FETCH_EXCHANGE_RATES_PATH
+        )
+        return self._get(path, {"base": base})
+
+    def fetch_symbols(self) -> dict:
+        """Fetch exchange rate symbols."""
+        return self._get(FETCH_EXCHANGE_RATES_SYMBOLS_PATH, {})
+
+    def close(self) -> None:
+        """Close the pooled connections."""
+        with self._client_lock:
+            if self._client is not None:
+                self._client.close()
+                self._client = None
+
+    def _url(self, path: str) -> str:
+        api_url = self.base_url or os.getenv(
+            "EXCHANGE_RATES_API_URL", EXCHANGE_RATES_API_URL
+        )
+        return api_url.rstrip("/") + path
+
+    def _get(self, path: str, params: dict) -> dict:
+        self.breaker.before_call()
+        try:
+            payload = self._get_with_retries(path, params)
+        except ExchangeRatesProviderError:
+            self.breaker.record_failure()
+            raise
+        self.breaker.record_success()
+        return payload
+
+    def _get_with_retries(self, path: str, params: dict) -> dict:
+        api_key = self.api_key or os.getenv("EXCHANGE_RATE_API_KEY")
+        if not api_key:
+            raise ExchangeRatesProviderError(
+                "EXCHANGE_RATE_API_KEY is not configured."
+            )
+        params = {"access_key": api_key, **params}
+        for attempt in range(self.retries + 1):
+            last_attempt = attempt == self.retries
+            try:
+                response = self.client.get(self._url(path), params=params)
+            except httpx.TransportError as e:
+                if last_attempt:
+                    raise ExchangeRatesProviderError(
+                        f"Exchange rates request failed: {e!r}"
+                    ) from e
+            else:
+                if (
+                    response.status_code not in RETRY_STATUS_CODES
+                    or last_attempt
+                ):
+                    return self._payload(response)
+            # Full jitter keeps workers from retrying in lockstep.
+            time.sleep(random.uniform(0, self.backoff * 2**attempt))
+
+    @staticmethod
+    def _payload(response: httpx.Response) -> dict:
+        if response.is_error:
+            raise ExchangeRatesProviderError(
+                f"Exchange rates request failed with {response.status_code}."
+            )
+        try:
+            payload = response.json()
+        except ValueError as e:
+            raise ExchangeRatesProviderError(
+                "Invalid exchange rates response."
+            ) from e
+        # The API reports errors such as invalid keys with a 200 response.
+        if not isinstance(payload, dict) or payload.get("success") is False:
+            raise ExchangeRatesProviderError(
+                f"Exchange rates request failed: {payload!r}"
+            )
+        return payload
+
+
+class StaticExchangeRatesProvider(ExchangeRatesProvider):
+    """Serve fixed exchange rates, for tests and offline use.
+
+    Args:
+        rates (dict): Rates by symbol, relative to ``base``.
+        symbols (dict): Full names by symbol. Defaults to the rates
+            symbols.
+        base (str): Base currency of ``rates``.
+        date (str): Date of the latest rates. Historical rates are the
+            same rates on the requested date.
+    """
+
+    def __init__(
+        self,
+        rates: dict,
+        symbols: Optional[dict] = None,
+        base: str = EXCHANGE_RATES_BASE,
+        date: str = "2024-01-01",
+    ):
+        """Initialize."""
+        self.rates = rates
+        self.symbols = symbols or {symbol: symbol for symbol in rates}
+        self.base = base
+        self.date = date
+        self.calls = Counter()
+
+    def fetch_rates(
+        self, base: str = EXCHANGE_RATES_BASE, day: Optional[date] = None
+    ) -> dict:
+        """Get the fixed exchange rates."""
+        self.calls["rates"] += 1
+        rates = self.rates
+        if base != self.base:
+            rates = {
+                symbol: rate / self.rates[base]
+                for symbol, rate in self.rates.items()
+            }
+        return {
+            "success": True,
+            "base": base,
+            "date": day.isoformat() if day else self.date,
+            "rates": rates,
+        }
+
+    def fetch_symbols(self) -> dict:
+        """Get the fixed exchange rate symbols."""
+        self.calls["symbols"] += 1
+        return {"success": True, "symbols": dict(self.symbols)}
+
+
+_provider: Optional[ExchangeRatesProvider] = None
+_provider_lock = threading.Lock()
+
+
+def get_exchange_rates_provider() -> ExchangeRatesProvider:
+    """Get the exchange rates provider, by default the HTTP API."""
+    global _provider
+    if _provider is None:
+        with _provider_lock:
+            if _provider is None:
+                _provider = HTTPExchangeRatesProvider()
+    return _provider
+
+
+def set_exchange_rates_provider(
+    provider: ExchangeRatesProvider,
+) -> ExchangeRatesProvider:
+    """Replace the exchange rates provider, closing the previous one.
+
+    Returns:
+        ExchangeRatesProvider: The previous provider.
+    """
+    global _provider
+    with _provider_lock:
+        previous, _provider = _provider, provider
+    if previous is not None and previous is not provider:
+        previous.close()
+    return previous
@@ -0,0 +1,72 @@
+"""Exchange rates table."""
+
+import logging
+from typing import Dict
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class RateTable:
+    """Exchange rates between every pair of symbols.
+
+    The cross rates are computed once, so rebasing the rates or
+    converting an amount is a lookup.
+
+    Args:
+        rates (dict): Rates by symbol, relative to ``base``.
+        base (str): Base currency of ``rates``.
+    """
+
+    def __init__(self, rates: Dict[str, float], base: str):
+        """Initialize."""
+        values = np.array(
+            [np.nan if rate is None else rate for rate in rates.values()],
+            dtype=np.float64,
+        )
+        valid = np.isfinite(values) & (values > 0)
+        if not valid.all():
+            logger.warning(
+                "Ignoring invalid exchange rates of %s.",
+                [s for s, ok in zip(rates, valid) if not ok],
+            )
+        self.base = base
+        self.symbols = tuple(s for s, ok in zip(rates, valid) if ok)
+        self.index = {symbol: i for i, symbol in enumerate(self.symbols)}
+        values = values[valid]
+        # cross[i, j] is the value of one unit of symbols[i] in symbols[j].
+        self.cross = values[np.newaxis, :] / values[:, np.newaxis]
+        self._rates: Dict[str, Dict[str, float]] = {}
+
+    def __contains__(self, symbol: str) -> bool:
+        """Whether the symbol has a rate."""
+        return symbol in self.index
+
+    def rate(self, source: str, target: str) -> float:
+        """Get the value of one unit of ``source`` in ``target``."""
+        return float(
+            self.cross[self._position(source), self._position(target)]
+        )
+
+    def convert(self, amount: float, source: str, target: str) -> float:
+        """Convert an amount from ``source`` to ``target``."""
+        return amount * self.rate(source, target)
+
+    def rates(self, base: str) -> Dict[str, float]:
+        """Get the rates relative to ``base``, rounded to 4 decimals.
+
+        The rates of a base are built once and shared, they must not be
+        modified.
+        """
+        rates = self._rates.get(base)
+        if rates is None:
+            row = np.round(self.cross[self._position(base)], 4)
+            rates = self._rates[base] = dict(zip(self.symbols, row.tolist()))
+        return rates
+
+    def _position(self, symbol: str) -> int:
+        try:
+            return self.index[symbol]
+        except KeyError:
+            raise ValueError(f"Unknown currency: {symbol}") from None
@@ -1,60 +1,61 @@
 """Bulk transactions related Endpoints."""
 
-import os
-import tempfile
+import logging
 from datetime import datetime, timezone
+from typing import Optional
+from uuid import UUID
 
-import pandas as pd
 from fastapi import (
     APIRouter,
     Depends,
     File,
+    Header,
     HTTPException,
+    Query,
     Security,
     UploadFile,
 )
 from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 
-from khazana.core.database import get_db
+from khazana.core.database import get_db, get_read_db
 from khazana.core.models import UserDB
 from khazana.core.utils import get_current_user
 
-from ..models import TransactionDB
-from ..serializers import TransactionOut
-from ..utils import TransactionType
-
-router = APIRouter(prefix="/bulk", tags=["Bulk Transactions"])
+from ..models import ImportJobDB, TransactionDB
+from ..serializers import ImportJobOut
+from ..utils import (
+    TransactionFileFormat,
+    file_format_from_accept,
+    file_format_from_filename,
+    stream_arrow,
+)
+from ..utils.exports import (
+    accepts_gzip,
+    iter_transaction_batches,
+    stream_csv,
+)
+from ..utils.formats import EXPORT_EXTENSIONS, MEDIA_TYPES
+from ..utils.import_jobs import create_import_job
+from ..utils.imports import import_transactions
 
+logger = logging.getLogger(__name__)
 
-def _select_transaction_type(record):
-    if not record["transactionType"]:
-        transaction_type = TransactionType.expense.value
-    else:
-        transaction_type = record["transactionType"].lower()
-    transaction_type = TransactionType(transaction_type).value
-    if (
-        record["amount"] < 0
-        and transaction_type != TransactionType.investment.value
-    ):
-        transaction_type = TransactionType.expense.value
-    elif (
-        record["amount"] > 0
-        and transaction_type != TransactionType.investment.value
-    ):
-        transaction_type = TransactionType.income.value
-    return transaction_type
+router = APIRouter(prefix="/bulk", tags=["Bulk Transactions"])
 
 
 @router.post(
     "/{username}",
-    description="Create bulk transactions.",
-    # response_model=List[TransactionOut],
+    description=(
+        "Create bulk transactions from a CSV, Parquet or Arrow file, "
+        "detected by its extension. Invalid and already imported rows "
+        "are skipped and reported back."
+    ),
 )
 def create_bulk_transactions(
     username: str,
     transaction_file: UploadFile = File(
-        ..., description="CSV file of transactions"
+        ..., description="CSV, Parquet or Arrow file of transactions"
     ),
     db: Session = Depends(get_db),
     user: UserDB = Security(
@@ -69,59 +70,125 @@ def create_bulk_transactions(
         raise HTTPException(status_code=404, detail="User not found")
 
     filename = transaction_file.filename
-    ext = os.path.splitext(filename)[1]
-    if ext.lower() != ".csv":
+    file_format = file_format_from_filename(filename)
+    if not file_format:
         raise HTTPException(status_code=400, detail="Invalid file format")
 
-    print(f"Importing transactions from {filename}...")
-    transactions = pd.read_csv(transaction_file.file)
-    transactions["userId"] = transaction_user.id
-    if "id" in transactions.columns:
-        transactions = transactions.drop(axis=1, columns=["id"])
-    transactions["createdBy"] = user.id
-
-    transactions["category"] = transactions["category"].fillna("Uncategorized")
-    transactions["category"] = transactions["category"].replace(
-        {"": "Uncategorized", None: "Uncategorized"}
+    logger.info("Importing transactions from %s.", filename)
+    try:
+        report = import_transactions(
+            db,
+            transaction_file.file,
+            transaction_user.id,
+            user.id,
+            file_format=file_format,
+        )
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    return report.to_dict()
+
+
+def _import_job_out(job: ImportJobDB) -> ImportJobOut:
+    processed = job.rowsImported + job.rowsDuplicate + job.rowsRejected
+    rows_per_second = None
+    if job.startedAt:
+        finished = job.finishedAt or datetime.now(timezone.utc)
+        elapsed = (
+            finished.replace(tzinfo=None) - job.startedAt.replace(tzinfo=None)
+        ).total_seconds()
+        rows_per_second = round(processed / max(elapsed, 1e-3), 2)
+    return ImportJobOut(
+        id=job.id,
+        filename=job.filename,
+        status=job.status,
+        rowsProcessed=processed,
+        rowsImported=job.rowsImported,
+        rowsDuplicate=job.rowsDuplicate,
+        rowsRejected=job.rowsRejected,
+        rowsPerSecond=rows_per_second,
+        errors=[
+            {"error": error, "rows": rows}
+            for error, rows in (job.errors or {}).items()
+        ],
+        error=job.error,
+        createdAt=job.createdAt,
+        startedAt=job.startedAt,
+        finishedAt=job.finishedAt,
     )
 
-    # Check is transactionDate is having na/none values
-    if transactions["transactionDate"].isna().any():
-        raise HTTPException(
-            status_code=400,
-            detail="Transaction date can not be null or in the future",
-        )
 
-    # Convert transactionDate to datetime
-    transactions["transactionDate"] = pd.to_datetime(
-        transactions["transactionDate"], utc=True
+@router.post(
+    "/{username}/jobs",
+    status_code=202,
+    response_model=ImportJobOut,
+    description=(
+        "Queue a background import of a CSV, Parquet or Arrow file. Poll "
+        "the returned job for progress."
+    ),
+)
+def create_bulk_transactions_job(
+    username: str,
+    transaction_file: UploadFile = File(
+        ..., description="CSV, Parquet or Arrow file of transactions"
+    ),
+    db: Session = Depends(get_db),
+    user: UserDB = Security(
+        get_current_user, scopes=["admin", "transaction_write"]
+    ),
+):
+    """Create bulk transactions in the background."""
+    transaction_user = (
+        db.query(UserDB).filter(UserDB.username == username, UserDB.active == True).first()
     )
+    if not transaction_user:
+        raise HTTPException(status_code=404, detail="User not found")
 
-    # Validate transactionDate is not in the future
-    if transactions["transactionDate"].max() > datetime.now(timezone.utc):
-        raise HTTPException(
-            status_code=400,
-            detail="Transaction date can not be in the future",
-        )
+    filename = transaction_file.filename
+    file_format = file_format_from_filename(filename)
+    if not file_format:
+        raise HTTPException(status_code=400, detail="Invalid file format")
 
-    # Logic to select transactionType based on amount
-    transactions["transactionType"] = transactions.apply(
-        _select_transaction_type, axis=1
+    job = create_import_job(
+        db, transaction_file.file, filename, transaction_user.id, user.id
     )
+    return _import_job_out(job)
 
-    transactions = transactions.to_dict(orient="records")
-    db.bulk_insert_mappings(TransactionDB, transactions)
-    db.commit()
-    return {"success": True}
+
+@router.get(
+    "/jobs/{job_id}",
+    response_model=ImportJobOut,
+    description="Get the progress of a background import.",
+)
+def get_bulk_transactions_job(
+    job_id: UUID,
+    db: Session = Depends(get_read_db),
+    user: UserDB = Security(
+        get_current_user, scopes=["admin", "transaction_read"]
+    ),
+):
+    """Get import job."""
+    job = db.get(ImportJobDB, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Import job not found")
+    return _import_job_out(job)
 
 
 @router.get(
     "/{username}",
-    description="Export user transactions.",
+    description=(
+        "Export user transactions as CSV, Parquet or Arrow, chosen by "
+        "fileFormat or else the Accept header. CSV responses are gzip "
+        "encoded when the client accepts it."
+    ),
 )
 def export_transactions(
     username: str,
-    db: Session = Depends(get_db),
+    fileFormat: Optional[TransactionFileFormat] = Query(
+        None, description="Format of the export, overrides Accept."
+    ),
+    accept: Optional[str] = Header(None),
+    accept_encoding: Optional[str] = Header(None),
+    db: Session = Depends(get_read_db),
     user: UserDB = Security(
         get_current_user, scopes=["admin", "transaction_read"]
     ),
@@ -132,31 +199,38 @@ def export_transactions(
     )
     if not requested_user:
         raise HTTPException(status_code=404, detail="User not found")
-    transactions = (
-        db.query(TransactionDB)
+    if not (
+        db.query(TransactionDB.id)
         .filter(TransactionDB.userId == requested_user.id)
-        .all()
-    )
-    if not transactions:
+        .first()
+    ):
         raise HTTPException(
             status_code=400, detail="No transactions to export"
         )
-    with tempfile.NamedTemporaryFile() as temp_file:
-        pd.DataFrame(
-            [
-                TransactionOut(**transaction.__dict__).model_dump()
-                for transaction in transactions
-            ]
-        ).to_csv(temp_file.name, index=False)
-        dnow = datetime.now(timezone.utc).strftime("%Y%m%d%H%M%S")
-        return StreamingResponse(
-            iter([temp_file.read()]),
-            media_type="text/csv",
-            headers={
-                "Content-Disposition": (
-                    f"attachment; filename={username}_"
-                    f"transactions_"
-                    f"{dnow}.csv"
-                )
-            },
+    file_format = fileFormat or file_format_from_accept(accept)
+    dnow = datetime.now(timezone.utc).strftime("%Y%m%d%H%M%S")
+    headers = {
+        "Content-Disposition": (
+            f"attachment; filename={username}_"
+            f"transactions_"
+            f"{dnow}{EXPORT_EXTENSIONS[file_format]}"
+        ),
+        # The format and encoding of the body are negotiated.
+        "Vary": "Accept-Encoding, Accept",
+    }
+    if file_format == TransactionFileFormat.csv:
+        compress = accepts_gzip(accept_encoding)
+        if compress:
+            headers["Content-Encoding"] = "gzip"
+        content = stream_csv(
+            iter_transaction_batches(requested_user.id), compress=compress
         )
+    else:
+        # Parquet and Arrow are compressed by their writers.
+        content = stream_arrow(
+            iter_transaction_batches(requested_user.id, amount_cents=True),
+            file_format,
+        )
+    return StreamingResponse(
+        content, media_type=MEDIA_TYPES[file_format], headers=headers
+    )
@@ -1,22 +1,286 @@
 """Transaction Dashboard related Endpoints."""
 
-from itertools import groupby
+import hashlib
+import json
+from datetime import date
+from typing import Optional
 
-from fastapi import APIRouter, Depends, HTTPException, Security
+import numpy as np
+import pandas as pd
+from fastapi import (
+    APIRouter,
+    Depends,
+    Header,
+    HTTPException,
+    Query,
+    Response,
+    Security,
+)
+from sqlalchemy import case
 from sqlalchemy import func as sa_func
-from sqlalchemy import or_
 from sqlalchemy.orm import Session
 
-from khazana.core.database import get_db
+from khazana.core.database import get_read_db
 from khazana.core.models import UserDB
 from khazana.core.utils import get_current_user
+from khazana.exchange_rates.utils import convert_amounts
 
-from ..models import TransactionDB
-from ..utils import TransactionType
+from ..models import MonthlyRollupDB
+from ..serializers import TransactionAnalyticsOut
+from ..utils import (
+    ANALYTICS_ROLLING_WINDOW,
+    ANALYTICS_TOP_CATEGORIES,
+    DEFAULT_CURRENCY,
+    AnalyticsGroupBy,
+    TransactionType,
+    dashboard_cache,
+    from_cents,
+    is_cacheable,
+    normalize_currency,
+)
+from ..utils.analytics import (
+    TRANSACTION_TYPES,
+    TransactionColumns,
+    get_transaction_columns,
+    rolling_mean,
+    top_n,
+)
+from ..utils.money import CENTS_PER_UNIT
 
 router = APIRouter(prefix="/dashboard", tags=["Transaction Dashboard"])
 
 
+def _amounts(cents: dict) -> dict:
+    return {key: float(from_cents(value)) for key, value in cents.items()}
+
+
+def _convert_buckets(
+    db: Session, buckets: list, reporting_currency: str
+) -> list:
+    """Convert bucket sums in cents to the reporting currency.
+
+    Each bucket is valued at the rates as of the end of its month, for
+    all buckets at once, and rounded back to whole cents.
+    """
+    cents = [int(bucket[-1]) for bucket in buckets]
+    currencies = [bucket[-2] for bucket in buckets]
+    if all(currency == reporting_currency for currency in currencies):
+        return cents
+    month_ends = pd.to_datetime(
+        pd.DataFrame(
+            {
+                "year": [bucket[0] for bucket in buckets],
+                "month": [bucket[1] for bucket in buckets],
+                "day": 1,
+            }
+        )
+    ) + pd.offsets.MonthEnd(0)
+    converted = convert_amounts(
+        db, cents, month_ends, currencies, reporting_currency
+    )
+    unknown = np.isnan(converted)
+    if unknown.any():
+        missing = sorted(set(np.asarray(currencies, dtype=object)[unknown]))
+        raise HTTPException(
+            status_code=400,
+            detail=(
+                f"No exchange rate from {', '.join(missing)} "
+                f"to {reporting_currency}"
+            ),
+        )
+    return np.rint(converted).astype(np.int64).tolist()
+
+
+def _get_dashboard_data(
+    db: Session, user_id, reporting_currency: str = DEFAULT_CURRENCY
+) -> dict:
+    """Aggregate dashboard data for a user from the monthly rollups.
+
+    Rollups are grouped by year-month, transaction type and currency in
+    SQL, with investments additionally split by category, so the amount
+    of data read depends on the number of months rather than
+    transactions. Buckets in other currencies are then converted to the
+    reporting currency in one vectorized step. Sums are kept in integer
+    cents and only turned into amounts in the payload.
+    """
+    investment_category = case(
+        (
+            MonthlyRollupDB.transactionType
+            == TransactionType.investment.value,
+            MonthlyRollupDB.category,
+        ),
+        else_=None,
+    )
+    buckets = (
+        db.query(
+            MonthlyRollupDB.year,
+            MonthlyRollupDB.month,
+            MonthlyRollupDB.transactionType,
+            investment_category,
+            MonthlyRollupDB.currency,
+            sa_func.sum(MonthlyRollupDB.totalCents),
+        )
+        .filter(MonthlyRollupDB.userId == user_id)
+        .group_by(
+            MonthlyRollupDB.year,
+            MonthlyRollupDB.month,
+            MonthlyRollupDB.transactionType,
+            investment_category,
+            MonthlyRollupDB.currency,
+        )
+        .order_by(MonthlyRollupDB.year, MonthlyRollupDB.month)
+        .all()
+    )
+    total_savings_month_wise = {}
+    monthly_expenses = {}
+    investment_growth = {}
+    cents = _convert_buckets(db, buckets, reporting_currency)
+    for bucket, amount in zip(buckets, cents):
+        bucket_year, bucket_month, transaction_type, category = bucket[:4]
+        if transaction_type == TransactionType.investment.value:
+            investment_growth[category] = (
+                investment_growth.get(category, 0) + amount
+            )
+            continue
+        key = f"{bucket_year}-{bucket_month}"
+        total_savings_month_wise[key] = (
+            total_savings_month_wise.get(key, 0) + amount
+        )
+        if transaction_type == TransactionType.expense.value:
+            monthly_expenses[key] = monthly_expenses.get(key, 0) + amount
+    return {
+        "totalSavings": _amounts(total_savings_month_wise),
+        "monthlyExpenses": _amounts(monthly_expenses),
+        "investmentGrowth": _amounts(investment_growth),
+        "reportingCurrency": reporting_currency,
+    }
+
+
+def _get_analytics_data(
+    columns: TransactionColumns,
+    group_by: AnalyticsGroupBy,
+    window: int,
+    top: int,
+) -> dict:
+    """Aggregate analytics from a user's transaction columns.
+
+    Sums per group and transaction type are computed in one pass, savings
+    are income plus expenses as on the dashboard and the rolling average
+    of savings is only defined for periods.
+    """
+    income, expense, investment = (
+        TRANSACTION_TYPES.index(transaction_type.value)
+        for transaction_type in (
+            TransactionType.income,
+            TransactionType.expense,
+            TransactionType.investment,
+        )
+    )
+    codes, keys = columns.group_keys(group_by)
+    sums, counts = columns.group_sums(codes, len(keys))
+    category_sums, category_counts = (
+        (sums, counts)
+        if group_by == AnalyticsGroupBy.category
+        else columns.group_sums(
+            columns.categories, len(columns.category_names)
+        )
+    )
+    if group_by == AnalyticsGroupBy.category:
+        # Periods keep empty groups, categories outside the range do not.
+        present = counts.sum(axis=1) > 0
+        keys = np.asarray(keys, dtype=object)[present].tolist()
+        sums, counts = sums[present], counts[present]
+    savings = sums[:, income] + sums[:, expense]
+    rolling = (
+        rolling_mean(savings, window)
+        if group_by != AnalyticsGroupBy.category
+        else np.full(len(keys), np.nan)
+    )
+    rolling = np.rint(rolling) / CENTS_PER_UNIT
+    amounts = sums / CENTS_PER_UNIT
+    groups = [
+        {
+            "key": key,
+            "income": group[income],
+            "expense": group[expense],
+            "investment": group[investment],
+            "savings": group_savings,
+            "count": count,
+            "rollingSavings": None if np.isnan(average) else average,
+        }
+        for key, group, group_savings, count, average in zip(
+            keys,
+            amounts.tolist(),
+            (savings / CENTS_PER_UNIT).tolist(),
+            counts.sum(axis=1).tolist(),
+            rolling.tolist(),
+        )
+    ]
+
+    spent = -category_sums[:, expense]
+    top_categories = [
+        {
+            "category": columns.category_names[index],
+            "expense": category_sums[index, expense] / CENTS_PER_UNIT,
+            "count": int(category_counts[index, expense]),
+        }
+        for index in top_n(spent, top)
+        if spent[index] > 0
+    ]
+    return {
+        "groupBy": group_by,
+        "reportingCurrency": columns.currency,
+        "groups": groups,
+        "topCategories": top_categories,
+    }
+
+
+def _dashboard_response(
+    db: Session,
+    user_id,
+    if_none_match: Optional[str],
+    reporting_currency: str = DEFAULT_CURRENCY,
+) -> Response:
+    """Render dashboard data, served from the cache when possible.
+
+    Honours ``If-None-Match`` so polling clients get a cheap 304.
+    """
+    try:
+        reporting_currency = normalize_currency(reporting_currency)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    key = (user_id, reporting_currency)
+    entry = dashboard_cache.get(key)
+    if entry is None:
+        generation = dashboard_cache.generation
+        body = json.dumps(
+            _get_dashboard_data(db, user_id, reporting_currency)
+        ).encode()
+        entry = (f'"{hashlib.sha1(body).hexdigest()}"', body)
+        if is_cacheable(db, user_id):
+            dashboard_cache.set(key, entry, generation=generation)
+    etag, body = entry
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if if_none_match and etag in [
+        tag.strip().replace("W/", "", 1)
+        for tag in if_none_match.split(",")
+    ]:
+        return Response(status_code=304, headers=headers)
+    return Response(body, media_type="application/json", headers=headers)
+
+
+@router.get(
+    "/cache/stats",
+    description="Get dashboard cache statistics.",
+    response_model=dict,
+)
+def get_dashboard_cache_stats(
+    _: UserDB = Security(get_current_user, scopes=["admin"]),
+) -> dict:
+    """Get dashboard cache hit, miss and eviction counters."""
+    return dashboard_cache.stats()
+
+
 @router.get(
     "/{username}",
     description="Get dashboard data.",
@@ -24,7 +288,11 @@ router = APIRouter(prefix="/dashboard", tags=["Transaction Dashboard"])
 )
 def get_dashboard_data_by_username(
     username: str,
-    db: Session = Depends(get_db),
+    reportingCurrency: str = Query(
+        DEFAULT_CURRENCY, description="Currency to report amounts in."
+    ),
+    if_none_match: Optional[str] = Header(None),
+    db: Session = Depends(get_read_db),
     user: UserDB = Security(
         get_current_user, scopes=["admin", "transaction_read"]
     ),
@@ -38,69 +306,71 @@ def get_dashboard_data_by_username(
     )
     if not requested_user:
         raise HTTPException(status_code=404, detail="User not found")
-
-    transactions = (
-        db.query(
-            TransactionDB.transactionDate,
-            TransactionDB.amount,
-        )
-        .filter(
-            TransactionDB.userId == requested_user.id,
-            or_(
-                TransactionDB.transactionType == TransactionType.income.value,
-                TransactionDB.transactionType == TransactionType.expense.value,
-            ),
-        )
-        .all()
+    return _dashboard_response(
+        db, requested_user.id, if_none_match, reportingCurrency
     )
-    total_savings_month_wise = {}
-    for key, transactions in groupby(
-        transactions,
-        key=lambda x: [
-            str(x.transactionDate.year),
-            str(x.transactionDate.month),
-        ],
-    ):
-        total_savings_month_wise["-".join(key)] = sum(
-            transaction.amount for transaction in transactions
-        )
 
-    expenses = (
-        db.query(
-            TransactionDB.transactionDate,
-            TransactionDB.amount,
-        )
-        .filter(
-            TransactionDB.userId == requested_user.id,
-            TransactionDB.transactionType == TransactionType.expense.value,
-        )
-        .all()
+
+@router.get(
+    "/{username}/analytics",
+    description="Get transaction analytics.",
+    response_model=TransactionAnalyticsOut,
+)
+def get_analytics_by_username(
+    username: str,
+    groupBy: AnalyticsGroupBy = Query(
+        AnalyticsGroupBy.month, description="Group transactions by."
+    ),
+    window: int = Query(
+        ANALYTICS_ROLLING_WINDOW,
+        ge=1,
+        description="Number of periods in the rolling average of savings.",
+    ),
+    top: int = Query(
+        ANALYTICS_TOP_CATEGORIES,
+        ge=0,
+        description="Number of top expense categories.",
+    ),
+    startDate: Optional[date] = Query(
+        None, description="Include transactions on or after this date."
+    ),
+    endDate: Optional[date] = Query(
+        None, description="Include transactions before this date."
+    ),
+    reportingCurrency: str = Query(
+        DEFAULT_CURRENCY, description="Currency to report amounts in."
+    ),
+    db: Session = Depends(get_read_db),
+    user: UserDB = Security(
+        get_current_user, scopes=["admin", "transaction_read"]
+    ),
+) -> TransactionAnalyticsOut:
+    """Get transaction analytics.
+
+    Income, expenses, investments and savings grouped by month, week or
+    category, with the rolling average of savings and the top expense
+    categories. The user's transactions are loaded into memory once and
+    reused until their next write.
+    """
+    requested_user = (
+        db.query(UserDB)
+        .filter(UserDB.username == username, UserDB.active == True)
+        .first()
     )
-    monthly_expenses = {}
-    for key, expenses in groupby(
-        expenses,
-        key=lambda x: [
-            str(x.transactionDate.year),
-            str(x.transactionDate.month),
-        ],
-    ):
-        monthly_expenses["-".join(key)] = sum(
-            expense.amount for expense in expenses
+    if not requested_user:
+        raise HTTPException(status_code=404, detail="User not found")
+    try:
+        reportingCurrency = normalize_currency(reportingCurrency)
+        columns = get_transaction_columns(
+            db, requested_user.id, reportingCurrency
         )
-    investment_growth = (
-        db.query(TransactionDB.category, sa_func.sum(TransactionDB.amount))
-        .filter(
-            TransactionDB.userId == requested_user.id,
-            TransactionDB.transactionType == TransactionType.investment.value,
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return TransactionAnalyticsOut(
+        **_get_analytics_data(
+            columns.between(startDate, endDate), groupBy, window, top
         )
-        .group_by(TransactionDB.category)
-        .all()
     )
-    return {
-        "totalSavings": total_savings_month_wise,
-        "monthlyExpenses": monthly_expenses,
-        "investmentGrowth": dict(investment_growth),
-    }
 
 
 @router.get(
@@ -109,7 +379,11 @@ def get_dashboard_data_by_username(
     response_model=dict,
 )
 def get_dashboard_data(
-    db: Session = Depends(get_db),
+    reportingCurrency: str = Query(
+        DEFAULT_CURRENCY, description="Currency to report amounts in."
+    ),
+    if_none_match: Optional[str] = Header(None),
+    db: Session = Depends(get_read_db),
     user: UserDB = Security(
         get_current_user, scopes=["transaction_read"]
     ),
@@ -118,71 +392,4 @@ def get_dashboard_data(
 
     For total savings, monthly expenses, and investment growth by user.
     """
-    requested_user = (
-        db.query(UserDB).filter(UserDB.username == user.username, UserDB.active == True).first()
-    )
-    if not requested_user:
-        raise HTTPException(status_code=404, detail="User not found")
-
-    transactions = (
-        db.query(
-            TransactionDB.transactionDate,
-            TransactionDB.amount,
-        )
-        .filter(
-            TransactionDB.userId == requested_user.id,
-            or_(
-                TransactionDB.transactionType == TransactionType.income.value,
-                TransactionDB.transactionType == TransactionType.expense.value,
-            ),
-        )
-        .all()
-    )
-    total_savings_month_wise = {}
-    for key, transactions in groupby(
-        transactions,
-        key=lambda x: [
-            str(x.transactionDate.year),
-            str(x.transactionDate.month),
-        ],
-    ):
-        total_savings_month_wise["-".join(key)] = sum(
-            transaction.amount for transaction in transactions
-        )
-
-    expenses = (
-        db.query(
-            TransactionDB.transactionDate,
-            TransactionDB.amount,
-        )
-        .filter(
-            TransactionDB.userId == requested_user.id,
-            TransactionDB.transactionType == TransactionType.expense.value,
-        )
-        .all()
-    )
-    monthly_expenses = {}
-    for key, expenses in groupby(
-        expenses,
-        key=lambda x: [
-            str(x.transactionDate.year),
-            str(x.transactionDate.month),
-        ],
-    ):
-        monthly_expenses["-".join(key)] = sum(
-            expense.amount for expense in expenses
-        )
-    investment_growth = (
-        db.query(TransactionDB.category, sa_func.sum(TransactionDB.amount))
-        .filter(
-            TransactionDB.userId == requested_user.id,
-            TransactionDB.transactionType == TransactionType.investment.value,
-        )
-        .group_by(TransactionDB.category)
-        .all()
-    )
-    return {
-        "totalSavings": total_savings_month_wise,
-        "monthlyExpenses": monthly_expenses,
-        "investmentGrowth": dict(investment_growth),
-    }
+    return _dashboard_response(db, user.id, if_none_match, reportingCurrency)
@@ -1,60 +1,127 @@
 """Transaction related Endpoints."""
 
-from typing import List
-from uuid import UUID
+from datetime import timezone
+from typing import List, Optional
+from uuid import UUID, uuid4
 
-from fastapi import APIRouter, Depends, HTTPException, Security
+from fastapi import (
+    APIRouter,
+    Depends,
+    HTTPException,
+    Query,
+    Request,
+    Security,
+)
+from fastapi.exceptions import RequestValidationError
+from pydantic import TypeAdapter, ValidationError
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from khazana.core.database import get_db
+from khazana.core.database import get_async_db, get_db, get_read_db
 from khazana.core.models import UserDB
 from khazana.core.utils import get_current_user
 
 from ..models import TransactionDB
-from ..serializers import TransactionIn, TransactionOut, TransactionUpdate
-from ..utils import TransactionType
+from ..serializers import (
+    TransactionBatchOut,
+    TransactionBulkUpdate,
+    TransactionFilters,
+    TransactionIn,
+    TransactionOut,
+    TransactionPageOut,
+    TransactionUpdate,
+)
+from ..utils import (
+    TRANSACTIONS_MAX_BATCH_BYTES,
+    TRANSACTIONS_MAX_BATCH_SIZE,
+    TRANSACTIONS_MAX_BULK_IDS,
+    TRANSACTIONS_MAX_PAGE_SIZE,
+    TRANSACTIONS_PAGE_SIZE,
+    invalidate_user_caches,
+    select_transaction_type,
+    to_cents,
+)
+from ..utils.batches import (
+    delete_transactions,
+    insert_transactions,
+    update_transactions,
+)
+from ..utils.filters import transaction_conditions
+from ..utils.pagination import paginate_transactions
+from ..utils.rollups import apply_rollup_deltas, rollup_delta
 
 router = APIRouter(tags=["Transactions"])
 
+NDJSON_MEDIA_TYPES = ("application/x-ndjson", "application/jsonl")
+_transaction_batch = TypeAdapter(List[TransactionIn])
+_TRANSACTION_IN_REF = {"$ref": "#/components/schemas/TransactionIn"}
+
+
+def _transactions_page(
+    db: Session,
+    user_id,
+    filters: TransactionFilters,
+    limit: int,
+    cursor: Optional[str],
+) -> TransactionPageOut:
+    conditions = transaction_conditions(user_id, filters)
+    try:
+        transactions, next_cursor = paginate_transactions(
+            db, conditions, limit, cursor
+        )
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return TransactionPageOut(
+        transactions=[
+            TransactionOut(**transaction.__dict__)
+            for transaction in transactions
+        ],
+        nextCursor=next_cursor,
+    )
+
 
 @router.get(
     "",
-    description="Get list of transactions.",
-    response_model=List[TransactionOut],
+    description="Get a page of transactions, newest first.",
+    response_model=TransactionPageOut,
 )
 def list_transactions(
-    db: Session = Depends(get_db),
+    filters: TransactionFilters = Depends(),
+    limit: int = Query(
+        TRANSACTIONS_PAGE_SIZE, ge=1, le=TRANSACTIONS_MAX_PAGE_SIZE
+    ),
+    cursor: Optional[str] = Query(None),
+    db: Session = Depends(get_read_db),
     user: UserDB = Security(get_current_user, scopes=["transaction_read"]),
-) -> List[TransactionOut]:
+) -> TransactionPageOut:
     """List transactions."""
-    return (
-        db.query(TransactionDB).filter(TransactionDB.userId == user.id).all()
-    )
+    return _transactions_page(db, user.id, filters, limit, cursor)
 
 
 @router.get(
     "/{username}",
-    description="Get list of transactions.",
-    response_model=List[TransactionOut],
+    description="Get a page of transactions, newest first.",
+    response_model=TransactionPageOut,
 )
 def list_user_transactions(
     username: str,
-    db: Session = Depends(get_db),
+    filters: TransactionFilters = Depends(),
+    limit: int = Query(
+        TRANSACTIONS_PAGE_SIZE, ge=1, le=TRANSACTIONS_MAX_PAGE_SIZE
+    ),
+    cursor: Optional[str] = Query(None),
+    db: Session = Depends(get_read_db),
     user: UserDB = Security(
         get_current_user, scopes=["admin", "transaction_read"]
     ),
-) -> List[TransactionOut]:
+) -> TransactionPageOut:
     """List transactions by user."""
     requested_user = (
         db.query(UserDB).filter(UserDB.username == username, UserDB.active == True).first()
     )
     if not requested_user:
         raise HTTPException(status_code=404, detail="User not found")
-    return (
-        db.query(TransactionDB)
-        .filter(TransactionDB.userId == requested_user.id)
-        .all()
-    )
+    return _transactions_page(db, requested_user.id, filters, limit, cursor)
 
 
 @router.post(
@@ -68,29 +135,235 @@ def create_transaction(
     user: UserDB = Security(get_current_user, scopes=["transaction_write"]),
 ) -> TransactionOut:
     """Create a user transaction."""
-    transaction_type = transaction.transactionType
-    if (
-        transaction.amount < 0
-        and transaction_type != TransactionType.investment
-    ):
-        transaction_type = TransactionType.expense
-    elif (
-        transaction.amount > 0
-        and transaction_type != TransactionType.investment
-    ):
-        transaction_type = TransactionType.income
+    transaction_type = select_transaction_type(
+        transaction.amount, transaction.transactionType
+    )
     transaction = TransactionDB(
         **{
-            **transaction.model_dump(),
+            **transaction.model_dump(exclude={"amount"}),
+            "amountCents": to_cents(transaction.amount),
             "userId": user.id,
             "createdBy": user.id,
             "transactionType": transaction_type,
         }
     )
     db.add(transaction)
+    apply_rollup_deltas(db, [rollup_delta(transaction)])
     db.commit()
+    invalidate_user_caches(user.id)
     db.refresh(transaction)
-    return transaction
+    return TransactionOut(**transaction.__dict__)
+
+
+def _body_errors(exc: ValidationError, *loc) -> list:
+    return [
+        {**error, "loc": ("body", *loc, *error["loc"])}
+        for error in exc.errors(include_url=False)
+    ]
+
+
+def _check_batch_size(size: int) -> None:
+    if size > TRANSACTIONS_MAX_BATCH_SIZE:
+        raise HTTPException(
+            status_code=413,
+            detail=(
+                f"At most {TRANSACTIONS_MAX_BATCH_SIZE} transactions "
+                "per batch"
+            ),
+        )
+
+
+def _check_batch_bytes(size: int) -> None:
+    if size > TRANSACTIONS_MAX_BATCH_BYTES:
+        raise HTTPException(
+            status_code=413,
+            detail=f"At most {TRANSACTIONS_MAX_BATCH_BYTES} bytes per batch",
+        )
+
+
+async def _read_body(request: Request) -> bytes:
+    """Read a body, refusing it before it exceeds the byte cap."""
+    body = bytearray()
+    async for chunk in request.stream():
+        body += chunk
+        _check_batch_bytes(len(body))
+    return bytes(body)
+
+
+async def _read_transaction_batch(request: Request) -> List[TransactionIn]:
+    """Validate a JSON array or NDJSON body of transactions.
+
+    NDJSON is validated line by line as it streams in. Errors of all
+    transactions are raised together, located by transaction index.
+    Bodies over the byte cap are refused from their Content-Length,
+    before they are read.
+    """
+    length = request.headers.get("content-length", "")
+    if length.isdigit():
+        _check_batch_bytes(int(length))
+    media_type = request.headers.get("content-type", "")
+    if media_type.split(";")[0].strip().lower() not in NDJSON_MEDIA_TYPES:
+        try:
+            transactions = _transaction_batch.validate_json(
+                await _read_body(request)
+            )
+        except ValidationError as exc:
+            raise RequestValidationError(_body_errors(exc))
+        _check_batch_size(len(transactions))
+        return transactions
+
+    transactions, errors = [], []
+    index = 0
+
+    def validate(line: bytes) -> None:
+        nonlocal index
+        if not line.strip():
+            return
+        _check_batch_size(index + 1)
+        try:
+            transactions.append(TransactionIn.model_validate_json(line))
+        except ValidationError as exc:
+            errors.extend(_body_errors(exc, index))
+        index += 1
+
+    pending, size = b"", 0
+    async for chunk in request.stream():
+        size += len(chunk)
+        _check_batch_bytes(size)
+        *lines, pending = (pending + chunk).split(b"\n")
+        for line in lines:
+            validate(line)
+    validate(pending)
+    if errors:
+        raise RequestValidationError(errors)
+    return transactions
+
+
+@router.post(
+    "/batch",
+    description=(
+        "Create transactions from a JSON array, or NDJSON with an "
+        "application/x-ndjson content type. Either all transactions are "
+        "created or none."
+    ),
+    response_model=TransactionBatchOut,
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {
+                "application/json": {
+                    "schema": {"type": "array", "items": _TRANSACTION_IN_REF}
+                },
+                "application/x-ndjson": {"schema": _TRANSACTION_IN_REF},
+            },
+        }
+    },
+)
+async def create_transactions_batch(
+    request: Request,
+    db: AsyncSession = Depends(get_async_db),
+    user: UserDB = Security(get_current_user, scopes=["transaction_write"]),
+) -> TransactionBatchOut:
+    """Create a batch of user transactions.
+
+    Types are selected with the same rules as for single transactions,
+    and rows are inserted with executemany in one database transaction.
+    """
+    transactions = await _read_transaction_batch(request)
+    if not transactions:
+        raise HTTPException(
+            status_code=400, detail="No transactions provided"
+        )
+    records = [
+        {
+            **transaction.model_dump(exclude={"amount"}),
+            "id": uuid4(),
+            "transactionDate": transaction.transactionDate.astimezone(
+                timezone.utc
+            ),
+            "amountCents": to_cents(transaction.amount),
+            "userId": user.id,
+            "createdBy": user.id,
+            "transactionType": select_transaction_type(
+                transaction.amount, transaction.transactionType
+            ).value,
+        }
+        for transaction in transactions
+    ]
+    await db.run_sync(insert_transactions, records)
+    await db.commit()
+    invalidate_user_caches(user.id)
+    return TransactionBatchOut(
+        created=len(records), ids=[record["id"] for record in records]
+    )
+
+
+def _bulk_conditions(
+    user_id, filters: TransactionFilters, ids: Optional[List[UUID]]
+) -> list:
+    """Get the conditions of a bulk write, refusing to match everything."""
+    conditions = transaction_conditions(user_id, filters)
+    if ids is not None:
+        conditions.append(TransactionDB.id.in_(ids))
+    if len(conditions) == 1:
+        raise HTTPException(
+            status_code=400, detail="No filters or ids provided"
+        )
+    return conditions
+
+
+@router.patch(
+    "",
+    description=(
+        "Update all transactions matching the filters and, if given, the "
+        "ids with one statement."
+    ),
+)
+def update_transactions_bulk(
+    transaction_update: TransactionBulkUpdate,
+    filters: TransactionFilters = Depends(),
+    db: Session = Depends(get_db),
+    user: UserDB = Security(get_current_user, scopes=["transaction_write"]),
+):
+    """Update transactions by filter."""
+    conditions = _bulk_conditions(user.id, filters, transaction_update.ids)
+    updates = transaction_update.model_dump(
+        exclude={"ids"}, exclude_none=True, exclude_unset=True
+    )
+    if not updates:
+        raise HTTPException(
+            status_code=400, detail="No fields to update provided"
+        )
+    if "amount" in updates:
+        updates["amountCents"] = to_cents(updates.pop("amount"))
+    updated = update_transactions(db, conditions, updates)
+    db.commit()
+    invalidate_user_caches(user.id)
+    return {"success": True, "updated": updated}
+
+
+@router.delete(
+    "",
+    description=(
+        "Delete all transactions matching the filters and, if given, the "
+        "ids with one statement."
+    ),
+)
+def delete_transactions_bulk(
+    filters: TransactionFilters = Depends(),
+    ids: Optional[List[UUID]] = Query(
+        None, max_length=TRANSACTIONS_MAX_BULK_IDS
+    ),
+    db: Session = Depends(get_db),
+    user: UserDB = Security(get_current_user, scopes=["transaction_write"]),
+):
+    """Delete transactions by filter."""
+    deleted = delete_transactions(
+        db, _bulk_conditions(user.id, filters, ids)
+    )
+    db.commit()
+    invalidate_user_caches(user.id)
+    return {"success": True, "deleted": deleted}
 
 
 @router.patch(
@@ -121,9 +394,14 @@ def update_transaction(
         raise HTTPException(
             status_code=400, detail="No fields to update provided"
         )
+    if "amount" in updates:
+        updates["amountCents"] = to_cents(updates.pop("amount"))
+    previous = rollup_delta(transaction, sign=-1)
     for key, value in updates.items():
         setattr(transaction, key, value)
+    apply_rollup_deltas(db, [previous, rollup_delta(transaction)])
     db.commit()
+    invalidate_user_caches(user.id)
     db.refresh(transaction)
     return TransactionOut(**transaction.__dict__)
 
@@ -147,6 +425,8 @@ def delete_transaction(
     )
     if not transaction:
         raise HTTPException(status_code=404, detail="Transaction not found")
+    apply_rollup_deltas(db, [rollup_delta(transaction, sign=-1)])
     db.delete(transaction)
     db.commit()
+    invalidate_user_caches(user.id)
     return {"success": True}
@@ -1,4 +1,6 @@
 # flake8: noqa
 """Transaction DB Models."""
 
+from .import_jobs import ImportJobDB
+from .rollups import MonthlyRollupDB
 from .transactions import TransactionDB
@@ -0,0 +1,51 @@
+"""Import job related database models."""
+
+from datetime import datetime, timezone
+from uuid import uuid4
+
+from sqlalchemy import (
+    JSON,
+    UUID,
+    Column,
+    DateTime,
+    ForeignKey,
+    Index,
+    Integer,
+    String,
+)
+
+from khazana.core.database import DBBaseModel
+
+from ..utils import ImportJobStatus
+
+
+class ImportJobDB(DBBaseModel):
+    """Import job database model.
+
+    Tracks a spooled CSV upload imported in the background. Progress is
+    committed together with each imported chunk, so an interrupted job
+    resumes after its last committed chunk.
+    """
+
+    __tablename__ = "import_jobs"
+    __table_args__ = (Index("ix_import_jobs_status", "status"),)
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid4)
+    userId = Column(UUID(as_uuid=True), ForeignKey("users.id"))
+    createdBy = Column(UUID(as_uuid=True), ForeignKey("users.id"))
+    filename = Column(String)
+    path = Column(String, nullable=False)
+    status = Column(
+        String, nullable=False, default=ImportJobStatus.queued.value
+    )
+    chunkSize = Column(Integer, nullable=False)
+    chunksCommitted = Column(Integer, nullable=False, default=0)
+    rowsImported = Column(Integer, nullable=False, default=0)
+    rowsDuplicate = Column(Integer, nullable=False, default=0)
+    rowsRejected = Column(Integer, nullable=False, default=0)
+    errors = Column(JSON, nullable=False, default=dict)
+    error = Column(String)
+    createdAt = Column(
+        DateTime, default=lambda: datetime.now(timezone.utc)
+    )
+    startedAt = Column(DateTime)
+    finishedAt = Column(DateTime)
@@ -0,0 +1,28 @@
+"""Monthly rollup related database models."""
+
+from sqlalchemy import UUID, BigInteger, Column, ForeignKey, Integer, String
+
+from khazana.core.database import DBBaseModel
+
+from ..utils import DEFAULT_CURRENCY
+
+
+class MonthlyRollupDB(DBBaseModel):
+    """Monthly rollup database model.
+
+    Holds the sum and count of a user's transactions per year-month,
+    transaction type, category and currency. It is kept up to date by
+    every write path and is what the dashboard reads from.
+    """
+
+    __tablename__ = "monthly_rollups"
+    userId = Column(
+        UUID(as_uuid=True), ForeignKey("users.id"), primary_key=True
+    )
+    year = Column(Integer, primary_key=True)
+    month = Column(Integer, primary_key=True)
+    transactionType = Column(String, primary_key=True)
+    category = Column(String, primary_key=True)
+    currency = Column(String, primary_key=True, default=DEFAULT_CURRENCY)
+    totalCents = Column(BigInteger, nullable=False, default=0)
+    transactionCount = Column(Integer, nullable=False, default=0)
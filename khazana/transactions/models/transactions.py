@@ -3,28 +3,62 @@
 from datetime import datetime, timezone
 from uuid import uuid4
 
-from sqlalchemy import UUID, Column, DateTime, Float, ForeignKey, String
+from sqlalchemy import (
+    UUID,
+    BigInteger,
+    Column,
+    DateTime,
+    ForeignKey,
+    Index,
+    String,
+)
 from sqlalchemy.orm import relationship
 
 from khazana.core.database import DBBaseModel
 
-from ..utils import TransactionType
+from ..utils import DEFAULT_CURRENCY, TransactionType
 
 
 class TransactionDB(DBBaseModel):
     """Transaction database model."""
 
     __tablename__ = "transactions"
-    id = Column(
-        UUID(as_uuid=True), primary_key=True, index=True, default=uuid4
+    # Every hot query filters on userId first, so the indexes lead with it.
+    __table_args__ = (
+        Index(
+            "ix_transactions_userId_transactionDate_id",
+            "userId",
+            "transactionDate",
+            "id",
+        ),
+        Index(
+            "ix_transactions_userId_transactionType_transactionDate",
+            "userId",
+            "transactionType",
+            "transactionDate",
+        ),
+        Index(
+            "ix_transactions_userId_category_transactionDate",
+            "userId",
+            "category",
+            "transactionDate",
+        ),
+        Index("ix_transactions_fingerprint", "fingerprint", unique=True),
     )
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid4)
     userId = Column(UUID(as_uuid=True), ForeignKey("users.id"))
     description = Column(String)
-    amount = Column(Float, nullable=False, default=0.0)
-    category = Column(String, nullable=False, index=True)
-    transactionDate = Column(
-        DateTime, default=datetime.now(timezone.utc), index=True
+    # Amount in minor units (cents) of the currency.
+    amountCents = Column(BigInteger, nullable=False, default=0)
+    # ISO 4217 code of the amount.
+    currency = Column(
+        String,
+        nullable=False,
+        default=DEFAULT_CURRENCY,
+        server_default=DEFAULT_CURRENCY,
     )
+    category = Column(String, nullable=False)
+    transactionDate = Column(DateTime, default=datetime.now(timezone.utc))
     createdBy = Column(
         UUID(as_uuid=True), ForeignKey("users.id"), nullable=True
     )
@@ -32,8 +66,9 @@ class TransactionDB(DBBaseModel):
         String,
         nullable=False,
         default=TransactionType.expense.value,
-        index=True,
     )
+    # Content hash of imported transactions used to skip re-imported rows.
+    fingerprint = Column(String, nullable=True)
 
     user = relationship(
         "UserDB",
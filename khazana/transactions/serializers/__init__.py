@@ -1,5 +1,19 @@
 # flake8: noqa
 """Transaction Serializers."""
 
-from .dashboard import TransactionDashboardOut
-from .transactions import TransactionIn, TransactionOut, TransactionUpdate
+from .dashboard import (
+    TransactionAnalyticsCategoryOut,
+    TransactionAnalyticsGroupOut,
+    TransactionAnalyticsOut,
+    TransactionDashboardOut,
+)
+from .import_jobs import ImportJobOut
+from .transactions import (
+    TransactionBatchOut,
+    TransactionBulkUpdate,
+    TransactionFilters,
+    TransactionIn,
+    TransactionOut,
+    TransactionPageOut,
+    TransactionUpdate,
+)
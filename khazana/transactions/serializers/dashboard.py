@@ -1,9 +1,11 @@
 """Transaction Dashboard serializers."""
 
-from typing import Dict
+from typing import Dict, List, Optional
 
 from pydantic import BaseModel
 
+from ..utils import AnalyticsGroupBy
+
 
 class TransactionDashboardOut(BaseModel):
     """Transaction Dashboard out model."""
@@ -11,3 +13,33 @@ class TransactionDashboardOut(BaseModel):
     totalSavings: Dict[str, float]
     monthlyExpenses: Dict[str, float]
     investmentGrowth: Dict[str, float]
+    reportingCurrency: str
+
+
+class TransactionAnalyticsGroupOut(BaseModel):
+    """Transaction Analytics group out model."""
+
+    key: str
+    income: float
+    expense: float
+    investment: float
+    savings: float
+    count: int
+    rollingSavings: Optional[float] = None
+
+
+class TransactionAnalyticsCategoryOut(BaseModel):
+    """Transaction Analytics category out model."""
+
+    category: str
+    expense: float
+    count: int
+
+
+class TransactionAnalyticsOut(BaseModel):
+    """Transaction Analytics out model."""
+
+    groupBy: AnalyticsGroupBy
+    reportingCurrency: str
+    groups: List[TransactionAnalyticsGroupOut]
+    topCategories: List[TransactionAnalyticsCategoryOut]
@@ -0,0 +1,36 @@
+"""Import job serializers."""
+
+from datetime import datetime
+from typing import List, Optional
+from uuid import UUID
+
+from pydantic import BaseModel, Field
+
+from ..utils import ImportJobStatus
+
+
+class ImportJobError(BaseModel):
+    """Rows rejected for the same error."""
+
+    error: str
+    rows: List[int]
+
+
+class ImportJobOut(BaseModel):
+    """Import job out model."""
+
+    id: UUID = Field(...)
+    filename: Optional[str] = Field(None)
+    status: ImportJobStatus = Field(...)
+    rowsProcessed: int = Field(0)
+    rowsImported: int = Field(0)
+    rowsDuplicate: int = Field(0)
+    rowsRejected: int = Field(0)
+    rowsPerSecond: Optional[float] = Field(
+        None, description="Processing throughput since the job started."
+    )
+    errors: List[ImportJobError] = Field([])
+    error: Optional[str] = Field(None)
+    createdAt: Optional[datetime] = Field(None)
+    startedAt: Optional[datetime] = Field(None)
+    finishedAt: Optional[datetime] = Field(None)
@@ -1,19 +1,48 @@
 """Transaction serializers."""
 
 from datetime import datetime, timezone
-from typing import Optional
+from decimal import Decimal
+from typing import List, Optional
 from uuid import UUID
 
-from pydantic import BaseModel, Field, field_validator
+from pydantic import (
+    BaseModel,
+    Field,
+    PlainSerializer,
+    field_validator,
+    model_validator,
+)
+from typing_extensions import Annotated
 
-from ..utils import TransactionType
+from ..utils import (
+    DEFAULT_CURRENCY,
+    TRANSACTIONS_MAX_BULK_IDS,
+    TransactionType,
+    from_cents,
+    normalize_currency,
+    to_cents,
+)
+from ..utils.money import MAX_AMOUNT_CENTS
+
+# Exact amounts, still sent as JSON numbers.
+Money = Annotated[
+    Decimal, PlainSerializer(float, return_type=float, when_used="json")
+]
+
+
+def _validate_amount(v: Decimal) -> Decimal:
+    """Round an amount to cents."""
+    cents = to_cents(v)
+    if abs(cents) > MAX_AMOUNT_CENTS:
+        raise ValueError("Amount is out of range.")
+    return from_cents(cents)
 
 
 class TransactionIn(BaseModel):
     """Transaction model."""
 
     description: str = Field(...)
-    amount: float = Field(
+    amount: Money = Field(
         ...,
         description=(
             "If transactionType is not investment it will be "
@@ -24,6 +53,21 @@ class TransactionIn(BaseModel):
     category: str = Field(...)
     transactionDate: datetime = Field(datetime.now(timezone.utc))
     transactionType: Optional[TransactionType] = Field(TransactionType.expense)
+    currency: str = Field(
+        DEFAULT_CURRENCY, description="ISO 4217 code of the amount."
+    )
+
+    @field_validator("amount")
+    @classmethod
+    def validate_amount(cls, v: Decimal):
+        """Validate amount."""
+        return _validate_amount(v)
+
+    @field_validator("currency")
+    @classmethod
+    def validate_currency(cls, v: str):
+        """Validate currency."""
+        return normalize_currency(v)
 
     @field_validator("transactionDate")
     @classmethod
@@ -41,6 +85,14 @@ class TransactionOut(TransactionIn):
 
     id: UUID = Field(...)
 
+    @model_validator(mode="before")
+    @classmethod
+    def amount_from_cents(cls, data):
+        """Get the decimal amount of stored cents."""
+        if isinstance(data, dict) and "amountCents" in data:
+            data = {**data, "amount": from_cents(data["amountCents"])}
+        return data
+
     @field_validator("transactionDate")
     @classmethod
     def validate_transaction_date(cls, v: datetime):
@@ -52,7 +104,7 @@ class TransactionUpdate(BaseModel):
     """Transaction update model."""
 
     description: Optional[str] = Field(None)
-    amount: Optional[float] = Field(
+    amount: Optional[Money] = Field(
         None,
         description=(
             "If transactionType is not investment it will be "
@@ -63,6 +115,21 @@ class TransactionUpdate(BaseModel):
     category: Optional[str] = Field(None)
     transactionDate: Optional[datetime] = Field(None)
     transactionType: Optional[TransactionType] = Field(None)
+    currency: Optional[str] = Field(
+        None, description="ISO 4217 code of the amount."
+    )
+
+    @field_validator("amount")
+    @classmethod
+    def validate_amount(cls, v: Optional[Decimal]):
+        """Validate amount."""
+        return v if v is None else _validate_amount(v)
+
+    @field_validator("currency")
+    @classmethod
+    def validate_currency(cls, v: Optional[str]):
+        """Validate currency."""
+        return normalize_currency(v) if v else v
 
     @field_validator("transactionDate")
     @classmethod
@@ -75,3 +142,61 @@ class TransactionUpdate(BaseModel):
         if v > datetime.now(timezone.utc):
             raise ValueError("Transaction date can not be in the future.")
         return v
+
+
+class TransactionBulkUpdate(TransactionUpdate):
+    """Transaction bulk update model."""
+
+    ids: Optional[List[UUID]] = Field(
+        None,
+        max_length=TRANSACTIONS_MAX_BULK_IDS,
+        description=(
+            "Only update these transactions, as well as any filters."
+        ),
+    )
+
+
+class TransactionFilters(BaseModel):
+    """Transaction filters model."""
+
+    startDate: Optional[datetime] = Field(
+        None, description="Include transactions on or after this date."
+    )
+    endDate: Optional[datetime] = Field(
+        None, description="Include transactions before this date."
+    )
+    category: Optional[str] = Field(None)
+    transactionType: Optional[TransactionType] = Field(None)
+    minAmount: Optional[Money] = Field(
+        None,
+        allow_inf_nan=False,
+        ge=-from_cents(MAX_AMOUNT_CENTS),
+        le=from_cents(MAX_AMOUNT_CENTS),
+    )
+    maxAmount: Optional[Money] = Field(
+        None,
+        allow_inf_nan=False,
+        ge=-from_cents(MAX_AMOUNT_CENTS),
+        le=from_cents(MAX_AMOUNT_CENTS),
+    )
+
+
+class TransactionBatchOut(BaseModel):
+    """Transaction batch out model."""
+
+    created: int
+    ids: List[UUID] = Field(
+        ..., description="Ids of the created transactions, in order."
+    )
+
+
+class TransactionPageOut(BaseModel):
+    """Transaction page out model."""
+
+    transactions: List[TransactionOut]
+    nextCursor: Optional[str] = Field(
+        None,
+        description=(
+            "Pass as cursor to get the next page, null on the last page."
+        ),
+    )
@@ -1,4 +1,37 @@
 # flake8: noqa
 """Transaction utils."""
 
-from .const import TransactionType
+from .cache import (
+    analytics_cache,
+    dashboard_cache,
+    invalidate_user_caches,
+    is_cacheable,
+)
+from .classification import select_transaction_type, select_transaction_types
+from .const import (
+    ANALYTICS_ROLLING_WINDOW,
+    ANALYTICS_TOP_CATEGORIES,
+    DEFAULT_CURRENCY,
+    TRANSACTIONS_BATCH_SIZE,
+    TRANSACTIONS_MAX_BATCH_BYTES,
+    TRANSACTIONS_MAX_BATCH_SIZE,
+    TRANSACTIONS_MAX_BULK_IDS,
+    TRANSACTIONS_MAX_PAGE_SIZE,
+    TRANSACTIONS_PAGE_SIZE,
+    AnalyticsGroupBy,
+    ImportJobStatus,
+    TransactionFileFormat,
+    TransactionType,
+)
+from .currencies import normalize_currencies, normalize_currency
+from .fingerprints import transaction_fingerprints
+from .formats import (
+    file_format_from_accept,
+    file_format_from_filename,
+    read_transaction_chunks,
+    stream_arrow,
+)
+from .money import amounts_to_cents, from_cents, to_cents
+
+# Utils depending on ..models (e.g. rollups) are imported from their
+# modules directly to avoid a circular import with the models package.
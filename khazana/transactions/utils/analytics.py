@@ -0,0 +1,250 @@
+"""Transaction analytics utils.
+
+A user's transactions are loaded once into NumPy columns, which every
+aggregate is then computed from with vectorized kernels instead of a
+query per slice.
+"""
+
+from datetime import date
+from typing import List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from khazana.exchange_rates.utils import convert_amounts
+
+from ..models import TransactionDB
+from .cache import analytics_cache, is_cacheable
+from .classification import TRANSACTION_TYPES
+from .const import DEFAULT_CURRENCY, AnalyticsGroupBy
+
+
+class TransactionColumns:
+    """Columnar transactions of a user, sorted by date.
+
+    Args:
+        days (np.ndarray): Dates as days since the epoch.
+        cents (np.ndarray): Amounts in cents of ``currency``.
+        types (np.ndarray): Codes into ``TRANSACTION_TYPES``.
+        categories (np.ndarray): Codes into ``category_names``.
+        category_names (np.ndarray): Distinct categories.
+        currency (str): Currency of the amounts.
+    """
+
+    def __init__(
+        self,
+        days: np.ndarray,
+        cents: np.ndarray,
+        types: np.ndarray,
+        categories: np.ndarray,
+        category_names: np.ndarray,
+        currency: str = DEFAULT_CURRENCY,
+    ):
+        """Initialize."""
+        order = np.argsort(days, kind="stable")
+        self.days = np.asarray(days, dtype=np.int64)[order]
+        self.cents = np.asarray(cents, dtype=np.int64)[order]
+        self.types = np.asarray(types, dtype=np.int8)[order]
+        self.categories = np.asarray(categories, dtype=np.int32)[order]
+        self.category_names = np.asarray(category_names, dtype=object)
+        self.currency = currency
+
+    def __len__(self) -> int:
+        """Get the number of transactions."""
+        return len(self.days)
+
+    @property
+    def nbytes(self) -> int:
+        """Get the size of the columns in bytes."""
+        return (
+            self.days.nbytes
+            + self.cents.nbytes
+            + self.types.nbytes
+            + self.categories.nbytes
+            + sum(len(name) for name in self.category_names)
+        )
+
+    def between(
+        self, start: Optional[date] = None, end: Optional[date] = None
+    ) -> "TransactionColumns":
+        """Get the transactions on or after ``start`` and before ``end``.
+
+        Columns are sorted by date, so this is a binary search and the
+        returned columns are views.
+        """
+        lo = (
+            0
+            if start is None
+            else np.searchsorted(self.days, _epoch_days(start))
+        )
+        hi = (
+            len(self)
+            if end is None
+            else np.searchsorted(self.days, _epoch_days(end))
+        )
+        columns = TransactionColumns.__new__(TransactionColumns)
+        columns.days = self.days[lo:hi]
+        columns.cents = self.cents[lo:hi]
+        columns.types = self.types[lo:hi]
+        columns.categories = self.categories[lo:hi]
+        columns.category_names = self.category_names
+        columns.currency = self.currency
+        return columns
+
+    def group_keys(
+        self, group_by: AnalyticsGroupBy
+    ) -> Tuple[np.ndarray, List[str]]:
+        """Get the group code of every transaction and the group labels.
+
+        Months (``YYYY-M``, as on the dashboard) and weeks (the date of
+        their Monday) span every period from the first to the last
+        transaction, so empty periods are kept as zero groups.
+        """
+        if group_by == AnalyticsGroupBy.category:
+            return self.categories, list(self.category_names)
+        if not len(self):
+            return self.days, []
+        if group_by == AnalyticsGroupBy.month:
+            periods = (
+                self.days.astype("datetime64[D]")
+                .astype("datetime64[M]")
+                .astype(np.int64)
+            )
+        else:
+            # The epoch is a Thursday, so weeks start 3 days before it.
+            periods = (self.days + 3) // 7
+        first = periods[0]
+        codes = periods - first
+        labels = np.arange(first, periods[-1] + 1)
+        if group_by == AnalyticsGroupBy.month:
+            return codes, [
+                f"{1970 + label // 12}-{label % 12 + 1}" for label in labels
+            ]
+        return codes, [
+            str(day) for day in (labels * 7 - 3).astype("datetime64[D]")
+        ]
+
+    def group_sums(
+        self, codes: np.ndarray, size: int
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Sum cents and count transactions per group and type.
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: The sums and counts, shaped
+                (groups, transaction types).
+        """
+        shape = (size, len(TRANSACTION_TYPES))
+        cells = codes.astype(np.int64) * shape[1] + self.types
+        sums = np.zeros(size * shape[1], dtype=np.int64)
+        # Sums stay integers, unlike bincount weights.
+        np.add.at(sums, cells, self.cents)
+        counts = np.bincount(cells, minlength=size * shape[1])
+        return sums.reshape(shape), counts.reshape(shape)
+
+
+def rolling_mean(values: np.ndarray, window: int) -> np.ndarray:
+    """Get the trailing mean over ``window`` values.
+
+    Returns:
+        np.ndarray: The means, NaN until the window is full.
+    """
+    result = np.full(len(values), np.nan)
+    if 0 < window <= len(values):
+        totals = np.concatenate(([0], np.cumsum(values)))
+        full = slice(window - 1, None)
+        result[full] = (totals[window:] - totals[:-window]) / window
+    return result
+
+
+def top_n(values: np.ndarray, n: int) -> np.ndarray:
+    """Get the indexes of the ``n`` largest values, largest first."""
+    n = min(n, len(values))
+    if n <= 0:
+        return np.array([], dtype=np.int64)
+    top = np.argpartition(-values, n - 1)[:n]
+    return top[np.argsort(-values[top], kind="stable")]
+
+
+def _epoch_days(day) -> int:
+    return int(np.datetime64(pd.Timestamp(day).date(), "D").astype(np.int64))
+
+
+def load_transaction_columns(
+    db: Session, user_id, currency: str = DEFAULT_CURRENCY
+) -> TransactionColumns:
+    """Load a user's transactions into columns.
+
+    Amounts in other currencies are converted to ``currency`` at the
+    rates as of their date, all at once.
+
+    Raises:
+        ValueError: If there is no exchange rate for a currency.
+    """
+    frame = pd.DataFrame(
+        db.execute(
+            select(
+                TransactionDB.transactionDate,
+                TransactionDB.amountCents,
+                TransactionDB.transactionType,
+                TransactionDB.category,
+                TransactionDB.currency,
+            ).where(TransactionDB.userId == user_id)
+        ).all(),
+        columns=[
+            "transactionDate",
+            "amountCents",
+            "transactionType",
+            "category",
+            "currency",
+        ],
+    )
+    days = (
+        pd.to_datetime(frame["transactionDate"])
+        .to_numpy("datetime64[D]")
+        .astype(np.int64)
+    )
+    cents = frame["amountCents"].to_numpy(np.int64, copy=True)
+    currencies = frame["currency"].to_numpy(object)
+    foreign = currencies != currency
+    if foreign.any():
+        converted = convert_amounts(
+            db,
+            cents[foreign],
+            days[foreign].astype("datetime64[D]"),
+            currencies[foreign],
+            currency,
+        )
+        unknown = np.isnan(converted)
+        if unknown.any():
+            missing = sorted(set(currencies[foreign][unknown]))
+            raise ValueError(
+                f"No exchange rate from {', '.join(missing)} to {currency}"
+            )
+        cents[foreign] = np.rint(converted).astype(np.int64)
+    categories, category_names = pd.factorize(frame["category"], sort=True)
+    return TransactionColumns(
+        days,
+        cents,
+        pd.Categorical(
+            frame["transactionType"], categories=TRANSACTION_TYPES
+        ).codes,
+        categories,
+        category_names,
+        currency,
+    )
+
+
+def get_transaction_columns(
+    db: Session, user_id, currency: str = DEFAULT_CURRENCY
+) -> TransactionColumns:
+    """Get a user's transaction columns, loaded once until a write."""
+    key = (user_id, currency)
+    columns = analytics_cache.get(key)
+    if columns is None:
+        generation = analytics_cache.generation
+        columns = load_transaction_columns(db, user_id, currency)
+        if is_cacheable(db, user_id):
+            analytics_cache.set(key, columns, generation=generation)
+    return columns
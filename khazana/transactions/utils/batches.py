@@ -0,0 +1,144 @@
+"""Batch transaction write utils."""
+
+from typing import List, Sequence
+
+import pandas as pd
+from sqlalchemy import delete, insert, update
+from sqlalchemy.orm import Session
+
+from ..models import TransactionDB
+from .const import DEFAULT_CURRENCY, TRANSACTIONS_BATCH_SIZE, TransactionType
+from .filters import _as_utc
+from .rollups import (
+    ROLLUP_KEY,
+    apply_rollup_deltas,
+    rollup_buckets,
+    rollup_deltas_from_frame,
+)
+
+# Record columns the rollup deltas are computed from.
+ROLLUP_COLUMNS = [
+    "userId",
+    "transactionDate",
+    "transactionType",
+    "category",
+    "currency",
+    "amountCents",
+]
+
+
+def insert_transactions(
+    db: Session,
+    records: Sequence[dict],
+    batch_size: int = TRANSACTIONS_BATCH_SIZE,
+) -> None:
+    """Insert transaction records and their rollups in batches.
+
+    Every batch is a single executemany ``INSERT``, and the rollup
+    deltas of all records are merged into one upsert. The caller is
+    responsible for committing, so the whole batch is atomic.
+
+    Args:
+        records (Sequence[dict]): Transaction columns, with their ids and
+            UTC dates.
+        batch_size (int): Rows per ``INSERT``.
+    """
+    for start in range(0, len(records), batch_size):
+        db.execute(insert(TransactionDB), records[start:start + batch_size])
+    frame = pd.DataFrame.from_records(records, columns=ROLLUP_COLUMNS)
+    frame["transactionDate"] = pd.to_datetime(
+        frame["transactionDate"], utc=True
+    )
+    frame["currency"] = frame["currency"].fillna(DEFAULT_CURRENCY)
+    apply_rollup_deltas(db, rollup_deltas_from_frame(frame))
+
+
+def _bucket_deltas(db: Session, conditions: Sequence) -> List[dict]:
+    """Get the rollup buckets of matching transactions as deltas."""
+    return [
+        {
+            **dict(zip(ROLLUP_KEY, row[:-2])),
+            "currency": row[5] or DEFAULT_CURRENCY,
+            "totalCents": row[6],
+            "transactionCount": row[7],
+        }
+        for row in db.execute(rollup_buckets(*conditions))
+    ]
+
+
+def _negated(delta: dict) -> dict:
+    return {
+        **delta,
+        "totalCents": -delta["totalCents"],
+        "transactionCount": -delta["transactionCount"],
+    }
+
+
+def update_transactions(
+    db: Session, conditions: Sequence, updates: dict
+) -> int:
+    """Update all matching transactions with a single ``UPDATE``.
+
+    The rollups of the matching transactions are read per bucket before
+    the update, so they are moved with one upsert however many rows
+    change. The caller is responsible for committing.
+
+    Args:
+        conditions (Sequence): SQL conditions selecting the transactions.
+        updates (dict): Transaction columns and their new values.
+
+    Returns:
+        int: Number of updated transactions.
+    """
+    updates = dict(updates)
+    if updates.get("transactionDate") is not None:
+        updates["transactionDate"] = _as_utc(updates["transactionDate"])
+    if updates.get("transactionType") is not None:
+        updates["transactionType"] = TransactionType(
+            updates["transactionType"]
+        ).value
+    previous = _bucket_deltas(db, conditions)
+    result = db.execute(
+        update(TransactionDB)
+        .where(*conditions)
+        .values(**updates)
+        .execution_options(synchronize_session=False)
+    )
+    moved = {
+        key: updates[key]
+        for key in ("transactionType", "category", "currency")
+        if key in updates
+    }
+    if "transactionDate" in updates:
+        moved["year"] = updates["transactionDate"].year
+        moved["month"] = updates["transactionDate"].month
+    deltas = []
+    for delta in previous:
+        total = delta["totalCents"]
+        if "amountCents" in updates:
+            total = delta["transactionCount"] * updates["amountCents"]
+        deltas.append(_negated(delta))
+        deltas.append({**delta, **moved, "totalCents": total})
+    apply_rollup_deltas(db, deltas)
+    return result.rowcount
+
+
+def delete_transactions(db: Session, conditions: Sequence) -> int:
+    """Delete all matching transactions with a single ``DELETE``.
+
+    The caller is responsible for committing.
+
+    Args:
+        conditions (Sequence): SQL conditions selecting the transactions.
+
+    Returns:
+        int: Number of deleted transactions.
+    """
+    deltas = [_negated(delta) for delta in _bucket_deltas(db, conditions)]
+    result = db.execute(
+        delete(TransactionDB)
+        .where(*conditions)
+        .execution_options(synchronize_session=False)
+    )
+    apply_rollup_deltas(db, deltas)
+    return result.rowcount
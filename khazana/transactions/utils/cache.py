@@ -0,0 +1,62 @@
+"""Transaction caches."""
+
+from sqlalchemy.orm import Session
+
+from khazana.core.database import engine
+from khazana.core.utils import LRUCache
+
+from .const import (
+    ANALYTICS_CACHE_MAX_BYTES,
+    ANALYTICS_CACHE_MAX_ENTRIES,
+    ANALYTICS_CACHE_TTL_SECONDS,
+    DASHBOARD_CACHE_MAX_BYTES,
+    DASHBOARD_CACHE_MAX_ENTRIES,
+    DASHBOARD_CACHE_TTL_SECONDS,
+    READ_REPLICA_MAX_LAG_SECONDS,
+    RECENT_WRITES_MAX_ENTRIES,
+)
+
+# Maps (userId, reporting currency) to the (etag, body) of the rendered
+# dashboard payload.
+dashboard_cache = LRUCache(
+    max_entries=DASHBOARD_CACHE_MAX_ENTRIES,
+    ttl=DASHBOARD_CACHE_TTL_SECONDS,
+    max_bytes=DASHBOARD_CACHE_MAX_BYTES,
+    sizeof=lambda entry: len(entry[1]),
+    scope=lambda key: key[0],
+)
+# Maps (userId, reporting currency) to the columnar transactions of the
+# user used by the analytics.
+analytics_cache = LRUCache(
+    max_entries=ANALYTICS_CACHE_MAX_ENTRIES,
+    ttl=ANALYTICS_CACHE_TTL_SECONDS,
+    max_bytes=ANALYTICS_CACHE_MAX_BYTES,
+    sizeof=lambda columns: columns.nbytes,
+    scope=lambda key: key[0],
+)
+
+# Users whose transactions were written to within the replica lag.
+recent_writes = LRUCache(
+    max_entries=RECENT_WRITES_MAX_ENTRIES, ttl=READ_REPLICA_MAX_LAG_SECONDS
+)
+
+
+def invalidate_user_caches(user_id) -> None:
+    """Drop every cached value derived from a user's transactions.
+
+    Must be called by every write path touching ``TransactionDB``.
+    """
+    recent_writes.set(user_id, True)
+    dashboard_cache.invalidate_scope(user_id)
+    analytics_cache.invalidate_scope(user_id)
+
+
+def is_cacheable(db: Session, user_id) -> bool:
+    """Get whether values of a user read through ``db`` may be cached.
+
+    A replica may not have the latest writes of the user yet, and a
+    cached value read from it would stay stale for the whole TTL.
+    """
+    if db.get_bind().url == engine.url:
+        return True
+    return recent_writes.get(user_id) is None
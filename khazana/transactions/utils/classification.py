@@ -0,0 +1,111 @@
+"""Transaction type classification utils."""
+
+from decimal import Decimal
+from typing import Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from .const import TransactionType
+
+# Transaction type codes, e.g. of analytics columns, index this list.
+TRANSACTION_TYPES = [
+    transaction_type.value for transaction_type in TransactionType
+]
+
+
+def _rule(requested: str, sign: int) -> str:
+    if requested == TransactionType.investment.value or not sign:
+        return requested
+    if sign < 0:
+        return TransactionType.expense.value
+    return TransactionType.income.value
+
+
+# Selected type by requested type, in the order of ``TRANSACTION_TYPES``,
+# and by the sign of the amount plus one.
+TYPE_RULES = np.array(
+    [
+        [_rule(requested, sign) for sign in (-1, 0, 1)]
+        for requested in TRANSACTION_TYPES
+    ],
+    dtype=object,
+)
+
+
+def _normalize_type(value) -> str:
+    """Lower case a requested type, defaulting missing ones to expense."""
+    # None and NaN are missing.
+    if value is None or value != value:
+        value = ""
+    return str(value).lower() or TransactionType.expense.value
+
+
+def select_transaction_types(
+    amounts: pd.Series, transaction_types: pd.Series
+) -> Tuple[pd.Series, pd.Index]:
+    """Classify transactions over whole columns at once.
+
+    Missing types default to expense and types are case insensitive.
+    Investments keep their type, every other transaction is an expense
+    or an income depending on the sign of its amount, and zero amounts
+    keep the given type.
+
+    Args:
+        amounts (pd.Series): Transaction amounts.
+        transaction_types (pd.Series): Requested transaction types.
+
+    Returns:
+        Tuple: The selected types, and the index labels of rows with an
+        unknown transaction type, which are left as given.
+    """
+    # Normalize the few distinct values instead of every row; missing
+    # values get code -1, which picks the trailing default.
+    codes, uniques = pd.factorize(transaction_types)
+    requested = np.array(
+        [_normalize_type(value) for value in uniques]
+        + [TransactionType.expense.value],
+        dtype=object,
+    )
+    rows = np.array(
+        [
+            (
+                TRANSACTION_TYPES.index(value)
+                if value in TRANSACTION_TYPES
+                else -1
+            )
+            for value in requested
+        ]
+    )[codes]
+    valid = rows >= 0
+    signs = np.sign(amounts.to_numpy()).astype(np.int64) + 1
+    selected = np.where(
+        valid, TYPE_RULES[np.where(valid, rows, 0), signs], requested[codes]
+    )
+    return (
+        pd.Series(selected, index=transaction_types.index, dtype=object),
+        transaction_types.index[~valid],
+    )
+
+
+def select_transaction_type(
+    amount: Union[Decimal, float, int],
+    transaction_type: Optional[Union[TransactionType, str]] = None,
+) -> TransactionType:
+    """Classify a single transaction with the bulk import rules.
+
+    Looks the type up in ``TYPE_RULES`` without building any columns,
+    so it is cheap enough to call per request.
+
+    Raises:
+        ValueError: If the transaction type is unknown.
+    """
+    requested = _normalize_type(
+        getattr(transaction_type, "value", transaction_type)
+    )
+    if requested not in TRANSACTION_TYPES:
+        raise ValueError(f"Invalid transaction type: {transaction_type}")
+    sign = (amount > 0) - (amount < 0)
+    return TransactionType(
+        TYPE_RULES[TRANSACTION_TYPES.index(requested), sign + 1]
+    )
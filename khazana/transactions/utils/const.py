@@ -1,7 +1,47 @@
 """Constants."""
 
+import os
+import tempfile
 from enum import Enum
 
+DASHBOARD_CACHE_MAX_ENTRIES = 4096
+DASHBOARD_CACHE_MAX_BYTES = 32 * 1024 * 1024
+DASHBOARD_CACHE_TTL_SECONDS = 15 * 60
+ANALYTICS_CACHE_MAX_ENTRIES = 256
+ANALYTICS_CACHE_MAX_BYTES = 128 * 1024 * 1024
+ANALYTICS_CACHE_TTL_SECONDS = 15 * 60
+ANALYTICS_ROLLING_WINDOW = 3
+ANALYTICS_TOP_CATEGORIES = 5
+# Longest expected lag of a read replica behind the primary.
+READ_REPLICA_MAX_LAG_SECONDS = float(
+    os.getenv("READ_REPLICA_MAX_LAG_SECONDS", "30")
+)
+RECENT_WRITES_MAX_ENTRIES = 65536
+# Currency of transactions created without one.
+DEFAULT_CURRENCY = "USD"
+TRANSACTIONS_PAGE_SIZE = 100
+TRANSACTIONS_MAX_PAGE_SIZE = 1000
+# Rows per INSERT of batch created transactions.
+TRANSACTIONS_BATCH_SIZE = int(os.getenv("TRANSACTIONS_BATCH_SIZE", "1000"))
+TRANSACTIONS_MAX_BATCH_SIZE = int(
+    os.getenv("TRANSACTIONS_MAX_BATCH_SIZE", "100000")
+)
+TRANSACTIONS_MAX_BATCH_BYTES = int(
+    os.getenv("TRANSACTIONS_MAX_BATCH_BYTES", str(64 * 1024 * 1024))
+)
+# Ids per bulk update or delete, each one is a bound parameter.
+TRANSACTIONS_MAX_BULK_IDS = 1000
+EXPORT_BATCH_SIZE = 5000
+IMPORT_CHUNK_SIZE = 10000
+IMPORT_BATCH_SIZE = 1000
+IMPORT_MAX_REPORTED_ERRORS = 1000
+# Inserts of a chunk raced by a concurrent import of the same rows.
+IMPORT_INSERT_ATTEMPTS = 3
+IMPORT_WORKERS = int(os.getenv("IMPORT_WORKERS", "2"))
+IMPORT_SPOOL_DIR = os.getenv(
+    "IMPORT_SPOOL_DIR", os.path.join(tempfile.gettempdir(), "khazana-imports")
+)
+
 
 class TransactionType(str, Enum):
     """Transaction Types."""
@@ -9,3 +49,28 @@ class TransactionType(str, Enum):
     expense = "expense"
     income = "income"
     investment = "investment"
+
+
+class AnalyticsGroupBy(str, Enum):
+    """Analytics Groupings."""
+
+    month = "month"
+    week = "week"
+    category = "category"
+
+
+class TransactionFileFormat(str, Enum):
+    """Bulk Transaction File Formats."""
+
+    csv = "csv"
+    parquet = "parquet"
+    arrow = "arrow"
+
+
+class ImportJobStatus(str, Enum):
+    """Import Job Statuses."""
+
+    queued = "queued"
+    running = "running"
+    completed = "completed"
+    failed = "failed"
@@ -0,0 +1,51 @@
+"""Transaction currency utils."""
+
+from typing import Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .const import DEFAULT_CURRENCY
+
+
+def normalize_currency(currency: Optional[str]) -> str:
+    """Normalize a currency code, defaulting to ``DEFAULT_CURRENCY``.
+
+    Raises:
+        ValueError: The currency is not a 3 letter code.
+    """
+    if currency is None or currency == "":
+        return DEFAULT_CURRENCY
+    currency = currency.strip().upper()
+    if len(currency) != 3 or not currency.isalpha():
+        raise ValueError("Currency must be a 3 letter ISO 4217 code.")
+    return currency
+
+
+def normalize_currencies(
+    currencies: pd.Series,
+) -> Tuple[pd.Series, pd.Index]:
+    """Normalize a column of currency codes at once.
+
+    Returns:
+        Tuple: The normalized currencies, and the index labels of rows
+        with an invalid currency, which are left as given.
+    """
+    codes, uniques = pd.factorize(currencies)
+    normalized = []
+    for currency in uniques:
+        try:
+            normalized.append(normalize_currency(str(currency)))
+        except ValueError:
+            normalized.append(None)
+    normalized = np.array(normalized + [DEFAULT_CURRENCY], dtype=object)
+    selected = normalized[codes]
+    invalid = pd.isna(selected)
+    return (
+        pd.Series(
+            np.where(invalid, currencies.to_numpy(), selected),
+            index=currencies.index,
+            dtype=object,
+        ),
+        currencies.index[invalid],
+    )
@@ -0,0 +1,111 @@
+"""Transaction export utils."""
+
+import csv
+import io
+import zlib
+from typing import Iterator, List, Optional, Sequence
+
+from sqlalchemy import select
+
+from khazana.core.database import ReadSessionLocal
+
+from ..models import TransactionDB
+from .const import EXPORT_BATCH_SIZE
+from .money import CENTS_PER_UNIT
+
+EXPORT_COLUMNS = [
+    "description",
+    "amount",
+    "category",
+    "transactionDate",
+    "transactionType",
+    "currency",
+    "id",
+]
+
+
+def iter_transaction_batches(
+    user_id, batch_size: int = EXPORT_BATCH_SIZE, amount_cents: bool = False
+) -> Iterator[List[Sequence]]:
+    """Iterate over a user's transactions in batches of rows.
+
+    Rows are fetched from a streaming cursor with ``yield_per``, so only
+    one batch is held in memory at a time. A dedicated read session is
+    used since the response outlives the request scoped one.
+
+    Args:
+        amount_cents (bool): Get amounts in cents rather than as floats.
+    """
+    amount = (
+        TransactionDB.amountCents
+        if amount_cents
+        # Cents are divided in SQL, the float amount renders as the exact
+        # decimal in the CSV.
+        else TransactionDB.amountCents / float(CENTS_PER_UNIT)
+    )
+    columns = [
+        amount.label(column)
+        if column == "amount"
+        else getattr(TransactionDB, column)
+        for column in EXPORT_COLUMNS
+    ]
+    with ReadSessionLocal() as db:
+        result = db.execute(
+            select(*columns)
+            .where(TransactionDB.userId == user_id)
+            .order_by(TransactionDB.transactionDate, TransactionDB.id)
+            .execution_options(yield_per=batch_size)
+        )
+        for partition in result.partitions():
+            yield partition
+
+
+def stream_csv(
+    batches: Iterator[List[Sequence]], compress: bool = False
+) -> Iterator[bytes]:
+    """Encode batches of rows as CSV chunks, optionally gzip compressed."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    compressor = (
+        zlib.compressobj(wbits=16 + zlib.MAX_WBITS) if compress else None
+    )
+
+    def drain() -> bytes:
+        chunk = buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
+        return compressor.compress(chunk) if compressor else chunk
+
+    writer.writerow(EXPORT_COLUMNS)
+    yield drain()
+    for batch in batches:
+        writer.writerows(batch)
+        chunk = drain()
+        if chunk:
+            yield chunk
+    if compressor:
+        yield compressor.flush()
+
+
+def accepts_gzip(accept_encoding: Optional[str]) -> bool:
+    """Get whether an Accept-Encoding header accepts gzip.
+
+    Codings refused with ``q=0`` are not accepted, and ``*`` only
+    applies when gzip is not listed itself.
+    """
+    qualities = {}
+    for coding in (accept_encoding or "").split(","):
+        name, *params = [part.strip() for part in coding.split(";")]
+        quality = 1.0
+        for param in params:
+            key, _, value = param.partition("=")
+            if key.strip().lower() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        qualities[name.lower()] = quality
+    for name in ("gzip", "x-gzip", "*"):
+        if name in qualities:
+            return qualities[name] > 0
+    return False
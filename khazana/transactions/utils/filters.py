@@ -0,0 +1,51 @@
+"""Transaction filter utils."""
+
+from datetime import datetime, timezone
+from typing import List, Optional
+
+from ..models import TransactionDB
+from ..serializers import TransactionFilters
+from .money import to_cents
+
+
+def _as_utc(value: datetime) -> datetime:
+    """Convert to the naive UTC datetimes stored in the database."""
+    if value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def transaction_conditions(
+    user_id, filters: Optional[TransactionFilters] = None
+) -> List:
+    """Get the SQL conditions selecting a user's filtered transactions.
+
+    The user condition always comes first so the per-user indexes are
+    used for every combination of filters.
+    """
+    conditions = [TransactionDB.userId == user_id]
+    if filters is None:
+        return conditions
+    if filters.startDate is not None:
+        conditions.append(
+            TransactionDB.transactionDate >= _as_utc(filters.startDate)
+        )
+    if filters.endDate is not None:
+        conditions.append(
+            TransactionDB.transactionDate < _as_utc(filters.endDate)
+        )
+    if filters.category is not None:
+        conditions.append(TransactionDB.category == filters.category)
+    if filters.transactionType is not None:
+        conditions.append(
+            TransactionDB.transactionType == filters.transactionType.value
+        )
+    if filters.minAmount is not None:
+        conditions.append(
+            TransactionDB.amountCents >= to_cents(filters.minAmount)
+        )
+    if filters.maxAmount is not None:
+        conditions.append(
+            TransactionDB.amountCents <= to_cents(filters.maxAmount)
+        )
+    return conditions
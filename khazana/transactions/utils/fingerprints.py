@@ -0,0 +1,64 @@
+"""Transaction fingerprint utils."""
+
+from hashlib import blake2b
+
+import pandas as pd
+
+from .const import DEFAULT_CURRENCY
+
+FINGERPRINT_SEPARATOR = "\x1f"
+
+
+def transaction_fingerprints(
+    transactions: pd.DataFrame, user_id
+) -> pd.Series:
+    """Hash the content of normalized transactions.
+
+    The fingerprint covers the user, the UTC date, the amount in cents,
+    the description, the category and the currency, so the same
+    statement line always gets the same fingerprint however it was
+    formatted in the file. The default currency is left out, so
+    fingerprints of transactions imported before currencies existed
+    still match.
+
+    Args:
+        transactions (pd.DataFrame): Transactions with UTC aware dates
+            and amounts in cents.
+        user_id (UUID): Owner of the transactions.
+
+    Returns:
+        pd.Series: Hex fingerprints aligned with the transactions.
+    """
+    if transactions.empty:
+        return pd.Series([], index=transactions.index, dtype=object)
+    dates = (
+        transactions["transactionDate"]
+        .dt.tz_convert(None)
+        .dt.strftime("%Y-%m-%dT%H:%M:%S.%f")
+    )
+    cents = transactions["amountCents"]
+    keys = (
+        str(user_id)
+        + FINGERPRINT_SEPARATOR
+        + dates
+        + FINGERPRINT_SEPARATOR
+        + cents.astype(str)
+        + FINGERPRINT_SEPARATOR
+        + transactions["description"].fillna("").astype(str)
+        + FINGERPRINT_SEPARATOR
+        + transactions["category"].astype(str)
+    )
+    if "currency" in transactions:
+        currencies = transactions["currency"].fillna(DEFAULT_CURRENCY)
+        foreign = currencies != DEFAULT_CURRENCY
+        keys[foreign] = (
+            keys[foreign] + FINGERPRINT_SEPARATOR + currencies[foreign]
+        )
+    return pd.Series(
+        [
+            blake2b(key.encode(), digest_size=16).hexdigest()
+            for key in keys
+        ],
+        index=transactions.index,
+        dtype=object,
+    )
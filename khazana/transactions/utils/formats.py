@@ -0,0 +1,304 @@
+"""Transaction file format utils.
+
+Bulk transactions are read and written as CSV, Parquet or Arrow IPC.
+Parquet and Arrow keep the column types, amounts as exact decimals and
+dates as UTC timestamps, and both are read and written a batch at a time.
+"""
+
+import io
+from typing import BinaryIO, Iterable, Iterator, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from .const import IMPORT_CHUNK_SIZE, TransactionFileFormat
+from .money import MAX_AMOUNT_CENTS, to_cents
+
+FILE_EXTENSIONS = {
+    ".csv": TransactionFileFormat.csv,
+    ".parquet": TransactionFileFormat.parquet,
+    ".pq": TransactionFileFormat.parquet,
+    ".arrow": TransactionFileFormat.arrow,
+    ".arrows": TransactionFileFormat.arrow,
+    ".feather": TransactionFileFormat.arrow,
+}
+EXPORT_EXTENSIONS = {
+    TransactionFileFormat.csv: ".csv",
+    TransactionFileFormat.parquet: ".parquet",
+    TransactionFileFormat.arrow: ".arrows",
+}
+MEDIA_TYPES = {
+    TransactionFileFormat.csv: "text/csv",
+    TransactionFileFormat.parquet: "application/vnd.apache.parquet",
+    TransactionFileFormat.arrow: "application/vnd.apache.arrow.stream",
+}
+ACCEPTED_MEDIA_TYPES = {
+    **{
+        media_type: file_format
+        for file_format, media_type in MEDIA_TYPES.items()
+    },
+    "application/x-parquet": TransactionFileFormat.parquet,
+    "application/vnd.apache.arrow.file": TransactionFileFormat.arrow,
+}
+# Columns of exported files, in the order of ``EXPORT_COLUMNS``.
+EXPORT_SCHEMA = pa.schema(
+    [
+        ("description", pa.string()),
+        ("amount", pa.decimal128(18, 2)),
+        ("category", pa.string()),
+        ("transactionDate", pa.timestamp("us", tz="UTC")),
+        ("transactionType", pa.string()),
+        ("currency", pa.string()),
+        ("id", pa.string()),
+    ]
+)
+ARROW_COMPRESSION = "zstd"
+
+
+def file_format_from_filename(
+    filename: Optional[str],
+) -> Optional[TransactionFileFormat]:
+    """Get the format of a file from its extension, if supported."""
+    extension = "." + (filename or "").rsplit(".", 1)[-1].lower()
+    return FILE_EXTENSIONS.get(extension)
+
+
+def file_format_from_accept(accept: Optional[str]) -> TransactionFileFormat:
+    """Get the first supported format of an Accept header, CSV otherwise."""
+    for media_type in (accept or "").split(","):
+        file_format = ACCEPTED_MEDIA_TYPES.get(
+            media_type.split(";")[0].strip().lower()
+        )
+        if file_format:
+            return file_format
+    return TransactionFileFormat.csv
+
+
+def cents_to_decimals(cents: np.ndarray) -> pa.Array:
+    """Get cents as an array of decimals with a scale of 2.
+
+    Decimals are stored as 128 bit integers of their unscaled value, so
+    the cents are only sign extended rather than converted one by one.
+    """
+    cents = np.asarray(cents, dtype="<i8")
+    data = np.column_stack([cents, cents >> 63]).ravel()
+    return pa.Array.from_buffers(
+        pa.decimal128(18, 2), len(cents), [None, pa.py_buffer(data)]
+    )
+
+
+def decimals_to_cents(decimals: pa.Array) -> pd.Series:
+    """Get an array of decimals as exact cents.
+
+    Cents are taken from the unscaled 128 bit integers, rescaled from
+    the scale of the array rounding half to even. Nulls and amounts too
+    large to store are missing.
+    """
+    if pa.types.is_decimal256(decimals.type):
+        decimals = decimals.cast(pa.decimal128(38, decimals.type.scale))
+    scale = decimals.type.scale
+    if scale > 20:
+        # Too fine for an int64 divisor, so rounded one by one.
+        return pd.Series(
+            [
+                None if value is None else to_cents(value)
+                for value in decimals.to_pylist()
+            ],
+            dtype="Int64",
+        )
+    words = np.frombuffer(decimals.buffers()[1], dtype="<i8")
+    start = decimals.offset * 2
+    words = words[start:start + 2 * len(decimals)].reshape(-1, 2)
+    low, high = words[:, 0], words[:, 1]
+    missing = high != low >> 63
+    if decimals.null_count:
+        missing |= decimals.is_null().to_numpy(zero_copy_only=False)
+    if scale > 2:
+        divisor = 10 ** (scale - 2)
+        cents, remainders = np.divmod(low, divisor)
+        twice = remainders * 2
+        cents += (twice > divisor) | ((twice == divisor) & (cents % 2 == 1))
+    else:
+        factor = 10 ** (2 - scale)
+        missing |= np.abs(low) > MAX_AMOUNT_CENTS // factor
+        cents = np.where(missing, 0, low) * factor
+    missing |= np.abs(cents) > MAX_AMOUNT_CENTS
+    return pd.Series(pd.arrays.IntegerArray(cents, missing))
+
+
+def record_batch(rows: Sequence[Sequence]) -> pa.RecordBatch:
+    """Get exported rows, with amounts in cents, as a record batch."""
+    columns = list(zip(*rows)) or [()] * len(EXPORT_SCHEMA)
+    arrays = []
+    for field, values in zip(EXPORT_SCHEMA, columns):
+        if field.name == "amount":
+            arrays.append(cents_to_decimals(np.fromiter(values, np.int64)))
+            continue
+        if field.name == "id":
+            values = [str(value) for value in values]
+        arrays.append(pa.array(values, type=field.type))
+    return pa.RecordBatch.from_arrays(arrays, schema=EXPORT_SCHEMA)
+
+
+class _ChunkSink(io.RawIOBase):
+    """Write only file keeping written bytes until they are drained."""
+
+    def __init__(self):
+        """Initialize."""
+        self._chunks = []
+        self._position = 0
+
+    def writable(self) -> bool:
+        """Get whether the file is writable."""
+        return True
+
+    def write(self, data) -> int:
+        """Write bytes."""
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        """Get the number of bytes written."""
+        return self._position
+
+    def drain(self) -> bytes:
+        """Get and forget the bytes written since the last drain."""
+        chunk = b"".join(self._chunks)
+        self._chunks.clear()
+        return chunk
+
+
+def stream_arrow(
+    batches: Iterable[Sequence[Sequence]],
+    file_format: TransactionFileFormat,
+) -> Iterator[bytes]:
+    """Encode batches of rows as Parquet or Arrow IPC stream chunks.
+
+    Every batch is written as a Parquet row group or an Arrow record
+    batch and sent on as soon as it is encoded.
+    """
+    sink = _ChunkSink()
+    if file_format == TransactionFileFormat.parquet:
+        writer = pq.ParquetWriter(
+            sink, EXPORT_SCHEMA, compression=ARROW_COMPRESSION
+        )
+    else:
+        writer = pa.ipc.new_stream(
+            sink,
+            EXPORT_SCHEMA,
+            options=pa.ipc.IpcWriteOptions(compression=ARROW_COMPRESSION),
+        )
+    for batch in batches:
+        writer.write_batch(record_batch(batch))
+        chunk = sink.drain()
+        if chunk:
+            yield chunk
+    writer.close()
+    yield sink.drain()
+
+
+def _rebatch(
+    batches: Iterable[pa.RecordBatch], chunk_size: int
+) -> Iterator[pa.Table]:
+    """Regroup record batches into tables of ``chunk_size`` rows."""
+    pending, rows = [], 0
+    for batch in batches:
+        pending.append(batch)
+        rows += batch.num_rows
+        while rows >= chunk_size:
+            table = pa.Table.from_batches(pending)
+            yield table.slice(0, chunk_size)
+            rest = table.slice(chunk_size)
+            pending, rows = rest.to_batches(), rest.num_rows
+    if rows:
+        yield pa.Table.from_batches(pending)
+
+
+def _to_frame(table: pa.Table, start: int) -> pd.DataFrame:
+    """Get a table as a frame indexed by row number.
+
+    Decimal columns are read as exact cents, into ``<name>Cents``.
+    """
+    columns, names, cents = [], [], {}
+    for field, column in zip(table.schema, table.columns):
+        if pa.types.is_dictionary(field.type):
+            column = column.cast(field.type.value_type)
+        if pa.types.is_decimal(column.type):
+            cents[field.name + "Cents"] = decimals_to_cents(
+                column.combine_chunks()
+            )
+            continue
+        columns.append(column)
+        names.append(field.name)
+    frame = pa.Table.from_arrays(columns, names=names).to_pandas()
+    for name, values in cents.items():
+        frame[name] = values.array
+    frame.index = pd.RangeIndex(start, start + len(frame))
+    return frame
+
+
+def _arrow_batches(
+    transaction_file: BinaryIO, columns: Sequence[str]
+) -> Iterator[pa.RecordBatch]:
+    try:
+        reader = pa.ipc.open_file(transaction_file)
+    except pa.ArrowInvalid:
+        transaction_file.seek(0)
+        reader = pa.ipc.open_stream(transaction_file)
+        batches = iter(reader)
+    else:
+        batches = (
+            reader.get_batch(index)
+            for index in range(reader.num_record_batches)
+        )
+    names = [name for name in columns if name in reader.schema.names]
+    for batch in batches:
+        yield batch.select(names)
+
+
+def read_transaction_chunks(
+    transaction_file: BinaryIO,
+    file_format: TransactionFileFormat = TransactionFileFormat.csv,
+    columns: Sequence[str] = (),
+    chunk_size: int = IMPORT_CHUNK_SIZE,
+) -> Iterator[pd.DataFrame]:
+    """Read a file of transactions in frames of ``chunk_size`` rows.
+
+    Frames are indexed by row number across the file. Only ``columns``
+    are read from Parquet and Arrow files.
+
+    Raises:
+        ValueError: If the file is empty or not of its format.
+    """
+    if file_format == TransactionFileFormat.csv:
+        try:
+            yield from pd.read_csv(
+                transaction_file,
+                chunksize=chunk_size,
+                dtype={"category": str},
+            )
+        except pd.errors.EmptyDataError:
+            raise ValueError("Empty file.")
+        return
+    try:
+        if file_format == TransactionFileFormat.parquet:
+            parquet_file = pq.ParquetFile(transaction_file)
+            batches = parquet_file.iter_batches(
+                batch_size=chunk_size,
+                columns=[
+                    name
+                    for name in columns
+                    if name in parquet_file.schema_arrow.names
+                ],
+            )
+        else:
+            batches = _arrow_batches(transaction_file, columns)
+        start = 0
+        for table in _rebatch(batches, chunk_size):
+            yield _to_frame(table, start)
+            start += table.num_rows
+    except (pa.ArrowInvalid, OSError) as exc:
+        raise ValueError(f"Invalid {file_format.value} file: {exc}")
@@ -0,0 +1,206 @@
+"""Background import job utils.
+
+Uploads are spooled to disk and imported by a bounded in-process worker
+pool. Job progress is committed with every chunk, so jobs interrupted by
+a restart are resumed from their last committed chunk on startup.
+"""
+
+import os
+import shutil
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import BinaryIO, Optional
+
+from sqlalchemy.orm import Session
+
+from khazana.core.database import SessionLocal
+
+from ..models import ImportJobDB
+from .const import (
+    IMPORT_CHUNK_SIZE,
+    IMPORT_SPOOL_DIR,
+    IMPORT_WORKERS,
+    ImportJobStatus,
+    TransactionFileFormat,
+)
+from .formats import file_format_from_filename
+from .imports import ImportReport, import_transactions
+
+SPOOL_BUFFER_SIZE = 1024 * 1024
+ACTIVE_STATUSES = (ImportJobStatus.queued.value, ImportJobStatus.running.value)
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+_stopping = threading.Event()
+
+
+class _ImportInterrupted(Exception):
+    """Raised to stop a job before committing its next chunk."""
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=IMPORT_WORKERS, thread_name_prefix="import-job"
+            )
+        return _executor
+
+
+def _save_progress(job: ImportJobDB, report: ImportReport) -> None:
+    job.chunksCommitted = report.chunks
+    job.rowsImported = report.imported
+    job.rowsDuplicate = report.duplicates
+    job.rowsRejected = report.rejected
+    job.errors = {error: list(rows) for error, rows in report.errors.items()}
+
+
+def spool_upload(
+    upload: BinaryIO, spool_dir: str = IMPORT_SPOOL_DIR, suffix: str = ".csv"
+) -> str:
+    """Copy an upload to the spool directory.
+
+    Returns:
+        str: Path of the spooled file.
+    """
+    os.makedirs(spool_dir, exist_ok=True)
+    fd, path = tempfile.mkstemp(suffix=suffix, dir=spool_dir)
+    with os.fdopen(fd, "wb") as spool:
+        shutil.copyfileobj(upload, spool, SPOOL_BUFFER_SIZE)
+    return path
+
+
+def create_import_job(
+    db: Session,
+    upload: BinaryIO,
+    filename: str,
+    user_id,
+    created_by,
+    chunk_size: int = IMPORT_CHUNK_SIZE,
+) -> ImportJobDB:
+    """Spool an upload and queue its import."""
+    path = spool_upload(upload, suffix=os.path.splitext(filename)[1])
+    try:
+        job = ImportJobDB(
+            userId=user_id,
+            createdBy=created_by,
+            filename=filename,
+            path=path,
+            chunkSize=chunk_size,
+        )
+        db.add(job)
+        db.commit()
+    except BaseException:
+        # No job refers to the spooled file.
+        db.rollback()
+        os.remove(path)
+        raise
+    db.refresh(job)
+    submit_import_job(job.id)
+    return job
+
+
+def submit_import_job(job_id) -> None:
+    """Queue a job on the worker pool."""
+    _get_executor().submit(run_import_job, job_id)
+
+
+def run_import_job(job_id) -> None:
+    """Run or resume an import job.
+
+    The job is resumed after its last committed chunk. It is marked as
+    failed if the file can not be imported, and left running if the
+    workers are stopped, so it is picked up again on the next startup.
+    """
+    if _stopping.is_set():
+        return
+    with SessionLocal() as db:
+        job = db.get(ImportJobDB, job_id)
+        if not job or job.status not in ACTIVE_STATUSES:
+            return
+        job.status = ImportJobStatus.running.value
+        job.startedAt = job.startedAt or datetime.now(timezone.utc)
+        db.commit()
+
+        report = ImportReport()
+        report.chunks = job.chunksCommitted
+        report.imported = job.rowsImported
+        report.duplicates = job.rowsDuplicate
+        report.rejected = job.rowsRejected
+        report.errors = {
+            error: list(rows) for error, rows in job.errors.items()
+        }
+
+        def on_chunk(report: ImportReport) -> None:
+            if _stopping.is_set():
+                raise _ImportInterrupted()
+            _save_progress(job, report)
+
+        try:
+            with open(job.path, "rb") as transaction_file:
+                import_transactions(
+                    db,
+                    transaction_file,
+                    job.userId,
+                    job.createdBy,
+                    file_format=(
+                        file_format_from_filename(job.filename)
+                        or TransactionFileFormat.csv
+                    ),
+                    chunk_size=job.chunkSize,
+                    report=report,
+                    on_chunk=on_chunk,
+                )
+        except _ImportInterrupted:
+            db.rollback()
+            return
+        except Exception as exc:
+            db.rollback()
+            job.status = ImportJobStatus.failed.value
+            job.error = str(exc) or exc.__class__.__name__
+        else:
+            # Parser errors end the import without a chunk to commit with.
+            _save_progress(job, report)
+            if report.error:
+                job.status = ImportJobStatus.failed.value
+                job.error = report.error
+            else:
+                job.status = ImportJobStatus.completed.value
+        job.finishedAt = datetime.now(timezone.utc)
+        db.commit()
+        try:
+            os.remove(job.path)
+        except FileNotFoundError:
+            pass
+
+
+def start_import_workers() -> int:
+    """Resume queued and interrupted jobs.
+
+    Returns:
+        int: Number of resumed jobs.
+    """
+    _stopping.clear()
+    with SessionLocal() as db:
+        job_ids = [
+            job_id
+            for job_id, in db.query(ImportJobDB.id)
+            .filter(ImportJobDB.status.in_(ACTIVE_STATUSES))
+            .order_by(ImportJobDB.createdAt)
+        ]
+    for job_id in job_ids:
+        submit_import_job(job_id)
+    return len(job_ids)
+
+
+def stop_import_workers() -> None:
+    """Stop the workers after their current chunk."""
+    global _executor
+    _stopping.set()
+    with _executor_lock:
+        executor, _executor = _executor, None
+    if executor is not None:
+        executor.shutdown(wait=True)
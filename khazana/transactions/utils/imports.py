@@ -0,0 +1,340 @@
+"""Transaction import utils."""
+
+from datetime import datetime, timezone
+from typing import BinaryIO, Callable, Dict, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+from dateutil import parser as dateutil_parser
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from ..models import TransactionDB
+from .cache import invalidate_user_caches
+from .classification import select_transaction_types
+from .currencies import normalize_currencies
+from .const import (
+    IMPORT_BATCH_SIZE,
+    IMPORT_CHUNK_SIZE,
+    IMPORT_INSERT_ATTEMPTS,
+    IMPORT_MAX_REPORTED_ERRORS,
+    TransactionFileFormat,
+)
+from .fingerprints import transaction_fingerprints
+from .formats import read_transaction_chunks
+from .money import CENTS_PER_UNIT, MAX_AMOUNT_CENTS, amounts_to_cents
+from .rollups import apply_rollup_deltas, rollup_deltas_from_frame
+
+IMPORT_COLUMNS = [
+    "description",
+    "amount",
+    "category",
+    "transactionDate",
+    "transactionType",
+    "currency",
+]
+REQUIRED_IMPORT_COLUMNS = ["amount", "transactionDate"]
+
+
+class ImportReport:
+    """Outcome of a bulk import.
+
+    Imported rows are new transactions, duplicates are rows whose
+    fingerprint was already imported. Rejected rows are grouped by
+    error. Only the first ``max_errors`` row numbers are kept, so the
+    report stays bounded for files with many bad rows. An import stopped
+    part way by a malformed file keeps its committed chunks and the
+    parser error.
+    """
+
+    def __init__(self, max_errors: int = IMPORT_MAX_REPORTED_ERRORS):
+        """Initialize."""
+        self.max_errors = max_errors
+        self.chunks = 0
+        self.imported = 0
+        self.duplicates = 0
+        self.rejected = 0
+        self.errors: Dict[str, List[int]] = {}
+        self.error: Optional[str] = None
+
+    @property
+    def processed(self) -> int:
+        """Number of rows imported, skipped as duplicates or rejected."""
+        return self.imported + self.duplicates + self.rejected
+
+    def reject(self, rows: Iterable[int], error: str) -> None:
+        """Reject rows, numbered from 1 after the header."""
+        rows = [int(row) + 1 for row in rows]
+        if not rows:
+            return
+        reported = self.rejected
+        self.rejected += len(rows)
+        rows = rows[:max(self.max_errors - reported, 0)]
+        self.errors.setdefault(error, []).extend(rows)
+
+    def to_dict(self) -> dict:
+        """Get the report as a response payload."""
+        return {
+            "success": self.error is None,
+            "error": self.error,
+            "processed": self.processed,
+            "imported": self.imported,
+            "duplicates": self.duplicates,
+            "rejected": self.rejected,
+            "errors": [
+                {"error": error, "rows": rows}
+                for error, rows in self.errors.items()
+            ],
+        }
+
+
+def _parse_dates(dates: pd.Series) -> pd.Series:
+    if pd.api.types.is_datetime64_any_dtype(dates):
+        # Typed dates, e.g. from Parquet, only need to be in UTC.
+        if dates.dt.tz is None:
+            return dates.dt.tz_localize(timezone.utc)
+        return dates.dt.tz_convert(timezone.utc)
+    parsed = pd.to_datetime(dates, utc=True, errors="coerce")
+    # Fall back to per row parsing when the inferred format does not fit.
+    retry = parsed.isna() & dates.notna()
+    if retry.any():
+        parsed[retry] = pd.to_datetime(
+            dates[retry], utc=True, errors="coerce", format="mixed"
+        )
+    return parsed
+
+
+def _after_max_timestamp(dates: pd.Series) -> pd.Series:
+    """Get which unparsed dates are valid, but past ``pd.Timestamp.max``.
+
+    Such dates, e.g. in the year 2999, can not be parsed into a column
+    but are still future dates rather than invalid ones.
+    """
+
+    def after_max(value) -> bool:
+        try:
+            parsed = dateutil_parser.parse(str(value))
+        except (ValueError, OverflowError):
+            return False
+        return parsed.replace(tzinfo=None) > pd.Timestamp.max
+
+    return dates.map(after_max).astype(bool)
+
+
+def normalize_chunk(
+    chunk: pd.DataFrame, report: ImportReport
+) -> pd.DataFrame:
+    """Validate and normalize a chunk of imported transactions.
+
+    Invalid rows are recorded in the report and dropped. Amounts are
+    taken as is from an ``amountCents`` column, read from typed
+    decimals, rather than rounded from ``amount``.
+    """
+    # Typed decimals are already exact cents.
+    exact_cents = chunk.get("amountCents")
+    for column in IMPORT_COLUMNS:
+        if column not in chunk.columns:
+            chunk[column] = None
+    chunk = chunk[IMPORT_COLUMNS].copy()
+
+    chunk["category"] = (
+        chunk["category"]
+        .fillna("Uncategorized")
+        .replace({"": "Uncategorized"})
+    )
+    chunk["description"] = chunk["description"].astype(object)
+    chunk["description"] = chunk["description"].where(
+        chunk["description"].notna(), None
+    )
+
+    missing_dates = chunk["transactionDate"].isna()
+    report.reject(
+        chunk.index[missing_dates], "Transaction date can not be null."
+    )
+    chunk = chunk[~missing_dates]
+    dates = chunk["transactionDate"]
+    chunk["transactionDate"] = _parse_dates(dates)
+    invalid_dates = chunk["transactionDate"].isna()
+    future_dates = (
+        chunk["transactionDate"] > datetime.now(timezone.utc)
+    ) | _after_max_timestamp(dates[invalid_dates]).reindex(
+        chunk.index, fill_value=False
+    )
+    invalid_dates &= ~future_dates
+    report.reject(chunk.index[invalid_dates], "Invalid transaction date.")
+    report.reject(
+        chunk.index[future_dates],
+        "Transaction date can not be in the future.",
+    )
+    chunk = chunk[~(invalid_dates | future_dates)]
+
+    amounts = chunk.pop("amount")
+    if exact_cents is not None:
+        exact_cents = exact_cents.loc[chunk.index]
+        invalid_amounts = exact_cents.isna()
+    else:
+        amounts = pd.to_numeric(amounts, errors="coerce")
+        invalid_amounts = ~np.isfinite(amounts) | (
+            amounts.abs() * CENTS_PER_UNIT > MAX_AMOUNT_CENTS
+        )
+    report.reject(chunk.index[invalid_amounts], "Invalid amount.")
+    chunk = chunk[~invalid_amounts]
+    if exact_cents is not None:
+        chunk["amountCents"] = exact_cents[~invalid_amounts].astype(np.int64)
+    else:
+        chunk["amountCents"] = amounts_to_cents(amounts[~invalid_amounts])
+
+    chunk["currency"], invalid_currencies = normalize_currencies(
+        chunk["currency"]
+    )
+    report.reject(invalid_currencies, "Invalid currency.")
+    chunk = chunk.drop(index=invalid_currencies)
+
+    chunk["transactionType"], invalid_types = select_transaction_types(
+        chunk["amountCents"], chunk["transactionType"]
+    )
+    report.reject(invalid_types, "Invalid transaction type.")
+    return chunk.drop(index=invalid_types)
+
+
+def drop_duplicate_transactions(
+    db: Session,
+    chunk: pd.DataFrame,
+    report: ImportReport,
+    batch_size: int = IMPORT_BATCH_SIZE,
+) -> pd.DataFrame:
+    """Drop fingerprinted transactions which were already imported.
+
+    Existing fingerprints are looked up with one ``IN`` query per batch
+    against the unique fingerprint index, rather than row by row. Rows
+    repeated within the chunk are dropped as well.
+    """
+    if chunk.empty:
+        return chunk
+    fingerprints = chunk["fingerprint"].tolist()
+    existing = set()
+    for start in range(0, len(fingerprints), batch_size):
+        existing.update(
+            db.scalars(
+                select(TransactionDB.fingerprint).where(
+                    TransactionDB.fingerprint.in_(
+                        fingerprints[start:start + batch_size]
+                    )
+                )
+            )
+        )
+    duplicates = (
+        chunk["fingerprint"].isin(existing)
+        | chunk["fingerprint"].duplicated()
+    )
+    report.duplicates += int(duplicates.sum())
+    return chunk[~duplicates]
+
+
+def _import_chunk(
+    db: Session,
+    chunk: pd.DataFrame,
+    report: ImportReport,
+    batch_size: int,
+    on_chunk: Optional[Callable[[ImportReport], None]],
+) -> None:
+    """Insert and commit the new rows of a chunk.
+
+    Another import of the same rows may commit between the fingerprint
+    lookup and the insert, which then fails on the unique fingerprint
+    index. The chunk is rolled back and its duplicates looked up again.
+    """
+    counts = (report.imported, report.duplicates, report.chunks)
+    for attempt in range(1, IMPORT_INSERT_ATTEMPTS + 1):
+        new = drop_duplicate_transactions(db, chunk, report, batch_size)
+        try:
+            if not new.empty:
+                records = new.to_dict(orient="records")
+                for start in range(0, len(records), batch_size):
+                    db.bulk_insert_mappings(
+                        TransactionDB, records[start:start + batch_size]
+                    )
+                apply_rollup_deltas(db, rollup_deltas_from_frame(new))
+                report.imported += len(records)
+            report.chunks += 1
+            if on_chunk:
+                on_chunk(report)
+            db.commit()
+            return
+        except IntegrityError:
+            db.rollback()
+            report.imported, report.duplicates, report.chunks = counts
+            if attempt == IMPORT_INSERT_ATTEMPTS:
+                raise
+
+
+def import_transactions(
+    db: Session,
+    transaction_file: BinaryIO,
+    user_id,
+    created_by,
+    file_format: TransactionFileFormat = TransactionFileFormat.csv,
+    chunk_size: int = IMPORT_CHUNK_SIZE,
+    batch_size: int = IMPORT_BATCH_SIZE,
+    report: Optional[ImportReport] = None,
+    on_chunk: Optional[Callable[[ImportReport], None]] = None,
+) -> ImportReport:
+    """Import transactions from a CSV, Parquet or Arrow file by chunks.
+
+    Each chunk is validated, inserted in batches of ``batch_size`` and
+    committed together with its rollup deltas, so peak memory is bounded
+    by the chunk size and the write lock is released between chunks.
+    Rows which were already imported are skipped, so importing the same
+    file again only reads.
+
+    Args:
+        report (ImportReport, optional): Report of an interrupted import
+            to resume; its first ``report.chunks`` chunks are skipped.
+        on_chunk (Callable, optional): Called with the report before
+            each chunk is committed, e.g. to persist progress atomically
+            with the chunk.
+
+    A file which turns out to be malformed after some chunks were
+    committed stops the import, and the parser error is recorded in the
+    report.
+
+    Raises:
+        ValueError: If the file is empty, invalid or misses required
+            columns, or malformed before any chunk was committed.
+    """
+    report = report or ImportReport()
+    imported = report.imported
+    chunks = read_transaction_chunks(
+        transaction_file, file_format, IMPORT_COLUMNS, chunk_size
+    )
+    try:
+        for index, chunk in enumerate(chunks):
+            if index < report.chunks:
+                continue
+            missing = set(REQUIRED_IMPORT_COLUMNS).difference(
+                chunk.columns
+            )
+            if "amountCents" in chunk.columns:
+                missing.discard("amount")
+            if missing:
+                raise ValueError(
+                    f"Missing required columns: {', '.join(sorted(missing))}"
+                )
+            chunk = normalize_chunk(chunk, report)
+            chunk["fingerprint"] = transaction_fingerprints(chunk, user_id)
+            chunk["userId"] = user_id
+            chunk["createdBy"] = created_by
+            _import_chunk(db, chunk, report, batch_size, on_chunk)
+    except pd.errors.ParserError as exc:
+        if not report.chunks:
+            raise ValueError(f"Invalid file: {exc}") from exc
+        report.error = (
+            f"Import stopped after {report.processed} rows: {exc}"
+        )
+    finally:
+        # Release the reader while the file is still open.
+        chunks.close()
+        if report.imported > imported:
+            invalidate_user_caches(user_id)
+    return report
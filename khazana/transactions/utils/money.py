@@ -0,0 +1,42 @@
+"""Money amount utils.
+
+Amounts are stored as integers of minor units (cents), so sums are exact
+and the same whichever order they are added in.
+"""
+
+from decimal import ROUND_HALF_EVEN, Decimal
+from typing import Union
+
+import numpy as np
+import pandas as pd
+
+CENTS_PER_UNIT = 100
+# Largest amount in cents exactly representable as a float as well.
+MAX_AMOUNT_CENTS = 2**53
+
+
+def to_cents(amount: Union[Decimal, float, int, str]) -> int:
+    """Convert an amount to cents, rounding half to even."""
+    return int(
+        (Decimal(str(amount)) * CENTS_PER_UNIT).to_integral_value(
+            rounding=ROUND_HALF_EVEN
+        )
+    )
+
+
+def from_cents(cents: int) -> Decimal:
+    """Convert cents to an exact decimal amount."""
+    return Decimal(int(cents)).scaleb(-2)
+
+
+def amounts_to_cents(amounts: pd.Series) -> pd.Series:
+    """Convert a column of amounts to cents, rounding as ``to_cents``.
+
+    Floats times 100 are not exact, so every distinct amount is rounded
+    as a decimal once and the cents are mapped back onto the column.
+    """
+    codes, uniques = pd.factorize(amounts)
+    cents = np.fromiter(
+        (to_cents(amount) for amount in uniques), np.int64, len(uniques)
+    )
+    return pd.Series(cents[codes], index=amounts.index)
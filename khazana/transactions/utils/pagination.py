@@ -0,0 +1,84 @@
+"""Transaction pagination utils."""
+
+import base64
+import binascii
+import json
+from datetime import datetime
+from typing import List, Optional, Tuple
+from uuid import UUID
+
+from sqlalchemy import and_, or_
+from sqlalchemy.orm import Session
+
+from ..models import TransactionDB
+
+
+def encode_cursor(transaction: TransactionDB) -> str:
+    """Encode the position after a transaction as an opaque cursor."""
+    position = [transaction.transactionDate.isoformat(), transaction.id.hex]
+    return base64.urlsafe_b64encode(json.dumps(position).encode()).decode()
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, UUID]:
+    """Decode a cursor.
+
+    Raises:
+        ValueError: If the cursor is malformed.
+    """
+    try:
+        transaction_date, transaction_id = json.loads(
+            base64.urlsafe_b64decode(cursor.encode())
+        )
+        return (
+            datetime.fromisoformat(transaction_date),
+            UUID(transaction_id),
+        )
+    except (
+        AttributeError,
+        binascii.Error,
+        TypeError,
+        UnicodeDecodeError,
+        ValueError,
+    ) as exc:
+        raise ValueError("Invalid cursor.") from exc
+
+
+def paginate_transactions(
+    db: Session,
+    conditions: List,
+    limit: int,
+    cursor: Optional[str] = None,
+) -> Tuple[List[TransactionDB], Optional[str]]:
+    """Get a page of transactions, newest first.
+
+    Uses keyset pagination on (transactionDate, id), so every page costs
+    the same no matter how deep into the history it is.
+
+    Returns:
+        Tuple: The transactions and the cursor of the next page, if any.
+    """
+    if cursor:
+        transaction_date, transaction_id = decode_cursor(cursor)
+        conditions = [
+            *conditions,
+            or_(
+                TransactionDB.transactionDate < transaction_date,
+                and_(
+                    TransactionDB.transactionDate == transaction_date,
+                    TransactionDB.id < transaction_id,
+                ),
+            ),
+        ]
+    transactions = (
+        db.query(TransactionDB)
+        .filter(*conditions)
+        .order_by(
+            TransactionDB.transactionDate.desc(), TransactionDB.id.desc()
+        )
+        .limit(limit + 1)
+        .all()
+    )
+    if len(transactions) <= limit:
+        return transactions, None
+    transactions = transactions[:limit]
+    return transactions, encode_cursor(transactions[-1])
@@ -0,0 +1,222 @@
+"""Monthly rollup maintenance utils.
+
+Rollups can be rebuilt from the raw transactions to repair drift::
+
+    python -m khazana.transactions.utils.rollups [--username USERNAME]
+"""
+
+import argparse
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import pandas as pd
+from sqlalchemy import Select, delete, extract, insert, select
+from sqlalchemy import func as sa_func
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from khazana.core.database import SessionLocal
+from khazana.core.models import UserDB
+
+from ..models import MonthlyRollupDB, TransactionDB
+from .cache import dashboard_cache, invalidate_user_caches
+from .const import DEFAULT_CURRENCY, TransactionType
+
+ROLLUP_KEY = (
+    "userId",
+    "year",
+    "month",
+    "transactionType",
+    "category",
+    "currency",
+)
+
+
+def rollup_delta(transaction: TransactionDB, sign: int = 1) -> dict:
+    """Get the rollup delta contributed by a single transaction.
+
+    Args:
+        transaction (TransactionDB): The transaction.
+        sign (int): 1 when the transaction is added, -1 when removed.
+
+    Returns:
+        dict: Rollup delta for the transaction.
+    """
+    return {
+        "userId": transaction.userId,
+        "year": transaction.transactionDate.year,
+        "month": transaction.transactionDate.month,
+        "transactionType": TransactionType(
+            transaction.transactionType
+        ).value,
+        "category": transaction.category,
+        "currency": transaction.currency or DEFAULT_CURRENCY,
+        "totalCents": sign * transaction.amountCents,
+        "transactionCount": sign,
+    }
+
+
+def rollup_deltas_from_frame(transactions: pd.DataFrame) -> List[dict]:
+    """Get the rollup deltas of a frame of new transactions."""
+    if transactions.empty:
+        return []
+    dates = transactions["transactionDate"].dt
+    return (
+        transactions.assign(year=dates.year, month=dates.month)
+        .groupby(list(ROLLUP_KEY), sort=False)
+        .agg(
+            totalCents=("amountCents", "sum"),
+            transactionCount=("amountCents", "size"),
+        )
+        .reset_index()
+        .to_dict(orient="records")
+    )
+
+
+def _merge_deltas(deltas: Iterable[dict]) -> List[dict]:
+    merged: Dict[Tuple, dict] = {}
+    for delta in deltas:
+        key = (
+            delta["userId"],
+            int(delta["year"]),
+            int(delta["month"]),
+            delta["transactionType"],
+            delta["category"],
+            delta["currency"],
+        )
+        if key not in merged:
+            merged[key] = dict(zip(ROLLUP_KEY, key))
+            merged[key]["totalCents"] = 0
+            merged[key]["transactionCount"] = 0
+        merged[key]["totalCents"] += int(delta["totalCents"])
+        merged[key]["transactionCount"] += int(delta["transactionCount"])
+    return [
+        delta
+        for delta in merged.values()
+        if delta["transactionCount"] or delta["totalCents"]
+    ]
+
+
+def _upsert(db: Session):
+    dialect = {"postgresql": postgresql, "sqlite": sqlite}[
+        db.get_bind().dialect.name
+    ]
+    statement = dialect.insert(MonthlyRollupDB)
+    return statement.on_conflict_do_update(
+        index_elements=list(ROLLUP_KEY),
+        set_={
+            "totalCents": (
+                MonthlyRollupDB.totalCents + statement.excluded.totalCents
+            ),
+            "transactionCount": (
+                MonthlyRollupDB.transactionCount
+                + statement.excluded.transactionCount
+            ),
+        },
+    )
+
+
+def apply_rollup_deltas(db: Session, deltas: Iterable[dict]) -> None:
+    """Apply rollup deltas in the current database transaction.
+
+    The caller is responsible for committing, so rollups change
+    atomically with the transactions they describe.
+    """
+    deltas = _merge_deltas(deltas)
+    if not deltas:
+        return
+    db.execute(_upsert(db), deltas)
+    db.execute(
+        delete(MonthlyRollupDB).where(
+            MonthlyRollupDB.userId.in_({delta["userId"] for delta in deltas}),
+            MonthlyRollupDB.transactionCount <= 0,
+        )
+    )
+
+
+def rollup_buckets(*conditions) -> Select:
+    """Select the rollup key, sum and count of matching transactions.
+
+    Columns are in the order of ``ROLLUP_KEY``, then the sum of cents and
+    the count.
+    """
+    year = extract("year", TransactionDB.transactionDate)
+    month = extract("month", TransactionDB.transactionDate)
+    return (
+        select(
+            TransactionDB.userId,
+            year,
+            month,
+            TransactionDB.transactionType,
+            TransactionDB.category,
+            TransactionDB.currency,
+            sa_func.sum(TransactionDB.amountCents),
+            sa_func.count(TransactionDB.id),
+        )
+        .where(*conditions)
+        .group_by(
+            TransactionDB.userId,
+            year,
+            month,
+            TransactionDB.transactionType,
+            TransactionDB.category,
+            TransactionDB.currency,
+        )
+    )
+
+
+def rebuild_monthly_rollups(db: Session, user_id=None) -> int:
+    """Recompute rollups from the raw transactions.
+
+    Args:
+        db (Session): Database session.
+        user_id (UUID, optional): Only rebuild rollups of this user.
+
+    Returns:
+        int: Number of rollup rows written.
+    """
+    # Rollups belong to a user, so orphaned transactions are left out.
+    buckets = rollup_buckets(TransactionDB.userId.isnot(None))
+    clear = delete(MonthlyRollupDB)
+    if user_id is not None:
+        buckets = rollup_buckets(TransactionDB.userId == user_id)
+        clear = clear.where(MonthlyRollupDB.userId == user_id)
+    db.execute(clear)
+    result = db.execute(
+        insert(MonthlyRollupDB).from_select(
+            [*ROLLUP_KEY, "totalCents", "transactionCount"], buckets
+        )
+    )
+    db.commit()
+    if user_id is not None:
+        invalidate_user_caches(user_id)
+    else:
+        dashboard_cache.clear()
+    return result.rowcount
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Rebuild monthly rollups from the command line."""
+    parser = argparse.ArgumentParser(
+        description="Rebuild monthly rollups from raw transactions."
+    )
+    parser.add_argument(
+        "--username", help="Only rebuild rollups of this user."
+    )
+    args = parser.parse_args(argv)
+    with SessionLocal() as db:
+        user_id = None
+        if args.username:
+            user = (
+                db.query(UserDB)
+                .filter(UserDB.username == args.username)
+                .first()
+            )
+            if not user:
+                parser.error(f"User {args.username} not found.")
+            user_id = user.id
+        count = rebuild_monthly_rollups(db, user_id)
+    print(f"Rebuilt {count} monthly rollups.")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,12 @@
 """Configuration for pytest."""
+import json
 import os
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse
+
 import pytest
 from fastapi.testclient import TestClient
 from sqlalchemy import create_engine
@@ -7,6 +14,10 @@ from sqlalchemy.orm import sessionmaker
 
 from khazana.core.database import DBBaseModel
 from khazana.core.apis.main import app
+from khazana.exchange_rates.utils import (
+    StaticExchangeRatesProvider,
+    set_exchange_rates_provider,
+)
 
 DATABASE_URL = "sqlite:///./test.db"
 engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False})
@@ -15,8 +26,83 @@ TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engin
 DBBaseModel.metadata.create_all(bind=engine)
 
 
+EXCHANGE_RATES_STUB = {
+    "/symbols": {
+        "success": True,
+        "symbols": {
+            "EUR": "Euro",
+            "GBP": "British Pound Sterling",
+            "INR": "Indian Rupee",
+            "USD": "United States Dollar",
+        },
+    },
+    "/latest": {
+        "success": True,
+        "base": "EUR",
+        "date": "2024-01-01",
+        "rates": {"EUR": 1.0, "GBP": 0.85, "INR": 90.0, "USD": 1.1},
+    },
+}
+
+
+class ExchangeRatesStubHandler(BaseHTTPRequestHandler):
+    """Serve canned exchange rates API responses."""
+
+    protocol_version = "HTTP/1.1"
+    hits = Counter()
+    # Number of upcoming requests answered with a 503.
+    failures = 0
+    # Seconds to wait before responding.
+    delay = 0.0
+
+    def do_GET(self):
+        """Respond with the canned payload of the path."""
+        path = urlparse(self.path).path
+        self.hits[path] += 1
+        time.sleep(self.delay)
+        payload = EXCHANGE_RATES_STUB.get(path)
+        status = 200 if payload else 404
+        if ExchangeRatesStubHandler.failures > 0:
+            ExchangeRatesStubHandler.failures -= 1
+            status = 503
+        body = json.dumps(payload or {"success": False}).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        """Keep test output quiet."""
+
+
+@pytest.fixture(scope="session")
+def exchange_rates_server():
+    """Serve a local stub of the exchange rates API, yielding its URL."""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), ExchangeRatesStubHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture(scope="session")
+def exchange_rates_provider():
+    """Serve exchange rates to the app from fixed rates."""
+    latest = EXCHANGE_RATES_STUB["/latest"]
+    provider = StaticExchangeRatesProvider(
+        rates=latest["rates"],
+        symbols=EXCHANGE_RATES_STUB["/symbols"]["symbols"],
+        base=latest["base"],
+        date=latest["date"],
+    )
+    set_exchange_rates_provider(provider)
+    yield provider
+
+
 @pytest.fixture(scope="session")
-def setup():
+def setup(exchange_rates_provider):
     """Initialize setup."""
     os.environ["JWT_SECRET"] = "secret"
     os.environ["JWT_ALGORITHM"] = "HS256"
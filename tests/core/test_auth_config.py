@@ -3,8 +3,13 @@
 from khazana.core.utils.auth_config import (
     verify_password,
     get_password_hash,
+    get_password_hash_async,
     create_access_token,
+    verify_and_update_password,
 )
+from khazana.core.utils.const import BCRYPT_ROUNDS
+from passlib.hash import bcrypt
+import asyncio
 from datetime import timedelta
 
 
@@ -20,3 +25,23 @@ def test_create_access_token():
     data = {"username": "testuser"}
     token = create_access_token(data, expires_delta=timedelta(minutes=5))
     assert token is not None
+
+
+def test_rehash_on_cost_change():
+    """Test hashes made with another cost are upgraded on verification."""
+    cheap = bcrypt.using(rounds=BCRYPT_ROUNDS - 1).hash("Test@1234")
+    verified, new_hash = asyncio.run(
+        verify_and_update_password("Test@1234", cheap)
+    )
+    assert verified is True
+    assert new_hash and bcrypt.from_string(new_hash).rounds == BCRYPT_ROUNDS
+    assert asyncio.run(verify_and_update_password("Wrong", cheap)) == (
+        False,
+        None,
+    )
+
+    hashed = asyncio.run(get_password_hash_async("Test@1234"))
+    assert asyncio.run(verify_and_update_password("Test@1234", hashed)) == (
+        True,
+        None,
+    )
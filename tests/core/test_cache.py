@@ -0,0 +1,59 @@
+"""Test cache module."""
+
+from khazana.core.utils import LRUCache
+
+
+def test_lru_cache_eviction_and_budget():
+    """Test entries are evicted by count and by memory budget."""
+    cache = LRUCache(max_entries=2, max_bytes=10, sizeof=len)
+    cache.set("a", "1234")
+    cache.set("b", "1234")
+    assert cache.get("a") == "1234"
+    cache.set("c", "1234")
+    assert cache.get("b") is None
+    cache.set("d", "12345678")
+    assert cache.get("a") is None
+    assert cache.get("d") == "12345678"
+    stats = cache.stats()
+    assert stats["evictions"] == 3
+    assert stats["bytes"] == 8
+
+
+def test_lru_cache_ttl_and_invalidation():
+    """Test expiry and that stale values are not stored."""
+    cache = LRUCache(ttl=0.0)
+    cache.set("a", 1)
+    assert cache.get("a") is None
+
+    cache = LRUCache()
+    generation = cache.generation
+    cache.invalidate("a")
+    cache.set("a", 1, generation=generation)
+    assert cache.get("a") is None
+    cache.set("a", 1)
+    cache.invalidate_where(lambda key, value: value == 1)
+    assert cache.get("a") is None
+
+
+def test_lru_cache_scoped_invalidation():
+    """Test invalidating a scope keeps values computed for other scopes."""
+    cache = LRUCache(max_entries=2, scope=lambda key: key[0])
+    generation = cache.generation
+    cache.set(("a", 1), 1)
+    cache.invalidate_scope("a")
+    assert cache.get(("a", 1)) is None
+    cache.set(("a", 2), 2, generation=generation)
+    cache.set(("b", 1), 3, generation=generation)
+    assert cache.get(("a", 2)) is None
+    assert cache.get(("b", 1)) == 3
+
+    # Invalidations of forgotten scopes still drop older values.
+    generation = cache.generation
+    for scope in "cde":
+        cache.invalidate_scope(scope)
+    cache.set(("c", 1), 4, generation=generation)
+    cache.set(("f", 1), 5, generation=generation)
+    assert cache.get(("c", 1)) is None
+    assert cache.get(("f", 1)) is None
+    cache.set(("f", 1), 5, generation=cache.generation)
+    assert cache.get(("f", 1)) == 5
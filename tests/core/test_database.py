@@ -0,0 +1,31 @@
+"""Test database module."""
+
+from khazana.core.database import (
+    SQLITE_PRAGMAS,
+    _async_url,
+    _engine_options,
+    engine,
+)
+
+
+def test_sqlite_pragmas():
+    """Test pragmas are applied to new connections."""
+    with engine.connect() as connection:
+        journal_mode = connection.exec_driver_sql(
+            "PRAGMA journal_mode"
+        ).scalar()
+        busy_timeout = connection.exec_driver_sql(
+            "PRAGMA busy_timeout"
+        ).scalar()
+    assert journal_mode.lower() == SQLITE_PRAGMAS["journal_mode"].lower()
+    assert busy_timeout == SQLITE_PRAGMAS["busy_timeout"]
+
+
+def test_database_urls():
+    """Test async URLs and pool options derived from the database URL."""
+    assert _async_url("sqlite:///./app.db") == "sqlite+aiosqlite:///./app.db"
+    assert _async_url("sqlite+aiosqlite:///./app.db") == (
+        "sqlite+aiosqlite:///./app.db"
+    )
+    assert _engine_options("sqlite://") == {}
+    assert "pool_size" in _engine_options("sqlite:///./app.db")
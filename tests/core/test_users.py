@@ -129,3 +129,44 @@ def test_delete_user(auth_client: TestClient, db_session: Session):
     assert response.status_code == 200
     data = response.json()
     assert data["success"] is True
+
+
+def test_principal_cache_invalidation(auth_client: TestClient):
+    """Test user changes are seen by tokens already in use."""
+    response = auth_client.post(
+        "/api/users",
+        json={
+            "fullName": "Cached User",
+            "username": "cacheduser",
+            "password": "Test@1234",
+            "emailAddress": "cacheduser@example.com",
+            "scopes": ["me", "transaction_read"],
+        },
+    )
+    assert response.status_code == 200
+    token = auth_client.post(
+        "/api/auth", data={"username": "cacheduser", "password": "Test@1234"}
+    ).json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+
+    # The first login is cached, so it must be refreshed on password change.
+    assert auth_client.get("/api/users/me", headers=headers).status_code == 401
+    response = auth_client.patch(
+        "/api/users/change_password",
+        headers=headers,
+        json={
+            "oldPassword": "Test@1234",
+            "newPassword": "Test@12345",
+            "emailAddress": "cacheduser@example.com",
+        },
+    )
+    assert response.status_code == 200
+    response = auth_client.get("/api/users/me", headers=headers)
+    assert response.status_code == 200
+    assert response.json()["username"] == "cacheduser"
+
+    response = auth_client.delete(
+        "/api/users", params={"username": "cacheduser"}
+    )
+    assert response.status_code == 200
+    assert auth_client.get("/api/users/me", headers=headers).status_code == 401
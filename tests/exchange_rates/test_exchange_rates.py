@@ -1,6 +1,17 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+import pytest
 from fastapi.testclient import TestClient
 from sqlalchemy.orm import Session
 
+from khazana.exchange_rates.utils import (
+    ExchangeRatesCache,
+    RateTable,
+    change_base_currency_exchange_rates,
+)
+
 
 def test_list_exchange_rates(auth_client: TestClient, db_session: Session):
     """Test listing exchange rates."""
@@ -10,6 +21,54 @@ def test_list_exchange_rates(auth_client: TestClient, db_session: Session):
     assert "rates" in data
     assert "base" in data
     assert "last_updated" in data
+    assert data["base"] == "USD"
+    assert data["rates"]["USD"] == 1.0
+    assert data["rates"]["EUR"] == round(1 / 1.1, 4)
+
+    response = auth_client.get("/api/exchange-rates", params={"base": "inr"})
+    assert response.status_code == 200
+    data = response.json()
+    assert data["base"] == "INR"
+    assert data["rates"]["INR"] == 1.0
+    assert data["rates"]["GBP"] == round(0.85 / 90, 4)
+
+    response = auth_client.get("/api/exchange-rates", params={"base": "XXX"})
+    assert response.status_code == 400
+
+
+def test_convert_amount(auth_client: TestClient):
+    """Test converting an amount between currencies."""
+    response = auth_client.get(
+        "/api/exchange-rates/convert",
+        params={"amount": 10, "from": "gbp", "to": "INR"},
+    )
+    assert response.status_code == 200
+    data = response.json()
+    assert data["source"] == "GBP"
+    assert data["target"] == "INR"
+    assert data["rate"] == pytest.approx(90 / 0.85)
+    assert data["result"] == pytest.approx(10 * 90 / 0.85)
+
+    response = auth_client.get(
+        "/api/exchange-rates/convert",
+        params={"amount": 10, "from": "GBP", "to": "XXX"},
+    )
+    assert response.status_code == 400
+
+
+def test_rate_table():
+    """Test cross rates match rebasing the rates."""
+    rates = {"EUR": 1.0, "GBP": 0.85, "INR": 90.0, "USD": 1.1, "BAD": None}
+    table = RateTable(rates, "EUR")
+    assert "BAD" not in table
+    assert table.rate("USD", "USD") == 1.0
+    assert table.convert(2, "EUR", "INR") == pytest.approx(180)
+    assert table.rates("USD") is table.rates("USD")
+    assert change_base_currency_exchange_rates(
+        {"EUR": 1.0, "USD": 1.1}, "EUR", "USD"
+    ) == {"EUR": round(1 / 1.1, 4), "USD": 1.0}
+    with pytest.raises(ValueError):
+        table.rate("EUR", "XXX")
 
 
 def test_list_exchange_rate_symbols(auth_client: TestClient, db_session: Session):
@@ -24,3 +83,47 @@ def test_list_exchange_rate_symbols(auth_client: TestClient, db_session: Session
     symbol = data["symbols"][0]
     assert "symbol" in symbol
     assert "fullName" in symbol
+
+
+def test_exchange_rates_are_fetched_once(
+    auth_client: TestClient, exchange_rates_provider
+):
+    """Test concurrent requests share a single upstream fetch."""
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        responses = list(
+            executor.map(
+                lambda _: auth_client.get("/api/exchange-rates"), range(16)
+            )
+        )
+    assert all(response.status_code == 200 for response in responses)
+    assert responses[0].json()["rates"]["USD"] == 1.0
+    assert exchange_rates_provider.calls["rates"] <= 1
+
+
+def test_single_flight_refresh():
+    """Test only one caller refreshes while others wait or get stale rates."""
+    calls = []
+
+    def loader(margin):
+        calls.append(margin)
+        time.sleep(0.2)
+        return {
+            "base": "USD",
+            "last_updated": datetime.now(timezone.utc),
+            "rates": {"USD": float(len(calls))},
+        }
+
+    cache = ExchangeRatesCache(loader=loader, ttl=60)
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        first = list(executor.map(lambda _: cache.get(), range(8)))
+    assert len(calls) == 1
+    assert all(rates["rates"]["USD"] == 1.0 for rates in first)
+
+    cache._expires_at = 0.0
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        second = list(executor.map(lambda _: cache.get(), range(8)))
+    assert len(calls) == 2
+    assert sorted(rates["rates"]["USD"] for rates in second) == [1.0] * 7 + [
+        2.0
+    ]
+    assert cache.seconds_until_refresh(margin=30) == pytest.approx(30, abs=1)
@@ -0,0 +1,106 @@
+"""Test exchange rate history."""
+
+from datetime import date, datetime, timezone
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from khazana.core.database import SessionLocal
+from khazana.exchange_rates.models import ExchangeRateHistoryDB
+from khazana.exchange_rates.utils import (
+    EXCHANGE_RATE_EXPIRE_MINUTES,
+    ExchangeRateHistory,
+    backfill_exchange_rate_history,
+    decode_rates,
+    encode_rates,
+    exchange_rates_cache,
+    load_exchange_rate_history,
+)
+
+
+def _row(day, rates):
+    symbols, packed = encode_rates(rates)
+    return ExchangeRateHistoryDB(
+        date=day, base="EUR", symbols=symbols, rates=packed
+    )
+
+
+def test_encode_rates():
+    """Test rates are packed as 8 bytes per rate."""
+    rates = {"EUR": 1.0, "USD": 1.1, "INR": 90.25}
+    symbols, packed = encode_rates(rates)
+    assert len(packed) == 8 * len(rates)
+    assert decode_rates(symbols, packed) == rates
+
+
+def test_rates_as_of():
+    """Test each date is valued at the latest rates on or before it."""
+    history = ExchangeRateHistory.from_rows(
+        [
+            _row(date(2024, 1, 1), {"EUR": 1.0, "USD": 1.1, "INR": 90.0}),
+            _row(date(2024, 1, 3), {"EUR": 1.0, "USD": 1.2}),
+            _row(date(2024, 1, 5), {"EUR": 1.0, "USD": 1.0, "INR": 80.0}),
+        ]
+    )
+    transactions = pd.DataFrame(
+        {
+            "transactionDate": [
+                datetime(2023, 12, 31),
+                datetime(2024, 1, 1, 23, 59),
+                datetime(2024, 1, 4),
+                datetime(2024, 1, 4, tzinfo=timezone.utc),
+                datetime(2024, 2, 1),
+                datetime(2024, 1, 1),
+            ],
+            "currency": ["USD", "USD", "USD", "INR", "INR", "XXX"],
+            "amount": [10.0, 11.0, 12.0, 90.0, 80.0, 1.0],
+        }
+    )
+    rates = history.rates_as_of(
+        transactions["transactionDate"], transactions["currency"], "EUR"
+    )
+    np.testing.assert_allclose(
+        rates, [np.nan, 1 / 1.1, 1 / 1.2, 1 / 90.0, 1 / 80.0, np.nan]
+    )
+    converted = history.convert(
+        transactions["amount"],
+        transactions["transactionDate"],
+        transactions["currency"],
+        "EUR",
+    )
+    np.testing.assert_allclose(
+        converted, [np.nan, 10.0, 10.0, 1.0, 1.0, np.nan]
+    )
+    np.testing.assert_allclose(
+        history.rates_as_of([date(2024, 1, 2)], "EUR", "INR"), [90.0]
+    )
+    assert np.isnan(
+        ExchangeRateHistory.from_rows([]).rates_as_of(
+            [date(2024, 1, 2)], "EUR", "INR"
+        )
+    ).all()
+
+
+def test_history_is_recorded(exchange_rates_provider):
+    """Test refreshes and backfills record daily rates."""
+    exchange_rates_cache.refresh(margin=EXCHANGE_RATE_EXPIRE_MINUTES * 60)
+    with SessionLocal() as db:
+        assert db.get(ExchangeRateHistoryDB, (date(2024, 1, 1), "EUR"))
+        fetched = backfill_exchange_rate_history(
+            db, date(2023, 12, 30), date(2024, 1, 1)
+        )
+        assert fetched == 2
+        assert (
+            backfill_exchange_rate_history(
+                db, date(2023, 12, 30), date(2024, 1, 1)
+            )
+            == 0
+        )
+        history = load_exchange_rate_history(
+            db, start=date(2023, 12, 31), end=date(2024, 1, 1)
+        )
+    assert len(history) == 2
+    assert history.rates_as_of(
+        [date(2023, 12, 31)], "EUR", "USD"
+    ) == pytest.approx([1.1])
@@ -0,0 +1,138 @@
+"""Test exchange rates providers."""
+
+import httpx
+import pytest
+
+from khazana.exchange_rates.utils import (
+    CircuitBreaker,
+    CircuitOpenError,
+    EXCHANGE_RATE_EXPIRE_MINUTES,
+    ExchangeRatesProvider,
+    ExchangeRatesProviderError,
+    HTTPExchangeRatesProvider,
+    load_exchange_rates,
+    set_exchange_rates_provider,
+)
+
+from ..conftest import ExchangeRatesStubHandler
+
+
+@pytest.fixture
+def stub_handler():
+    """Reset the stub API behaviour around a test."""
+    ExchangeRatesStubHandler.hits.clear()
+    yield ExchangeRatesStubHandler
+    ExchangeRatesStubHandler.failures = 0
+    ExchangeRatesStubHandler.delay = 0.0
+
+
+def test_http_provider_reuses_connections(exchange_rates_server, stub_handler):
+    """Test the provider fetches rates over a kept alive connection."""
+    provider = HTTPExchangeRatesProvider(
+        base_url=exchange_rates_server, api_key="key"
+    )
+    try:
+        assert provider.fetch_rates()["rates"]["USD"] == 1.1
+        assert "INR" in provider.fetch_symbols()["symbols"]
+        pool = provider.client._transport._pool
+        assert len(pool.connections) == 1
+    finally:
+        provider.close()
+    assert stub_handler.hits == {"/latest": 1, "/symbols": 1}
+
+
+def test_http_provider_retries(exchange_rates_server, stub_handler):
+    """Test transient failures are retried, up to a bound."""
+    provider = HTTPExchangeRatesProvider(
+        base_url=exchange_rates_server, api_key="key", retries=2, backoff=0
+    )
+    try:
+        stub_handler.failures = 2
+        assert provider.fetch_rates()["base"] == "EUR"
+        assert stub_handler.hits["/latest"] == 3
+
+        stub_handler.failures = 3
+        with pytest.raises(ExchangeRatesProviderError):
+            provider.fetch_rates()
+        assert stub_handler.hits["/latest"] == 6
+    finally:
+        provider.close()
+
+
+def test_http_provider_timeout(exchange_rates_server, stub_handler):
+    """Test a hung API fails after the read timeout."""
+    stub_handler.delay = 0.5
+    provider = HTTPExchangeRatesProvider(
+        base_url=exchange_rates_server,
+        api_key="key",
+        timeout=httpx.Timeout(0.1),
+        retries=0,
+    )
+    try:
+        with pytest.raises(ExchangeRatesProviderError):
+            provider.fetch_rates()
+    finally:
+        provider.close()
+
+
+def test_circuit_breaker(exchange_rates_server, stub_handler):
+    """Test the circuit opens on failures and closes after a trial call."""
+    breaker = CircuitBreaker(failures=2, reset_timeout=60)
+    provider = HTTPExchangeRatesProvider(
+        base_url=exchange_rates_server,
+        api_key="key",
+        retries=0,
+        breaker=breaker,
+    )
+    try:
+        stub_handler.failures = 2
+        for _ in range(2):
+            with pytest.raises(ExchangeRatesProviderError):
+                provider.fetch_rates()
+        assert breaker.is_open
+        with pytest.raises(CircuitOpenError):
+            provider.fetch_rates()
+        assert stub_handler.hits["/latest"] == 2
+
+        breaker.reset_timeout = 0
+        assert provider.fetch_rates()["base"] == "EUR"
+        assert not breaker.is_open
+    finally:
+        provider.close()
+
+
+def test_http_provider_without_api_key(monkeypatch, stub_handler):
+    """Test a missing API key fails like any other provider error."""
+    monkeypatch.delenv("EXCHANGE_RATE_API_KEY", raising=False)
+    breaker = CircuitBreaker(failures=1, reset_timeout=60)
+    provider = HTTPExchangeRatesProvider(breaker=breaker)
+    try:
+        with pytest.raises(ExchangeRatesProviderError):
+            provider.fetch_rates()
+        assert breaker.is_open
+    finally:
+        provider.close()
+    assert not stub_handler.hits
+
+    with pytest.raises(TypeError):
+        ExchangeRatesProvider()
+
+
+def test_fallback_to_stored_rates(exchange_rates_provider):
+    """Test stored rates are served while the provider fails."""
+
+    class FailingProvider(ExchangeRatesProvider):
+        def fetch_rates(self, base="EUR"):
+            raise ExchangeRatesProviderError("down")
+
+        def fetch_symbols(self):
+            raise ExchangeRatesProviderError("down")
+
+    stored = load_exchange_rates()
+    set_exchange_rates_provider(FailingProvider())
+    try:
+        rates = load_exchange_rates(margin=EXCHANGE_RATE_EXPIRE_MINUTES * 60)
+    finally:
+        set_exchange_rates_provider(exchange_rates_provider)
+    assert rates["last_updated"] == stored["last_updated"]
+    assert rates["table"].rates("USD") == stored["table"].rates("USD")
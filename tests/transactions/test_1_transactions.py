@@ -67,3 +67,254 @@ def test_delete_transaction(auth_client: TestClient, db_session: Session):
     assert response.status_code == 200
     data = response.json()
     assert data["success"] is True
+
+
+def test_list_transactions_pagination(auth_client: TestClient):
+    """Test walking filtered transactions page by page."""
+    for day in ["01", "03", "02"]:
+        response = auth_client.post(
+            "/api/transactions",
+            json={
+                "description": "Paginated Transaction",
+                "amount": -10.0,
+                "category": "Paginated Category",
+                "transactionDate": f"2023-11-{day}T00:00:00Z",
+            },
+        )
+        assert response.status_code == 200
+
+    dates, cursor = [], None
+    while True:
+        params = {"limit": 2, "category": "Paginated Category"}
+        if cursor:
+            params["cursor"] = cursor
+        response = auth_client.get("/api/transactions", params=params)
+        assert response.status_code == 200
+        page = response.json()
+        assert len(page["transactions"]) <= 2
+        dates += [t["transactionDate"][:10] for t in page["transactions"]]
+        cursor = page["nextCursor"]
+        if not cursor:
+            break
+    assert dates == ["2023-11-03", "2023-11-02", "2023-11-01"]
+
+    response = auth_client.get(
+        "/api/transactions/admin",
+        params={
+            "category": "Paginated Category",
+            "startDate": "2023-11-02T00:00:00Z",
+            "transactionType": "expense",
+            "maxAmount": 0,
+        },
+    )
+    assert response.status_code == 200
+    assert len(response.json()["transactions"]) == 2
+
+    for cursor in ["bad", "WyIyMDIzLTAxLTAxIiwgMl0=", "WzFd"]:
+        response = auth_client.get(
+            "/api/transactions", params={"cursor": cursor}
+        )
+        assert response.status_code == 400
+
+
+def test_create_transactions_batch(auth_client: TestClient, monkeypatch):
+    """Test creating transactions from JSON arrays and NDJSON."""
+    response = auth_client.post(
+        "/api/transactions/batch",
+        json=[
+            {
+                "description": "Batch Salary",
+                "amount": 1000.0,
+                "category": "Batch Category",
+                "transactionDate": "2012-04-01T00:00:00Z",
+            },
+            {
+                "description": "Batch Refund",
+                "amount": -20.25,
+                "category": "Batch Category",
+                "transactionDate": "2012-04-02T00:00:00Z",
+                "transactionType": "income",
+            },
+            {
+                "description": "Batch Fund",
+                "amount": 100.0,
+                "category": "Batch Fund",
+                "transactionDate": "2012-04-03T00:00:00Z",
+                "transactionType": "investment",
+            },
+        ],
+    )
+    assert response.status_code == 200
+    data = response.json()
+    assert data["created"] == 3
+    listed = auth_client.get(
+        "/api/transactions",
+        params={
+            "startDate": "2012-04-01T00:00:00Z",
+            "endDate": "2012-05-01T00:00:00Z",
+        },
+    ).json()["transactions"]
+    assert [t["id"] for t in listed] == data["ids"][::-1]
+    assert [t["transactionType"] for t in listed] == [
+        "investment",
+        "expense",
+        "income",
+    ]
+
+    lines = [
+        '{"description": "Batch Rent", "amount": -500, '
+        '"category": "Batch Category", '
+        '"transactionDate": "2012-04-04T00:00:00Z"}',
+        "",
+        '{"description": "Batch Bad", "amount": "ten", '
+        '"category": "Batch Category"}',
+    ]
+    response = auth_client.post(
+        "/api/transactions/batch",
+        content="\n".join(lines),
+        headers={"Content-Type": "application/x-ndjson"},
+    )
+    assert response.status_code == 422
+    assert response.json()["detail"][0]["loc"] == ["body", 1, "amount"]
+
+    response = auth_client.post(
+        "/api/transactions/batch",
+        content="\n".join(lines[:2]),
+        headers={"Content-Type": "application/x-ndjson"},
+    )
+    assert response.status_code == 200
+    assert response.json()["created"] == 1
+
+    dashboard = auth_client.get("/api/transactions/dashboard").json()
+    assert dashboard["totalSavings"]["2012-4"] == 479.75
+    assert dashboard["monthlyExpenses"]["2012-4"] == -520.25
+    assert dashboard["investmentGrowth"]["Batch Fund"] == 100.0
+
+    # Dates are stored in UTC, and counted in the rollup of their month.
+    response = auth_client.post(
+        "/api/transactions/batch",
+        json=[
+            {
+                "description": "Batch Late Rent",
+                "amount": -100,
+                "category": "Batch Category",
+                "transactionDate": "2012-05-01T02:00:00+05:00",
+            }
+        ],
+    )
+    assert response.status_code == 200
+    dashboard = auth_client.get("/api/transactions/dashboard").json()
+    assert dashboard["monthlyExpenses"]["2012-4"] == -620.25
+    listed = auth_client.get(
+        "/api/transactions", params={"category": "Batch Category", "limit": 1}
+    ).json()["transactions"]
+    assert listed[0]["transactionDate"].startswith("2012-04-30T21:00:00")
+
+    response = auth_client.post("/api/transactions/batch", json=[])
+    assert response.status_code == 400
+    response = auth_client.post("/api/transactions/batch", json={})
+    assert response.status_code == 422
+
+    monkeypatch.setattr(
+        "khazana.transactions.apis.transactions.TRANSACTIONS_MAX_BATCH_BYTES",
+        64,
+    )
+    response = auth_client.post(
+        "/api/transactions/batch", content=b"[" + b" " * 100 + b"]"
+    )
+    assert response.status_code == 413
+
+
+def test_bulk_update_and_delete_transactions(auth_client: TestClient):
+    """Test updating and deleting transactions by filter and ids."""
+    response = auth_client.post(
+        "/api/transactions/batch",
+        json=[
+            {
+                "description": "Bulk Groceries",
+                "amount": -10.0,
+                "category": "Bulk Food",
+                "transactionDate": f"2011-03-0{day}T00:00:00Z",
+            }
+            for day in range(1, 5)
+        ],
+    )
+    assert response.status_code == 200
+    ids = response.json()["ids"]
+    month = {
+        "startDate": "2011-03-01T00:00:00Z",
+        "endDate": "2011-04-01T00:00:00Z",
+    }
+
+    response = auth_client.patch(
+        "/api/transactions",
+        params={**month, "category": "Bulk Food"},
+        json={"category": "Bulk Groceries"},
+    )
+    assert response.status_code == 200
+    assert response.json()["updated"] == 4
+    response = auth_client.patch(
+        "/api/transactions",
+        params=month,
+        json={
+            "ids": ids[:2],
+            "amount": -25.5,
+            "transactionDate": "2011-02-15T00:00:00Z",
+        },
+    )
+    assert response.status_code == 200
+    assert response.json()["updated"] == 2
+
+    dashboard = auth_client.get("/api/transactions/dashboard").json()
+    assert dashboard["monthlyExpenses"]["2011-2"] == -51.0
+    assert dashboard["monthlyExpenses"]["2011-3"] == -20.0
+    listed = auth_client.get(
+        "/api/transactions", params={"category": "Bulk Groceries"}
+    ).json()["transactions"]
+    assert sorted(t["amount"] for t in listed) == [-25.5, -25.5, -10, -10]
+
+    response = auth_client.delete(
+        "/api/transactions",
+        params={"category": "Bulk Groceries", "endDate": month["startDate"]},
+    )
+    assert response.status_code == 200
+    assert response.json()["deleted"] == 2
+    dashboard = auth_client.get("/api/transactions/dashboard").json()
+    assert "2011-2" not in dashboard["monthlyExpenses"]
+    response = auth_client.delete(
+        "/api/transactions", params={"ids": ids}
+    )
+    assert response.json()["deleted"] == 2
+    dashboard = auth_client.get("/api/transactions/dashboard").json()
+    assert "2011-3" not in dashboard["monthlyExpenses"]
+
+    response = auth_client.delete("/api/transactions")
+    assert response.status_code == 400
+    response = auth_client.patch(
+        "/api/transactions", json={"category": "Bulk Everything"}
+    )
+    assert response.status_code == 400
+    response = auth_client.patch(
+        "/api/transactions", params=month, json={"ids": ids}
+    )
+    assert response.status_code == 400
+
+
+def test_non_finite_amount_filters(auth_client: TestClient):
+    """Test amount filters must be finite amounts."""
+    for params in [
+        {"maxAmount": "inf"},
+        {"minAmount": "-inf"},
+        {"minAmount": "nan"},
+        {"maxAmount": "1e400"},
+    ]:
+        response = auth_client.get("/api/transactions", params=params)
+        assert response.status_code == 422
+        response = auth_client.get("/api/transactions/admin", params=params)
+        assert response.status_code == 422
+        response = auth_client.patch(
+            "/api/transactions", params=params, json={"category": "Never"}
+        )
+        assert response.status_code == 422
+        response = auth_client.delete("/api/transactions", params=params)
+        assert response.status_code == 422
@@ -1,6 +1,15 @@
+from datetime import datetime
+from uuid import uuid4
+
+import pytest
 from fastapi.testclient import TestClient
 from sqlalchemy.orm import Session
 
+from khazana.core.database import SessionLocal
+from khazana.core.models import UserDB
+from khazana.transactions.models import TransactionDB
+from khazana.transactions.utils.rollups import rebuild_monthly_rollups
+
 
 def test_get_dashboard_data(auth_client: TestClient, db_session: Session):
     """Test getting dashboard data."""
@@ -24,3 +33,305 @@ def test_get_dashboard_data(auth_client: TestClient, db_session: Session):
     assert "totalSavings" in data
     assert "monthlyExpenses" in data
     assert "investmentGrowth" in data
+
+
+def test_dashboard_merges_unsorted_months(auth_client: TestClient):
+    """Test month buckets are merged regardless of insertion order."""
+    for transaction_date, amount in [
+        ("2022-03-05T00:00:00Z", 100.0),
+        ("2022-04-10T00:00:00Z", -30.0),
+        ("2022-03-20T00:00:00Z", -20.0),
+        ("2022-04-25T00:00:00Z", 50.0),
+    ]:
+        response = auth_client.post(
+            "/api/transactions",
+            json={
+                "description": "Test Transaction",
+                "amount": amount,
+                "category": "Test Category",
+                "transactionDate": transaction_date,
+            },
+        )
+        assert response.status_code == 200
+
+    response = auth_client.get("/api/transactions/dashboard")
+    assert response.status_code == 200
+    data = response.json()
+    assert data["totalSavings"]["2022-3"] == 80.0
+    assert data["totalSavings"]["2022-4"] == 20.0
+    assert data["monthlyExpenses"]["2022-3"] == -20.0
+    assert data["monthlyExpenses"]["2022-4"] == -30.0
+
+
+def test_rollups_match_rebuild(auth_client: TestClient):
+    """Test incremental rollups agree with a rebuild from raw rows."""
+    response = auth_client.post(
+        "/api/transactions",
+        json={
+            "description": "Test Transaction",
+            "amount": 25.0,
+            "category": "Rollup Category",
+            "transactionDate": "2021-06-15T00:00:00Z",
+            "transactionType": "investment",
+        },
+    )
+    assert response.status_code == 200
+    transaction_id = response.json()["id"]
+    response = auth_client.patch(
+        f"/api/transactions/{transaction_id}",
+        json={"amount": 40.0, "transactionDate": "2021-07-01T00:00:00Z"},
+    )
+    assert response.status_code == 200
+    response = auth_client.post(
+        "/api/transactions",
+        json={
+            "description": "Test Transaction",
+            "amount": -15.0,
+            "category": "Rollup Category",
+            "transactionDate": "2021-06-15T00:00:00Z",
+        },
+    )
+    assert response.status_code == 200
+    response = auth_client.delete(
+        f"/api/transactions/{response.json()['id']}"
+    )
+    assert response.status_code == 200
+
+    incremental = auth_client.get("/api/transactions/dashboard").json()
+    assert "2021-6" not in incremental["totalSavings"]
+    assert incremental["investmentGrowth"]["Rollup Category"] == 40.0
+
+    with SessionLocal() as db:
+        admin = db.query(UserDB).filter(UserDB.username == "admin").first()
+        rebuild_monthly_rollups(db, admin.id)
+    assert auth_client.get("/api/transactions/dashboard").json() == (
+        incremental
+    )
+
+    # A full rebuild leaves transactions without a user out.
+    with SessionLocal() as db:
+        orphan = TransactionDB(
+            id=uuid4(),
+            description="Orphan",
+            amountCents=100,
+            category="Rollup Category",
+            transactionDate=datetime(2021, 6, 15),
+            transactionType="income",
+        )
+        db.add(orphan)
+        db.commit()
+        try:
+            assert rebuild_monthly_rollups(db) > 0
+        finally:
+            db.delete(orphan)
+            db.commit()
+    assert auth_client.get("/api/transactions/dashboard").json() == (
+        incremental
+    )
+
+
+def test_dashboard_cache_and_etag(auth_client: TestClient):
+    """Test dashboard caching, conditional requests and invalidation."""
+    response = auth_client.get("/api/transactions/dashboard")
+    assert response.status_code == 200
+    etag = response.headers["ETag"]
+    stats = auth_client.get("/api/transactions/dashboard/cache/stats").json()
+
+    response = auth_client.get(
+        "/api/transactions/dashboard", headers={"If-None-Match": etag}
+    )
+    assert response.status_code == 304
+    assert auth_client.get(
+        "/api/transactions/dashboard/cache/stats"
+    ).json()["hits"] == stats["hits"] + 1
+
+    response = auth_client.post(
+        "/api/transactions",
+        json={
+            "description": "Test Transaction",
+            "amount": 10.0,
+            "category": "Test Category",
+            "transactionDate": "2020-01-01T00:00:00Z",
+        },
+    )
+    assert response.status_code == 200
+    response = auth_client.get(
+        "/api/transactions/dashboard", headers={"If-None-Match": etag}
+    )
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+    assert response.json()["totalSavings"]["2020-1"] == 10.0
+
+
+def test_dashboard_reporting_currency(auth_client: TestClient):
+    """Test buckets in other currencies are converted for the dashboard."""
+    for amount, currency in [(100.0, "eur"), (110.0, "USD"), (-9.0, "INR")]:
+        response = auth_client.post(
+            "/api/transactions",
+            json={
+                "description": "Test Transaction",
+                "amount": amount,
+                "category": "Test Category",
+                "transactionDate": "2016-03-10T00:00:00Z",
+                "currency": currency,
+            },
+        )
+        assert response.status_code == 200
+        assert response.json()["currency"] == currency.upper()
+
+    data = auth_client.get("/api/transactions/dashboard").json()
+    assert data["reportingCurrency"] == "USD"
+    assert data["totalSavings"]["2016-3"] == pytest.approx(220 - 0.11)
+    assert data["monthlyExpenses"]["2016-3"] == pytest.approx(-0.11)
+
+    response = auth_client.get(
+        "/api/transactions/dashboard/admin",
+        params={"reportingCurrency": "eur"},
+    )
+    assert response.status_code == 200
+    data = response.json()
+    assert data["reportingCurrency"] == "EUR"
+    assert data["totalSavings"]["2016-3"] == pytest.approx(200 - 0.1)
+
+    response = auth_client.get(
+        "/api/transactions/dashboard", params={"reportingCurrency": "XXX"}
+    )
+    assert response.status_code == 400
+    response = auth_client.get(
+        "/api/transactions/dashboard", params={"reportingCurrency": "US"}
+    )
+    assert response.status_code == 400
+
+    response = auth_client.post(
+        "/api/transactions",
+        json={
+            "description": "Test Transaction",
+            "amount": 1.0,
+            "category": "Test Category",
+            "currency": "EURO",
+        },
+    )
+    assert response.status_code == 422
+
+
+def test_dashboard_sums_are_exact(auth_client: TestClient):
+    """Test amounts are stored as cents and summed without float error."""
+    for amount, stored in [(0.1, 0.1), (0.2, 0.2), (0.105, 0.1)]:
+        response = auth_client.post(
+            "/api/transactions",
+            json={
+                "description": "Test Transaction",
+                "amount": amount,
+                "category": "Test Category",
+                "transactionDate": "2015-08-10T00:00:00Z",
+            },
+        )
+        assert response.status_code == 200
+        assert response.json()["amount"] == stored
+
+    data = auth_client.get("/api/transactions/dashboard").json()
+    assert data["totalSavings"]["2015-8"] == 0.4
+
+    with SessionLocal() as db:
+        admin = db.query(UserDB).filter(UserDB.username == "admin").first()
+        rebuild_monthly_rollups(db, admin.id)
+    assert auth_client.get("/api/transactions/dashboard").json() == data
+
+    response = auth_client.post(
+        "/api/transactions",
+        json={
+            "description": "Test Transaction",
+            "amount": 1e300,
+            "category": "Test Category",
+        },
+    )
+    assert response.status_code == 422
+
+
+def test_dashboard_analytics(auth_client: TestClient):
+    """Test analytics grouped by period and category from cached columns."""
+    for transaction_date, amount, category, transaction_type in [
+        ("2014-01-06T00:00:00Z", 100.0, "Salary", "income"),
+        ("2014-01-07T00:00:00Z", -30.0, "Food", "expense"),
+        ("2014-03-03T00:00:00Z", -20.5, "Rent", "expense"),
+        ("2014-03-04T00:00:00Z", 50.0, "Bonds", "investment"),
+    ]:
+        response = auth_client.post(
+            "/api/transactions",
+            json={
+                "description": "Test Transaction",
+                "amount": amount,
+                "category": category,
+                "transactionDate": transaction_date,
+                "transactionType": transaction_type,
+            },
+        )
+        assert response.status_code == 200
+
+    params = {"startDate": "2014-01-01", "endDate": "2014-04-01"}
+    response = auth_client.get(
+        "/api/transactions/dashboard/admin/analytics",
+        params={**params, "window": 2, "top": 1},
+    )
+    assert response.status_code == 200
+    data = response.json()
+    assert data["groupBy"] == "month"
+    assert data["reportingCurrency"] == "USD"
+    assert [group["key"] for group in data["groups"]] == [
+        "2014-1",
+        "2014-2",
+        "2014-3",
+    ]
+    assert [group["savings"] for group in data["groups"]] == [70.0, 0, -20.5]
+    assert [group["rollingSavings"] for group in data["groups"]] == [
+        None,
+        35.0,
+        -10.25,
+    ]
+    assert [group["count"] for group in data["groups"]] == [2, 0, 2]
+    assert data["groups"][2]["investment"] == 50.0
+    assert data["topCategories"] == [
+        {"category": "Food", "expense": -30.0, "count": 1}
+    ]
+
+    weeks = auth_client.get(
+        "/api/transactions/dashboard/admin/analytics",
+        params={**params, "groupBy": "week"},
+    ).json()["groups"]
+    assert weeks[0]["key"] == "2014-01-06"
+    assert weeks[-1]["key"] == "2014-03-03"
+    assert len(weeks) == 9
+
+    categories = auth_client.get(
+        "/api/transactions/dashboard/admin/analytics",
+        params={**params, "groupBy": "category"},
+    ).json()["groups"]
+    assert [group["key"] for group in categories] == [
+        "Bonds",
+        "Food",
+        "Rent",
+        "Salary",
+    ]
+    assert all(group["rollingSavings"] is None for group in categories)
+
+    response = auth_client.post(
+        "/api/transactions",
+        json={
+            "description": "Test Transaction",
+            "amount": -45.0,
+            "category": "Rent",
+            "transactionDate": "2014-02-01T00:00:00Z",
+        },
+    )
+    assert response.status_code == 200
+    data = auth_client.get(
+        "/api/transactions/dashboard/admin/analytics",
+        params={**params, "top": 1},
+    ).json()
+    assert data["groups"][1]["savings"] == -45.0
+    assert data["topCategories"][0]["category"] == "Rent"
+
+    response = auth_client.get(
+        "/api/transactions/dashboard/nobody/analytics"
+    )
+    assert response.status_code == 404
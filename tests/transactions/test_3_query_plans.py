@@ -0,0 +1,83 @@
+"""Test transaction queries are served by the per-user indexes."""
+
+import base64
+import json
+from uuid import uuid4
+
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from khazana.core.database import DBBaseModel
+from khazana.transactions.serializers import TransactionFilters
+from khazana.transactions.utils import TransactionType
+from khazana.transactions.utils.filters import transaction_conditions
+from khazana.transactions.utils.pagination import paginate_transactions
+
+
+@pytest.fixture()
+def explain():
+    """Run queries on an empty database and get their query plans."""
+    engine = create_engine("sqlite://")
+    DBBaseModel.metadata.create_all(bind=engine)
+    statements = []
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if not statement.startswith("EXPLAIN"):
+            statements.append((statement, parameters))
+
+    def run(query):
+        statements.clear()
+        with sessionmaker(bind=engine)() as db:
+            query(db)
+            return [
+                " | ".join(
+                    row[-1]
+                    for row in db.connection().exec_driver_sql(
+                        f"EXPLAIN QUERY PLAN {statement}", parameters
+                    )
+                )
+                for statement, parameters in statements
+            ]
+
+    yield run
+    engine.dispose()
+
+
+def test_pagination_uses_user_date_index(explain):
+    """Test listing pages are index searches without sorting."""
+    cursor = None
+
+    def query(db):
+        paginate_transactions(db, transaction_conditions(uuid4()), 10, cursor)
+
+    for _ in range(2):
+        (plan,) = explain(query)
+        assert (
+            "SEARCH transactions USING INDEX "
+            "ix_transactions_userId_transactionDate_id" in plan
+        )
+        assert "TEMP B-TREE" not in plan
+        cursor = base64.urlsafe_b64encode(
+            json.dumps(["2023-12-01T00:00:00", uuid4().hex]).encode()
+        ).decode()
+
+
+@pytest.mark.parametrize(
+    "filters",
+    [
+        TransactionFilters(transactionType=TransactionType.expense),
+        TransactionFilters(category="Food", minAmount=10),
+        TransactionFilters(startDate="2023-01-01T00:00:00Z"),
+    ],
+)
+def test_filters_use_user_indexes(explain, filters):
+    """Test filtered queries never scan the whole table."""
+    (plan,) = explain(
+        lambda db: paginate_transactions(
+            db, transaction_conditions(uuid4(), filters), 10
+        )
+    )
+    assert "SEARCH transactions USING INDEX ix_transactions_userId_" in plan
+    assert "SCAN transactions" not in plan
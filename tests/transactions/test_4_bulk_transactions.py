@@ -0,0 +1,496 @@
+"""Test bulk transactions module."""
+
+import csv
+import io
+import time
+from decimal import Decimal
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.exc import OperationalError
+
+from khazana.core.database import SessionLocal
+from khazana.core.models import UserDB
+from khazana.transactions.models import ImportJobDB, TransactionDB
+from khazana.transactions.utils import (
+    ImportJobStatus,
+    amounts_to_cents,
+    select_transaction_type,
+    select_transaction_types,
+    to_cents,
+)
+from khazana.transactions.utils import import_jobs, imports
+from khazana.transactions.utils.exports import accepts_gzip
+from khazana.transactions.utils.import_jobs import (
+    create_import_job,
+    run_import_job,
+    spool_upload,
+)
+
+
+def test_export_transactions(auth_client: TestClient):
+    """Test streaming CSV export, plain and gzip encoded."""
+    listed = auth_client.get(
+        "/api/transactions", params={"limit": 1000}
+    ).json()["transactions"]
+
+    response = auth_client.get(
+        "/api/transactions/bulk/admin",
+        headers={"Accept-Encoding": "identity"},
+    )
+    assert response.status_code == 200
+    assert "content-encoding" not in response.headers
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert len(rows) == len(listed)
+    assert {row["id"] for row in rows} == {t["id"] for t in listed}
+    # Amounts are exported from cents as exact decimals.
+    assert all(len(row["amount"].partition(".")[2]) <= 2 for row in rows)
+
+    response = auth_client.get(
+        "/api/transactions/bulk/admin", headers={"Accept-Encoding": "gzip"}
+    )
+    assert response.status_code == 200
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["vary"] == "Accept-Encoding, Accept"
+    assert list(csv.DictReader(io.StringIO(response.text))) == rows
+
+    response = auth_client.get(
+        "/api/transactions/bulk/admin",
+        headers={"Accept-Encoding": "gzip;q=0, *;q=1"},
+    )
+    assert "content-encoding" not in response.headers
+
+
+def test_accepts_gzip():
+    """Test gzip is negotiated from the codings and their q-values."""
+    assert accepts_gzip("gzip")
+    assert accepts_gzip("deflate, GZIP;q=0.5")
+    assert accepts_gzip("br;q=1, *;q=0.1")
+    assert not accepts_gzip("gzip;q=0")
+    assert not accepts_gzip("gzip; q=0.000, *")
+    assert not accepts_gzip("identity")
+    assert not accepts_gzip(None)
+
+
+def test_import_transactions(auth_client: TestClient):
+    """Test CSV import skips and reports invalid rows."""
+    exported = auth_client.get("/api/transactions/bulk/admin").text
+    csv_file = "\n".join(
+        [
+            "description,amount,category,transactionDate,transactionType",
+            "Salary,1000,,2019-05-01 00:00:00,income",
+            "Rent,-400,Home,2019-05-02,",
+            "Fund,250,Stocks,2019-05-03T00:00:00Z,Investment",
+            "Bad date,10,Misc,not a date,",
+            "Future,10,Misc,2999-01-01,",
+            "Bad type,10,Misc,2019-05-04,transfer",
+            "Bad amount,ten,Misc,2019-05-04,",
+            "No date,10,Misc,,",
+        ]
+    )
+    response = auth_client.post(
+        "/api/transactions/bulk/admin",
+        files={"transaction_file": ("statement.csv", csv_file, "text/csv")},
+    )
+    assert response.status_code == 200
+    data = response.json()
+    assert data["imported"] == 3
+    assert data["rejected"] == 5
+    errors = {error["error"]: error["rows"] for error in data["errors"]}
+    assert errors == {
+        "Transaction date can not be null.": [8],
+        "Invalid transaction date.": [4],
+        "Transaction date can not be in the future.": [5],
+        "Invalid amount.": [7],
+        "Invalid transaction type.": [6],
+    }
+
+    dashboard = auth_client.get("/api/transactions/dashboard").json()
+    assert dashboard["totalSavings"]["2019-5"] == 600.0
+    assert dashboard["monthlyExpenses"]["2019-5"] == -400.0
+    assert dashboard["investmentGrowth"]["Stocks"] == 250.0
+
+    # An export can be imported back as is.
+    response = auth_client.post(
+        "/api/transactions/bulk/admin",
+        files={"transaction_file": ("export.csv", exported, "text/csv")},
+    )
+    assert response.status_code == 200
+    assert response.json()["rejected"] == 0
+
+    response = auth_client.post(
+        "/api/transactions/bulk/admin",
+        files={"transaction_file": ("empty.csv", "description\nx", "text/csv")},
+    )
+    assert response.status_code == 400
+
+
+def test_import_duplicates(auth_client: TestClient, monkeypatch):
+    """Test already imported and repeated rows are skipped."""
+    csv_file = "\n".join(
+        [
+            "description,amount,category,transactionDate,transactionType",
+            "Dividend,30,Dedup,2017-08-01,income",
+            "Coffee,-3.5,Dedup,2017-08-02,",
+            "Coffee,-3.501,Dedup,2017-08-02T00:00:00Z,",
+        ]
+    )
+
+    def post():
+        response = auth_client.post(
+            "/api/transactions/bulk/admin",
+            files={
+                "transaction_file": ("statement.csv", csv_file, "text/csv")
+            },
+        )
+        assert response.status_code == 200
+        return response.json()
+
+    data = post()
+    assert data["imported"] == 2
+    assert data["duplicates"] == 1
+
+    # Importing the same statement again only finds duplicates.
+    data = post()
+    assert data["imported"] == 0
+    assert data["duplicates"] == 3
+
+    # A concurrent import committing the same rows after the lookup.
+    lookup = imports.drop_duplicate_transactions
+    missed = []
+
+    def racing_lookup(db, chunk, report, batch_size):
+        if not missed:
+            missed.append(chunk)
+            return chunk.drop_duplicates("fingerprint")
+        return lookup(db, chunk, report, batch_size)
+
+    monkeypatch.setattr(imports, "drop_duplicate_transactions", racing_lookup)
+    data = post()
+    assert data["imported"] == 0
+    assert data["duplicates"] == 3
+    assert missed
+
+    dashboard = auth_client.get("/api/transactions/dashboard").json()
+    assert dashboard["totalSavings"]["2017-8"] == 26.5
+
+
+def test_import_currencies(auth_client: TestClient):
+    """Test imported rows keep their currency."""
+    csv_file = "\n".join(
+        [
+            "description,amount,category,transactionDate,currency",
+            "Lunch,-12,Food,2015-02-01,eur",
+            "Lunch,-12,Food,2015-02-01,",
+            "Lunch,-12,Food,2015-02-01,EURO",
+        ]
+    )
+    response = auth_client.post(
+        "/api/transactions/bulk/admin",
+        files={"transaction_file": ("statement.csv", csv_file, "text/csv")},
+    )
+    assert response.status_code == 200
+    data = response.json()
+    assert data["imported"] == 2
+    assert data["errors"] == [{"error": "Invalid currency.", "rows": [3]}]
+
+    listed = auth_client.get(
+        "/api/transactions",
+        params={
+            "startDate": "2015-02-01T00:00:00Z",
+            "endDate": "2015-02-02T00:00:00Z",
+        },
+    ).json()["transactions"]
+    assert sorted(t["currency"] for t in listed) == ["EUR", "USD"]
+
+
+def test_parquet_and_arrow(auth_client: TestClient):
+    """Test typed Parquet and Arrow exports import back as they are."""
+    rows = list(
+        csv.DictReader(
+            io.StringIO(auth_client.get("/api/transactions/bulk/admin").text)
+        )
+    )
+    response = auth_client.get(
+        "/api/transactions/bulk/admin",
+        headers={"Accept": "application/vnd.apache.parquet"},
+    )
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/vnd.apache.parquet"
+    assert ".parquet" in response.headers["content-disposition"]
+    parquet = response.content
+    table = pq.read_table(io.BytesIO(parquet))
+    assert table.schema.field("amount").type == pa.decimal128(18, 2)
+    assert table.schema.field("transactionDate").type.tz == "UTC"
+    assert table.column("id").to_pylist() == [row["id"] for row in rows]
+    amounts = table.column("amount").to_pylist()
+    assert [str(amount) for amount in amounts] == [
+        f"{float(row['amount']):.2f}" for row in rows
+    ]
+
+    response = auth_client.get(
+        "/api/transactions/bulk/admin", params={"fileFormat": "arrow"}
+    )
+    assert response.status_code == 200
+    assert pa.ipc.open_stream(response.content).read_all().equals(table)
+
+    for filename, content in [
+        ("export.parquet", parquet),
+        ("export.arrows", response.content),
+    ]:
+        response = auth_client.post(
+            "/api/transactions/bulk/admin",
+            files={"transaction_file": (filename, content)},
+        )
+        assert response.status_code == 200
+        data = response.json()
+        assert data["rejected"] == 0
+        assert data["imported"] == 0
+        assert data["duplicates"] == len(rows)
+
+    statement = pa.table(
+        {
+            "description": ["Salary", "Rent", "Bad date"],
+            "amount": [1000.0, -400.5, 10.0],
+            "category": pa.array(["Job", "Home", "Misc"]).dictionary_encode(),
+            "transactionDate": pa.array(
+                [pd.Timestamp("2013-05-01"), pd.Timestamp("2013-05-02"), None]
+            ),
+        }
+    )
+    buffer = io.BytesIO()
+    with pa.ipc.new_file(buffer, statement.schema) as writer:
+        for batch in statement.to_batches(max_chunksize=2):
+            writer.write_batch(batch)
+    response = auth_client.post(
+        "/api/transactions/bulk/admin",
+        files={"transaction_file": ("statement.arrow", buffer.getvalue())},
+    )
+    assert response.status_code == 200
+    data = response.json()
+    assert data["imported"] == 2
+    assert data["errors"] == [
+        {"error": "Transaction date can not be null.", "rows": [3]}
+    ]
+    dashboard = auth_client.get("/api/transactions/dashboard").json()
+    assert dashboard["totalSavings"]["2013-5"] == 599.5
+
+    # Decimals are read as exact cents, rounding half to even.
+    statement = pa.table(
+        {
+            "description": ["Refund", "Fee", "Unknown"],
+            "amount": pa.array(
+                [Decimal("10.075"), Decimal("-2.125"), None],
+                type=pa.decimal128(18, 3),
+            ),
+            "category": ["Decimals"] * 3,
+            "transactionDate": [pd.Timestamp("2013-06-01")] * 3,
+        }
+    )
+    buffer = io.BytesIO()
+    pq.write_table(statement, buffer)
+    response = auth_client.post(
+        "/api/transactions/bulk/admin",
+        files={"transaction_file": ("statement.parquet", buffer.getvalue())},
+    )
+    assert response.status_code == 200
+    data = response.json()
+    assert data["imported"] == 2
+    assert data["errors"] == [{"error": "Invalid amount.", "rows": [3]}]
+    listed = auth_client.get(
+        "/api/transactions", params={"category": "Decimals"}
+    ).json()["transactions"]
+    assert sorted(t["amount"] for t in listed) == [-2.12, 10.08]
+
+    for filename in ["statement.parquet", "statement.xlsx"]:
+        response = auth_client.post(
+            "/api/transactions/bulk/admin",
+            files={"transaction_file": (filename, b"not a statement")},
+        )
+        assert response.status_code == 400
+
+
+def test_import_job(auth_client: TestClient):
+    """Test a background import reports its progress."""
+    csv_file = "\n".join(
+        [
+            "description,amount,category,transactionDate,transactionType",
+            "Job salary,1000,Work,2018-01-01,income",
+            "Job rent,-400,Home,2018-01-02,",
+            "Job bad,10,Misc,not a date,",
+        ]
+    )
+    response = auth_client.post(
+        "/api/transactions/bulk/admin/jobs",
+        files={"transaction_file": ("job.csv", csv_file, "text/csv")},
+    )
+    assert response.status_code == 202
+    job_id = response.json()["id"]
+
+    for _ in range(100):
+        job = auth_client.get(f"/api/transactions/bulk/jobs/{job_id}").json()
+        if job["status"] == "completed":
+            break
+        time.sleep(0.05)
+    assert job["status"] == "completed"
+    assert job["rowsProcessed"] == 3
+    assert job["rowsImported"] == 2
+    assert job["rowsDuplicate"] == 0
+    assert job["rowsRejected"] == 1
+    assert job["errors"] == [{"error": "Invalid transaction date.", "rows": [3]}]
+    assert job["rowsPerSecond"] > 0
+
+    dashboard = auth_client.get("/api/transactions/dashboard").json()
+    assert dashboard["totalSavings"]["2018-1"] == 600.0
+
+    response = auth_client.get(
+        "/api/transactions/bulk/jobs/00000000-0000-0000-0000-000000000000"
+    )
+    assert response.status_code == 404
+
+
+def test_import_job_spool_removed_on_failure(monkeypatch, tmp_path):
+    """Test an upload is not left spooled when its job is not created."""
+    spooled = []
+
+    def spool(upload, suffix):
+        spooled.append(spool_upload(upload, str(tmp_path), suffix))
+        return spooled[-1]
+
+    def commit():
+        raise OperationalError("COMMIT", {}, Exception("database is locked"))
+
+    monkeypatch.setattr(import_jobs, "spool_upload", spool)
+    with SessionLocal() as db, pytest.raises(OperationalError):
+        admin = db.query(UserDB).filter(UserDB.username == "admin").first()
+        monkeypatch.setattr(db, "commit", commit)
+        create_import_job(
+            db, io.BytesIO(b"x"), "job.csv", admin.id, admin.id
+        )
+    assert spooled
+    assert not list(tmp_path.iterdir())
+
+
+def test_resume_import_job():
+    """Test an interrupted job resumes after its last committed chunk."""
+    rows = [
+        f"Resume {row},{row},Misc,2017-01-0{row},income"
+        for row in range(1, 6)
+    ]
+    path = spool_upload(
+        io.BytesIO(
+            "\n".join(
+                ["description,amount,category,transactionDate,"
+                 "transactionType", *rows]
+            ).encode()
+        )
+    )
+    with SessionLocal() as db:
+        admin = db.query(UserDB).filter(UserDB.username == "admin").first()
+        job = ImportJobDB(
+            userId=admin.id,
+            createdBy=admin.id,
+            path=path,
+            status=ImportJobStatus.running.value,
+            chunkSize=2,
+            chunksCommitted=1,
+            rowsImported=2,
+        )
+        db.add(job)
+        db.commit()
+        job_id = job.id
+
+    run_import_job(job_id)
+
+    with SessionLocal() as db:
+        job = db.get(ImportJobDB, job_id)
+        assert job.status == ImportJobStatus.completed.value
+        assert job.chunksCommitted == 3
+        assert job.rowsImported == 5
+        imported = [
+            description
+            for description, in db.query(TransactionDB.description).filter(
+                TransactionDB.description.like("Resume %")
+            )
+        ]
+    assert sorted(imported) == ["Resume 3", "Resume 4", "Resume 5"]
+
+
+def test_import_malformed_file(auth_client: TestClient):
+    """Test a malformed file fails instead of being silently dropped."""
+    csv_file = "\n".join(
+        [
+            "description,amount,category,transactionDate,transactionType",
+            *[
+                f"Malformed {row},{row},Malformed,2015-06-01,income"
+                for row in range(1, 31)
+            ],
+            '"Unterminated,10,Malformed,2015-06-02,income',
+        ]
+    )
+    response = auth_client.post(
+        "/api/transactions/bulk/admin",
+        files={"transaction_file": ("statement.csv", csv_file, "text/csv")},
+    )
+    assert response.status_code == 400
+    response = auth_client.get(
+        "/api/transactions", params={"category": "Malformed"}
+    )
+    assert response.json()["transactions"] == []
+
+    # Chunks committed before the malformed line are kept.
+    path = spool_upload(io.BytesIO(csv_file.encode()))
+    with SessionLocal() as db:
+        admin = db.query(UserDB).filter(UserDB.username == "admin").first()
+        job = ImportJobDB(
+            userId=admin.id, createdBy=admin.id, path=path, chunkSize=10
+        )
+        db.add(job)
+        db.commit()
+        job_id = job.id
+
+    run_import_job(job_id)
+
+    with SessionLocal() as db:
+        job = db.get(ImportJobDB, job_id)
+        assert job.status == ImportJobStatus.failed.value
+        assert job.chunksCommitted == 3
+        assert job.rowsImported == 30
+        assert job.error.startswith("Import stopped after 30 rows")
+
+
+def test_select_transaction_types():
+    """Test vectorized classification matches the single row rules."""
+    amounts = pd.Series([-5.0, 5.0, 5.0, 0.0, -5.0, 5.0])
+    requested = pd.Series(
+        [None, "", "Investment", "income", "transfer", "EXPENSE"]
+    )
+    selected, invalid = select_transaction_types(amounts, requested)
+    assert list(invalid) == [4]
+    assert list(selected.drop(index=invalid)) == [
+        "expense",
+        "income",
+        "investment",
+        "income",
+        "income",
+    ]
+    for row, (amount, transaction_type) in enumerate(zip(amounts, requested)):
+        if row in invalid:
+            with pytest.raises(ValueError):
+                select_transaction_type(amount, transaction_type)
+        else:
+            assert select_transaction_type(amount, transaction_type) == (
+                selected[row]
+            )
+
+
+def test_amounts_to_cents():
+    """Test imported amounts are rounded to cents like API amounts."""
+    amounts = pd.Series([10.075, 0.125, -0.125, 0.1 + 0.2, 10.075])
+    assert list(amounts_to_cents(amounts)) == [
+        to_cents(amount) for amount in amounts
+    ]
+    assert list(amounts_to_cents(amounts)) == [1008, 12, -12, 30, 1008]
@@ -0,0 +1,101 @@
+"""Test read only endpoints against a separate replica database."""
+
+import sqlite3
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+
+from khazana.core.apis.main import app
+from khazana.core.database import _create_engine, engine, get_read_db
+
+
+def _replicate(primary: str, replica: str) -> None:
+    with sqlite3.connect(primary) as source, sqlite3.connect(
+        replica
+    ) as target:
+        source.backup(target)
+
+
+@pytest.fixture
+def replica(tmp_path):
+    """Route read only endpoints to a copy of the primary database."""
+    path = str(tmp_path / "replica.db")
+    _replicate(engine.url.database, path)
+    replica_engine = _create_engine(f"sqlite:///{path}", read_only=True)
+    ReplicaSession = sessionmaker(bind=replica_engine)
+
+    def get_replica_db():
+        with ReplicaSession() as db:
+            yield db
+
+    app.dependency_overrides[get_read_db] = get_replica_db
+    try:
+        yield path, ReplicaSession
+    finally:
+        app.dependency_overrides.pop(get_read_db, None)
+        replica_engine.dispose()
+
+
+def test_reads_use_replica(auth_client: TestClient, replica):
+    """Test writes go to the primary and reads to the replica."""
+    path, ReplicaSession = replica
+    response = auth_client.post(
+        "/api/transactions",
+        json={
+            "description": "Replicated",
+            "amount": 12.5,
+            "category": "Replica",
+            "transactionDate": "2016-01-01T00:00:00Z",
+        },
+    )
+    assert response.status_code == 200
+
+    params = {"category": "Replica"}
+    listed = auth_client.get("/api/transactions", params=params).json()
+    assert listed["transactions"] == []
+
+    _replicate(engine.url.database, path)
+    listed = auth_client.get("/api/transactions", params=params).json()
+    assert [t["description"] for t in listed["transactions"]] == [
+        "Replicated"
+    ]
+
+    with ReplicaSession() as db, pytest.raises(OperationalError):
+        db.execute(text("DELETE FROM transactions"))
+
+
+def test_replica_reads_after_write_are_not_cached(
+    auth_client: TestClient, replica
+):
+    """Test a lagging replica does not pin stale dashboards in the cache."""
+    path, _ = replica
+    response = auth_client.post(
+        "/api/transactions",
+        json={
+            "description": "Replicated",
+            "amount": -7.0,
+            "category": "Replica",
+            "transactionDate": "2016-02-01T00:00:00Z",
+        },
+    )
+    assert response.status_code == 200
+
+    dashboard = auth_client.get("/api/transactions/dashboard").json()
+    assert "2016-2" not in dashboard["monthlyExpenses"]
+    analytics = auth_client.get(
+        "/api/transactions/dashboard/admin/analytics",
+        params={"startDate": "2016-02-01", "endDate": "2016-03-01"},
+    ).json()
+    assert analytics["groups"] == []
+
+    _replicate(engine.url.database, path)
+    dashboard = auth_client.get("/api/transactions/dashboard").json()
+    assert dashboard["monthlyExpenses"]["2016-2"] == -7.0
+    analytics = auth_client.get(
+        "/api/transactions/dashboard/admin/analytics",
+        params={"startDate": "2016-02-01", "endDate": "2016-03-01"},
+    ).json()
+    assert analytics["groups"][0]["expense"] == -7.0